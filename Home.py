@@ -4,6 +4,8 @@ import numpy as np
 import plotly.express as px
 from PIL import Image
 from config.config import Config
+from utils.charts import histogram_figure
+from utils.dashboard import load_dashboard_data
 from utils.styling import load_css
 
 st.set_page_config(
@@ -26,15 +28,8 @@ Welcome to the New York House Price Prediction App! This application helps you:
 Use the navigation menu on the left to explore different sections of the app.
 """)
 
-@st.cache_data
-def load_data():
-    return pd.read_csv(Config.DATA_PATH)
-
-
-
 try:
-    df = load_data()
-    df = df[Config.FEATURE_COLUMN]
+    df, summary = load_dashboard_data()
     
      # === HEADER ===
     st.title("🏠 Housing Dataset Summary")
@@ -47,19 +42,23 @@ try:
 
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("📦 Jumlah Data", f"{df.shape[0]:,}")
+        st.metric("📦 Jumlah Data", f"{summary['rows']:,}")
     with col2:
         st.metric("🧩 Jumlah Fitur", len(Config.FEATURE_COLUMN))
     with col3:
-        st.metric("💰 Rata-rata Harga", f"${df[Config.TARGET_COLUMN].mean():,.2f}")
+        st.metric("💰 Rata-rata Harga", f"${summary['target_mean']:,.2f}")
     with col4:
-        st.metric("📉 Harga Minimum", f"${df[Config.TARGET_COLUMN].min():,.2f}")
+        st.metric("📉 Harga Minimum", f"${summary['target_min']:,.2f}")
 
     st.divider()
     
     # === DISTRIBUSI HARGA ===
     st.subheader("📈 Distribusi Harga Rumah")
-    fig = px.histogram(x=df['PRICE'], nbins=30, title="Distribusi Harga Rumah New York", color_discrete_sequence=["#4E79A7"])
+    if Config.DASHBOARD_CHART_MODE == 'aggregate':
+        # bin dihitung sekali di server, ukuran chart tidak bergantung jumlah baris
+        fig = histogram_figure(summary['features']['PRICE'], "Distribusi Harga Rumah New York", color="#4E79A7")
+    else:
+        fig = px.histogram(x=df['PRICE'], nbins=Config.DASHBOARD_HIST_BINS, title="Distribusi Harga Rumah New York", color_discrete_sequence=["#4E79A7"])
     
     fig.update_layout(
         xaxis_title="Harga Rumah",
@@ -73,9 +72,8 @@ try:
     
     # === FEATURE CORRELATION HEATMAP ===
     st.subheader("🧠 Korelasi Antar Fitur")
-    corr = df.corr(numeric_only=True)
     fig_corr = px.imshow(
-        corr,
+        summary['corr'],
         text_auto=".2f",
         color_continuous_scale="RdBu_r",
         title="Heatmap Korelasi Fitur",
@@ -108,8 +106,8 @@ try:
     # === RINGKASAN AKHIR ===
     st.success(f"""
     ✅ **Kesimpulan Singkat:**
-    - Dataset ini memiliki **{df.shape[0]:,}** baris data dan **{len(Config.FEATURE_COLUMN)}** fitur utama.
-    - Rata-rata harga rumah (`PRICE`) adalah sekitar **${df[Config.TARGET_COLUMN].mean():,.2f}**.
+    - Dataset ini memiliki **{summary['rows']:,}** baris data dan **{len(Config.FEATURE_COLUMN)}** fitur utama.
+    - Rata-rata harga rumah (`PRICE`) adalah sekitar **${summary['target_mean']:,.2f}**.
     - Fitur yang paling berkorelasi dengan harga rumah dapat dilihat pada heatmap di atas.
     """)
 
@@ -1,10 +1,21 @@
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-import pickle
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, ConfigDict
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timezone
+import asyncio
 import numpy as np
-import pandas as pd
 from config.config import Config
-from utils.logger import setup_logger
+from src.batcher import MicroBatcher
+from src.cache import PredictionCache
+from src.comps import ComparablesIndex
+from src.executor import InferenceExecutor, QueueFullError
+from src.registry import current_version, read_manifest, set_current
+from src.inference import EXTRA_CATEGORICAL, KEY_COORDINATES, ServingModel, records_to_frame, validate_frame
+from src import metrics
+from src.metrics import MetricsMiddleware, stage_timer
+from utils.logger import PER_REQUEST, dropped_records, setup_logger
 
 logger = setup_logger('api')
 
@@ -13,86 +24,399 @@ class FeatureInput(BaseModel):
     BEDS    : int        
     BATH    : int        
     PROPERTYSQFT : int 
-    LOCALITY : str = 'New York'
-    
-    class Config :
-        schema_extra = {
-            "example" : {
-                "PRICE" : 200000,
-                'BEDS' : 2,
-                'BATH' : 3,
-                'PROPERTYSQFT' : 2000,
-                'LOCALITY' : 'New York'
-                
-            }
+    LOCALITY : str = Config.DEFAULT_LOCALITY
+    # hanya dipakai jika ada di Config.CATEGORICAL_COLUMNS
+    SUBLOCALITY : Optional[str] = None
+    STREET_NAME : Optional[str] = None
+    BROKERTITLE : Optional[str] = None
+    # hanya dipakai jika Config.SPATIAL_FEATURES, tanpa koordinat dipakai median lokasi LOCALITY
+    LATITUDE : Optional[float] = None
+    LONGITUDE : Optional[float] = None
+    
+    model_config = ConfigDict(json_schema_extra = {
+        "example" : {
+            "PRICE" : 200000,
+            'BEDS' : 2,
+            'BATH' : 3,
+            'PROPERTYSQFT' : 2000,
+            'LOCALITY' : 'New York'
+            
+        }
+    })
+
+class BatchFeatureInput(BaseModel):
+    records : Optional[List[Dict[str, Any]]] = None
+    columns : Optional[Dict[str, List[Any]]] = None
+    
+    model_config = ConfigDict(json_schema_extra = {
+        "example" : {
+            "records" : [
+                {'PRICE' : 200000, 'BEDS' : 2, 'BATH' : 3, 'PROPERTYSQFT' : 2000, 'LOCALITY' : 'New York'},
+                {'PRICE' : 350000, 'BEDS' : 3, 'BATH' : 2, 'PROPERTYSQFT' : 1500, 'LOCALITY' : 'Brooklyn'}
+            ]
+        }
+    })
+
+class CompsInput(BaseModel):
+    BEDS : int
+    BATH : int
+    PROPERTYSQFT : int
+    # LOCALITY tidak dikenal / kosong = cari di semua LOCALITY
+    LOCALITY : Optional[str] = None
+    LATITUDE : Optional[float] = None
+    LONGITUDE : Optional[float] = None
+    k : Optional[int] = None
+    
+    model_config = ConfigDict(json_schema_extra = {
+        "example" : {
+            'BEDS' : 2,
+            'BATH' : 2,
+            'PROPERTYSQFT' : 1200,
+            'LOCALITY' : 'New York',
+            'LATITUDE' : 40.75,
+            'LONGITUDE' : -73.98,
+            'k' : 10
         }
+    })
+
+class ReloadInput(BaseModel):
+    version : Optional[str] = None
+    force : bool = False
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if batcher is not None:
+        await batcher.start()
+    watcher = asyncio.create_task(watch_artifacts())
+    yield
+    watcher.cancel()
+    if batcher is not None:
+        await batcher.stop()
+    executor.shutdown()
+
 app = FastAPI(
     title=Config.API_TITLE,
     description=Config.API_DESCRIPTION,
-    version=Config.API_VERSION
+    version=Config.API_VERSION,
+    lifespan=lifespan
 )
 
+# request count, error count dan latency per endpoint
+if Config.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 #load model 
 try:
-    with open(Config.MODEL_PATH, 'rb') as f:
-        model = pickle.load(f)
-    with open(Config.ENCODING_PATH, 'rb') as f :
-        encoder = pickle.load(f)
-    
+    serving = ServingModel.load()
     logger.info("Model loaded successfully")
 except Exception as e:
     logger.error(f"Error loading model {str(e)}")
     raise
 
+def load_comps_index():
+    """The comparable-listings index built by train.py, or None when it was not built."""
+    if not (Config.COMPS_INDEX_DIR / 'meta.json').exists():
+        return None
+    return ComparablesIndex.load()
+
+comps_index = load_comps_index()
+if comps_index is None:
+    logger.warning(f"No comparable listings index at {Config.COMPS_INDEX_DIR}, /comps disabled until python -m src.comps")
+
+prediction_cache = PredictionCache()
+prediction_cache.bind(serving.version)
+_reload_lock = asyncio.Lock()
+_failed_version = None
+
+# inference berjalan di luar event loop
+executor = InferenceExecutor()
+batcher = MicroBatcher(executor) if Config.BATCHING_ENABLED else None
+
+
+def queue_full_response():
+    return HTTPException(
+        status_code=503,
+        detail="Inference queue is full, retry later",
+        headers={"Retry-After": str(Config.RETRY_AFTER_SECONDS)}
+    )
+
+
+def load_warm_model():
+    candidate = ServingModel.load()
+    candidate.warm()
+    return candidate
+
+
+async def reload_model(force=False):
+    """Load and warm the new version off the event loop, then swap it in.
+    
+    The swap is a single reference assignment: requests that already picked
+    up the old model finish on it, new requests get the new one.
+    """
+    global serving, _failed_version
+    
+    async with _reload_lock:
+        previous = serving
+        if not force and not await asyncio.to_thread(previous.artifacts_changed):
+            return False
+        
+        target = current_version() if Config.REGISTRY_ENABLED else None
+        if not force and target is not None and target == _failed_version:
+            return False
+        
+        try:
+            candidate = await asyncio.to_thread(load_warm_model)
+        except Exception:
+            _failed_version = target
+            raise
+        
+        serving = candidate
+        prediction_cache.bind(candidate.version)
+        logger.info(f"Swapped model version {previous.version} -> {candidate.version}")
+        return True
+
+
+async def reload_comps():
+    """Swap in the comparable-listings index when it was rebuilt."""
+    global comps_index
+    
+    previous = comps_index
+    if previous is not None and not previous.changed():
+        return False
+    candidate = await asyncio.to_thread(load_comps_index)
+    if candidate is None:
+        return False
+    comps_index = candidate
+    logger.info(f"Loaded comparable listings index with {candidate.n_listings} listings")
+    return True
+
+async def watch_artifacts():
+    """Poll the CURRENT pointer (or the flat artifact files) and the comps index in the background."""
+    while True:
+        await asyncio.sleep(Config.ARTIFACT_CHECK_INTERVAL)
+        try:
+            await reload_model()
+        except Exception as e:
+            logger.error(f"Error reloading model, keep version {serving.version}: {str(e)}")
+        try:
+            await reload_comps()
+        except Exception as e:
+            logger.error(f"Error reloading comparable listings index: {str(e)}")
+
 @app.post("/predict")
 async def predict(features: FeatureInput):
+    timer = stage_timer('predict')
     try:
         # Validate input
-        for feature, value in features.dict().items():
-            if not Config.is_valid_feature_value(feature, value):
+        current = serving
+        feature_dict = features.dict()
+        for feature in Config.FEATURE_COLUMN:
+            if feature in EXTRA_CATEGORICAL:
+                continue
+            if not current.is_valid_feature_value(feature, feature_dict[feature]):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid value for {feature}"
+                )
+        for feature in KEY_COORDINATES:
+            if feature_dict[feature] is not None and not current.is_valid_feature_value(feature, feature_dict[feature]):
                 raise HTTPException(
                     status_code=400,
                     detail=f"Invalid value for {feature}"
                 )
-        #get locality
-        
-        
         # Prepare input
-        feature_dict = features.dict()
-        input_df = pd.DataFrame([feature_dict])[Config.FEATURE_COLUMN]
-        
-        if 'PRICE' in input_df.columns:
-            input_df = input_df.drop(columns=['PRICE'])
-
-        
-        feature_locality = input_df[['LOCALITY']]
-        new_encoded = encoder.transform(feature_locality)
+        key = PredictionCache.make_key(
+            feature_dict['BEDS'],
+            feature_dict['BATH'],
+            feature_dict['PROPERTYSQFT'],
+            feature_dict['LOCALITY'],
+            *[feature_dict[col] for col in EXTRA_CATEGORICAL],
+            *[feature_dict[col] for col in KEY_COORDINATES]
+        )
         
+        timer.lap('validation')
         
-        # make df encode
-        get_name_feature_encode = encoder.get_feature_names_out(['LOCALITY'])
-        df_encoded= pd.DataFrame(new_encoded,columns=get_name_feature_encode)
+        final_prediction = prediction_cache.get(key) if Config.CACHE_ENABLED else None
+        timer.lap('cache')
+        if final_prediction is None:
+            # Make prediction
+            if batcher is not None:
+                final_prediction, version = await batcher.submit(current, key)
+                timer.lap('inference')
+            elif Config.METRICS_ENABLED:
+                (final_prediction, encoding_seconds, inference_seconds), version = await executor.predict_row_timed(current, key)
+                timer.record('encoding', encoding_seconds)
+                timer.record('inference', inference_seconds)
+                # sisa waktu : antri dan pindah ke thread/process worker
+                timer.lap('dispatch', exclude=encoding_seconds + inference_seconds)
+            else:
+                final_prediction, version = await executor.predict_row(current, key)
+            if Config.CACHE_ENABLED:
+                # key versi model yang benar-benar dipakai (worker process bisa masih versi lama)
+                prediction_cache.set(key, final_prediction, version)
         
+        # argumen lazy : dict tidak di-format jika DEBUG mati atau log tidak ter-sample
+        logger.debug("Prediction made for input: %s", feature_dict, extra=PER_REQUEST)
+        response = JSONResponse({"prediction": final_prediction})
+        timer.lap('serialization')
+        return response
+    
+    except HTTPException:
+        raise
+    except QueueFullError:
+        raise queue_full_response()
+    except Exception as e:
+        logger.error(f"Error making prediction: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/predict/batch")
+async def predict_batch(batch: BatchFeatureInput):
+    current = serving
+    timer = stage_timer('predict_batch')
+    try:
+        input_df = records_to_frame(batch.records, batch.columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if len(input_df) > Config.BATCH_MAX_RECORDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch too large, maximum {Config.BATCH_MAX_RECORDS} records"
+        )
+    
+    try:
+        # Validate all rows together
+        input_df, valid_mask, errors = validate_frame(input_df, current.ranges)
+        timer.lap('validation')
         
-        #drop_locality
-        input_df = input_df.drop(columns='LOCALITY')
-        
-        #merge encoded
-        input_df = pd.concat([input_df.reset_index(drop=True),df_encoded],axis=1)
-        
-        logger.info(input_df)
+        predictions = np.full(len(input_df), np.nan)
+        if valid_mask.any():
+            if Config.METRICS_ENABLED:
+                (valid_predictions, encoding_seconds, inference_seconds), _ = await executor.predict_frame_timed(
+                    current, input_df[valid_mask])
+                predictions[valid_mask] = valid_predictions
+                timer.record('encoding', encoding_seconds)
+                timer.record('inference', inference_seconds)
+                timer.lap('dispatch', exclude=encoding_seconds + inference_seconds)
+                metrics.ROWS.inc('predict_batch', amount=int(valid_mask.sum()))
+            else:
+                predictions[valid_mask], _ = await executor.predict_frame(current, input_df[valid_mask])
         
-        # Make prediction
-        prediction = model.predict(input_df)
-        final_prediction = float(np.exp(prediction[0]))
+        results = []
+        for idx in range(len(input_df)):
+            if idx in errors:
+                results.append({"index": idx, "prediction": None, "error": errors[idx]})
+            else:
+                results.append({"index": idx, "prediction": float(predictions[idx]), "error": None})
         
-        logger.info(f"Prediction made for input: {feature_dict}")
-        return {"prediction": final_prediction}
+        logger.info(
+            f"Batch prediction made for {int(valid_mask.sum())} rows, {len(errors)} invalid",
+            extra={**PER_REQUEST, 'n_success': int(valid_mask.sum()), 'n_errors': len(errors)}
+        )
+        response = JSONResponse({"predictions": results, "n_success": int(valid_mask.sum()), "n_errors": len(errors)})
+        timer.lap('serialization')
+        return response
     
+    except QueueFullError:
+        raise queue_full_response()
     except Exception as e:
-        logger.error(f"Error making prediction: {str(e)}")
+        logger.error(f"Error making batch prediction: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/comps")
+async def comps(request: CompsInput):
+    """Top-k most similar listings from the precomputed index, nearest first."""
+    current = comps_index
+    timer = stage_timer('comps')
+    if current is None:
+        raise HTTPException(status_code=503, detail="Comparable listings index is not built, run python -m src.comps")
+    
+    for feature in ('BEDS', 'BATH', 'PROPERTYSQFT'):
+        if not serving.is_valid_feature_value(feature, getattr(request, feature)):
+            raise HTTPException(status_code=400, detail=f"Invalid value for {feature}")
+    
+    # koordinat hanya dipakai jika keduanya ada
+    has_location = request.LATITUDE is not None and request.LONGITUDE is not None
+    if has_location:
+        for feature in Config.COORDINATE_COLUMNS:
+            if not Config.is_valid_feature_value(feature, getattr(request, feature)):
+                raise HTTPException(status_code=400, detail=f"Invalid value for {feature}")
+    
+    k = Config.COMPS_K if request.k is None else request.k
+    if not 1 <= k <= Config.COMPS_MAX_K:
+        raise HTTPException(status_code=400, detail=f"k must be between 1 and {Config.COMPS_MAX_K}")
+    timer.lap('validation')
+    
+    try:
+        results = current.search(
+            request.BEDS, request.BATH, request.PROPERTYSQFT, request.LOCALITY,
+            request.LATITUDE if has_location else None, request.LONGITUDE if has_location else None, k
+        )
+        timer.lap('search')
+        response = JSONResponse({"comps": results, "n_listings": current.n_listings})
+        timer.lap('serialization')
+        return response
+    
+    except Exception as e:
+        logger.error(f"Error searching comparable listings: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/model/version")
+async def model_version():
+    current = serving
+    manifest = read_manifest(current.version) if current.source == 'registry' else None
+    return {
+        "version": current.version,
+        "source": current.source,
+        "backend": current.predictor.backend,
+        "mode": "lite" if current.lite else "full",
+        "loaded_at": datetime.fromtimestamp(current.loaded_at, timezone.utc).isoformat(),
+        "registry_current": current_version() if Config.REGISTRY_ENABLED else None,
+        "created_at": manifest['created_at'] if manifest else None,
+        "metrics": manifest['metrics'] if manifest else None,
+    }
+
+@app.post("/model/reload")
+async def model_reload(request: Optional[ReloadInput] = None):
+    """Reload CURRENT now, or first point CURRENT at ``version`` (e.g. a rollback)."""
+    request = request or ReloadInput()
+    previous = serving.version
+    if request.version is not None:
+        try:
+            set_current(request.version)
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+    
+    try:
+        reloaded = await reload_model(force=request.force)
+        return {"previous": previous, "version": serving.version, "reloaded": reloaded}
+    
+    except Exception as e:
+        logger.error(f"Error reloading model, keep version {previous}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus text format : request/error counts, latency per stage, cache and model version."""
+    if not Config.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled, set METRICS_ENABLED=true")
+    metrics.update_serving_gauges(serving, prediction_cache.stats(), executor.stats())
+    metrics.LOG_DROPPED.set(dropped_records())
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/cache/stats")
+async def cache_stats():
+    table = serving.table.stats() if serving.table is not None else None
+    return {"enabled": Config.CACHE_ENABLED, **prediction_cache.stats(), "table": table}
+
+@app.get("/executor/stats")
+async def executor_stats():
+    return executor.stats()
+
+@app.get("/batching/stats")
+async def batching_stats():
+    return {"enabled": batcher is not None, **(batcher.stats() if batcher is not None else {})}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host=Config.HOST, port=Config.PORT)
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""Cold start of the API in full vs lite serving mode.
+
+Each run starts a fresh interpreter with ``SERVING_MODE`` (and the
+``INFERENCE_BACKEND`` lite mode serves) set, imports
+``app`` (which loads the model), opens the lifespan and sends one
+``/predict`` request, e.g.
+
+    python -m benchmarks.cold_start --repeat 5
+
+Reports the median import time, first-request latency and which heavy
+libraries ended up imported.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import numpy as np
+
+HEAVY_MODULES = ['pandas', 'sklearn', 'scipy.sparse', 'xgboost']
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.app) as client:
+    request_start = time.perf_counter()
+    response = client.post('/predict', json={'PRICE': 200000, 'BEDS': 2, 'BATH': 3, 'PROPERTYSQFT': 2000, 'LOCALITY': 'New York'})
+    request_end = time.perf_counter()
+    assert response.status_code == 200, response.text
+print(json.dumps({
+    'import_seconds': imported - start,
+    'first_request_ms': (request_end - request_start) * 1000,
+    'prediction': response.json()['prediction'],
+    'modules': [name for name in %r if name in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+# (SERVING_MODE, INFERENCE_BACKEND)
+MODES = [('full', 'pipeline'), ('lite', 'booster'), ('lite', 'forest')]
+
+
+def run_once(mode, backend):
+    # fastapi.testclient mengimpor httpx, tidak dihitung di import app
+    env = {**os.environ, 'SERVING_MODE': mode, 'INFERENCE_BACKEND': backend, 'PREDICTION_TABLE_ENABLED': 'false'}
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(repeat=5, output=None):
+    results = []
+    for mode, backend in MODES:
+        runs = [run_once(mode, backend) for _ in range(repeat)]
+        results.append({
+            'mode': mode,
+            'backend': backend,
+            'import_seconds': round(float(np.median([run['import_seconds'] for run in runs])), 3),
+            'first_request_ms': round(float(np.median([run['first_request_ms'] for run in runs])), 2),
+            'prediction': runs[0]['prediction'],
+            'heavy_modules_loaded': runs[0]['modules'],
+        })
+
+    print(json.dumps(results, indent=4))
+    if output:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=4)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark API cold start in full vs lite serving mode")
+    parser.add_argument('--repeat', type=int, default=5, help="fresh processes per mode, the median is reported")
+    parser.add_argument('--output', help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    main(repeat=args.repeat, output=args.output)
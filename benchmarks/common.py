@@ -0,0 +1,24 @@
+"""Helpers shared by the benchmark suite."""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+
+def percentiles(samples_ms):
+    """p50/p95/p99 and mean of latency samples in milliseconds."""
+    samples_ms = np.asarray(samples_ms, dtype=float)
+    p50, p95, p99 = np.percentile(samples_ms, [50, 95, 99])
+    return {
+        'p50': round(float(p50), 4),
+        'p95': round(float(p95), 4),
+        'p99': round(float(p99), 4),
+        'mean': round(float(samples_ms.mean()), 4),
+        'n': int(len(samples_ms)),
+    }
+
+
+def run_isolated(fn, *args, **kwargs):
+    """Run ``fn`` in a fresh spawned process so imports and peak RSS do not mix between sections."""
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(fn, *args, **kwargs).result()
@@ -0,0 +1,104 @@
+"""Comparable-listings search latency as the listing table grows.
+
+Builds the comps index on the dataset replicated ``scale`` times (with
+jittered location and size, so every copy is a distinct listing), e.g.
+
+    python -m benchmarks.comps --scales 1 10 100
+
+and times ``ComparablesIndex.search`` against a full NumPy scan of the same
+points, for requests with and without coordinates.
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+from config.config import Config
+from benchmarks.common import percentiles
+
+
+def synthetic_listings(listings, scale, seed=0):
+    """``listings`` repeated ``scale`` times, each copy moved up to ~1 km and resized up to 10%."""
+    import pandas as pd
+
+    if scale == 1:
+        return listings
+    rng = np.random.default_rng(seed)
+    df = pd.concat([listings] * scale, ignore_index=True)
+    copy = np.repeat(np.arange(scale), len(listings))
+    df['ADDRESS'] = df['ADDRESS'] + np.where(copy > 0, ' #' + copy.astype(str), '')
+    df['LATITUDE'] += rng.uniform(-0.01, 0.01, len(df)) * (copy > 0)
+    df['LONGITUDE'] += rng.uniform(-0.01, 0.01, len(df)) * (copy > 0)
+    df['PROPERTYSQFT'] = np.round(df['PROPERTYSQFT'] * np.where(copy > 0, rng.uniform(0.9, 1.1, len(df)), 1.0))
+    return df
+
+
+def _time(fn, queries, warmup=50):
+    for query in queries[:warmup]:
+        fn(query)
+    samples_ms = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        samples_ms.append((time.perf_counter() - start) * 1000)
+    return percentiles(samples_ms)
+
+
+def run(scales=(1, 10, 100), n_queries=1000, k=None):
+    """Build the index at every scale and time ``n_queries`` searches plus the full scan baseline."""
+    from src.comps import ComparablesIndex, _query_point, build_comps_index
+    from src.dataset import load_dataset
+
+    k = k or Config.COMPS_K
+    listings = load_dataset(Config.COMPS_COLUMNS).dropna()
+    rng = np.random.default_rng(1)
+    sample = listings.iloc[rng.integers(len(listings), size=n_queries)]
+    queries = [
+        (int(row.BEDS), int(row.BATH), float(row.PROPERTYSQFT), row.LOCALITY, float(row.LATITUDE), float(row.LONGITUDE))
+        for row in sample.itertuples()
+    ]
+
+    results = []
+    for scale in scales:
+        with tempfile.TemporaryDirectory(prefix='benchmark-comps-') as scratch:
+            directory = Path(scratch) / 'comps'
+            start = time.perf_counter()
+            build_comps_index(directory, listings_df=synthetic_listings(listings, scale))
+            build_seconds = time.perf_counter() - start
+
+            index = ComparablesIndex.load(directory)
+            # baseline : scan seluruh listing dari LOCALITY yang sama
+            geo_points = index.arrays['geo_points']
+            codes = index.arrays['locality'][index.arrays['geo_order']]
+
+            def scan(query):
+                beds, bath, sqft, locality, latitude, longitude = query
+                point = _query_point(beds, bath, sqft, latitude, longitude)
+                candidates = geo_points[codes == index.locality_code[locality]]
+                distance = ((candidates - point) ** 2).sum(axis=1)
+                return np.argpartition(distance, min(k, len(distance)) - 1)[:k]
+
+            results.append({
+                'scale': scale,
+                'n_listings': index.n_listings,
+                'build_seconds': round(build_seconds, 3),
+                'search_geo_ms': _time(lambda query: index.search(*query, k=k), queries),
+                'search_attributes_ms': _time(lambda query: index.search(*query[:4], k=k), queries),
+                'full_scan_ms': _time(scan, queries),
+            })
+    return {'k': k, 'leaf_size': Config.COMPS_LEAF_SIZE, 'scales': results}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the comparable-listings index")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--output', help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(tuple(args.scales), args.queries)
+    print(json.dumps(results, indent=4))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
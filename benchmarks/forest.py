@@ -0,0 +1,93 @@
+"""Compiled NumPy forest vs the XGBoost model it was exported from.
+
+Scores the same encoded batches with the pickled Pipeline (``model.predict``),
+the native booster (``inplace_predict``) and the compiled forest, e.g.
+
+    python -m benchmarks.forest --batch-sizes 1 64 1024 10000
+
+Reports per-batch latency percentiles, rows per second and the largest
+difference from ``model.predict`` for each engine.
+"""
+import argparse
+import json
+import time
+import numpy as np
+from benchmarks.common import percentiles
+
+
+def _time_batches(predict, batches, warmup=5):
+    for batch in batches[:warmup]:
+        predict(batch)
+    samples_ms = []
+    for batch in batches:
+        start = time.perf_counter()
+        predict(batch)
+        samples_ms.append((time.perf_counter() - start) * 1000)
+    return samples_ms
+
+
+def run(batch_sizes=(1, 64, 1024, 10000), rows_per_size=20000, max_batches=2000):
+    """Time every engine on ``rows_per_size`` rows per batch size (at most ``max_batches`` batches)."""
+    from src.forest import parity_features
+    from src.inference import BoosterPredictor, ForestPredictor, PipelinePredictor, CompiledEncoder
+    from src.registry import ArtifactPaths, current_version
+
+    version = current_version()
+    paths = ArtifactPaths.for_version(version) if version is not None else ArtifactPaths.files()
+    engines = {
+        'model.predict': PipelinePredictor.load(paths.model),
+        'booster.inplace_predict': BoosterPredictor.load(paths.booster),
+        'forest': ForestPredictor.load(paths.forest),
+    }
+    for predictor in engines.values():
+        predictor.set_threads(1)
+
+    with open(paths.encoder, 'rb') as f:
+        import pickle
+
+        encoder = pickle.load(f)
+    compiled_encoder = CompiledEncoder(encoder, engines['booster.inplace_predict'].feature_names)
+    features = parity_features(compiled_encoder, n_rows=max(rows_per_size, max(batch_sizes)), seed=7)
+
+    reference = engines['model.predict'].predict(features)
+    max_diff = {
+        name: float(np.max(np.abs(np.asarray(predictor.predict(features)) - reference)))
+        for name, predictor in engines.items()
+    }
+
+    sizes = []
+    for batch_size in batch_sizes:
+        n_batches = min(max_batches, max(1, rows_per_size // batch_size))
+        batches = [features[offset:offset + batch_size] for offset in range(0, n_batches * batch_size, batch_size)]
+        result = {'batch_size': batch_size, 'n_batches': len(batches)}
+        for name, predictor in engines.items():
+            samples_ms = _time_batches(predictor.predict, batches)
+            result[name] = {
+                'latency_ms': percentiles(samples_ms),
+                'rows_per_second': round(batch_size * len(samples_ms) / (sum(samples_ms) / 1000), 1),
+            }
+        sizes.append(result)
+
+    forest = engines['forest'].forest
+    return {
+        'version': version,
+        'n_trees': forest.n_trees,
+        'n_nodes': len(forest.feature),
+        'max_depth': forest.max_depth,
+        'max_abs_diff_vs_model_predict': max_diff,
+        'batch_sizes': sizes,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the compiled forest against model.predict")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 64, 1024, 10000])
+    parser.add_argument('--rows', type=int, default=20000, help="rows scored per batch size")
+    parser.add_argument('--output', help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(tuple(args.batch_sizes), args.rows)
+    print(json.dumps(results, indent=4))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
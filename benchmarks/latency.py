@@ -0,0 +1,66 @@
+"""In-process prediction latency of the serving model, without HTTP."""
+import time
+import numpy as np
+from config.config import Config
+from benchmarks.common import percentiles
+
+
+def request_keys(n, seed=0):
+    """Deterministic, mostly distinct (BEDS, BATH, PROPERTYSQFT, LOCALITY, *extra) request keys."""
+    from src.inference import EXTRA_CATEGORICAL, KEY_COORDINATES
+
+    rng = np.random.default_rng(seed)
+    beds = Config.get_feature_range('BEDS')
+    bath = Config.get_feature_range('BATH')
+    sqft = Config.get_feature_range('PROPERTYSQFT')
+    localities = Config.LOCALITY_COLUMN
+    return [
+        (int(rng.integers(beds['min'], beds['max'] + 1)),
+         int(rng.integers(bath['min'], bath['max'] + 1)),
+         int(rng.integers(sqft['min'], 5000)),
+         localities[int(rng.integers(len(localities)))],
+         *[None] * len(EXTRA_CATEGORICAL),
+         *[float(rng.uniform(Config.get_feature_range(col)['min'], Config.get_feature_range(col)['max']))
+           for col in KEY_COORDINATES])
+        for _ in range(n)
+    ]
+
+
+def run(n_requests=2000, n_batches=300, batch_size=64, warmup=100):
+    """Time ``predict_row`` per request and ``predict_keys`` per batch of ``batch_size`` keys."""
+    from src.inference import ServingModel
+    from train import peak_rss_mb
+
+    start = time.perf_counter()
+    serving = ServingModel.load()
+    serving.warm()
+    load_seconds = time.perf_counter() - start
+
+    for key in request_keys(warmup, seed=1):
+        serving.predict_row(*key)
+
+    keys = request_keys(n_requests)
+    row_ms = []
+    for key in keys:
+        start = time.perf_counter()
+        serving.predict_row(*key)
+        row_ms.append((time.perf_counter() - start) * 1000)
+
+    batch_keys = request_keys(n_batches * batch_size, seed=3)
+    batch_ms = []
+    for offset in range(0, len(batch_keys), batch_size):
+        batch = batch_keys[offset:offset + batch_size]
+        start = time.perf_counter()
+        serving.predict_keys(batch)
+        batch_ms.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'version': serving.version,
+        'backend': serving.predictor.backend,
+        'mode': 'lite' if serving.lite else 'full',
+        'prediction_table': serving.table is not None,
+        'load_seconds': round(load_seconds, 4),
+        'predict_row_ms': percentiles(row_ms),
+        'predict_keys_ms': {**percentiles(batch_ms), 'batch_size': batch_size},
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
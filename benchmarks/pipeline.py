@@ -0,0 +1,65 @@
+"""Per-stage timings of the training pipeline on ``Config.DATA_PATH``.
+
+Runs against a scratch copy of the artifact directory, so the model,
+encoder, stage caches and registry in ``artifact/`` are left untouched.
+"""
+import tempfile
+import time
+from pathlib import Path
+from config.config import Config
+
+
+def use_scratch_artifacts(directory):
+    """Point every Config path under ARTIFACTS_DIR, except the dataset, at ``directory``."""
+    root = Config.ARTIFACTS_DIR
+    for name, value in list(vars(Config).items()):
+        if name != 'DATA_PATH' and isinstance(value, Path) and value.is_relative_to(root):
+            setattr(Config, name, directory / value.relative_to(root))
+
+
+def run(full_search=False):
+    """Time ``load_prepare_data`` (cold and cached), the encoding step and ``train_model``.
+
+    Without ``full_search`` the search grid is narrowed to the best parameters
+    of the last search, so ``train_model`` times one CV round plus the refit
+    instead of the whole grid.
+    """
+    from src.data_preparation import encoding_feature, load_prepare_data, run_split_stages
+    from src.model import create_pipeline, last_best_params, train_model
+    from src.stages import StageCache
+    from train import peak_rss_mb
+
+    params = None if full_search else {name: [value] for name, value in last_best_params().items()}
+
+    with tempfile.TemporaryDirectory(prefix='benchmark-artifacts-') as scratch:
+        use_scratch_artifacts(Path(scratch))
+        if params is not None:
+            Config.PARAMS = params
+
+        seconds = {}
+        start = time.perf_counter()
+        X_train, X_test, y_train, y_test = load_prepare_data(force=True)
+        seconds['load_prepare_data_cold'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        load_prepare_data()
+        seconds['load_prepare_data_cached'] = time.perf_counter() - start
+
+        split, _ = run_split_stages(StageCache())
+        start = time.perf_counter()
+        encoding_feature(split['X_train'], split['X_train'], split['X_test'])
+        seconds['encoding'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        train_model(create_pipeline(), X_train, y_train)
+        seconds['train_model'] = time.perf_counter() - start
+
+    return {
+        'ingestion_mode': Config.INGESTION_MODE,
+        'sparse_encoding': Config.SPARSE_ENCODING,
+        'full_search': full_search,
+        'n_train_rows': int(X_train.shape[0]),
+        'n_features': int(X_train.shape[1]),
+        'seconds': {name: round(value, 4) for name, value in seconds.items()},
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
@@ -0,0 +1,82 @@
+"""Dense vs sparse (CSR) one-hot encoding: matrix size, peak memory and fit time.
+
+Uses the categorical columns from ``Config.CATEGORICAL_COLUMNS``, e.g.
+
+    CATEGORICAL_COLUMNS=LOCALITY,SUBLOCALITY,STREET_NAME,BROKERTITLE python -m benchmarks.sparse_encoding
+
+Each mode runs in a fresh process so the peak RSS numbers do not mix.
+"""
+import argparse
+import json
+import multiprocessing
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import scipy.sparse as sp
+from sklearn.metrics import r2_score
+from sklearn.preprocessing import OneHotEncoder
+from config.config import Config
+from src.data_preparation import apply_encoding, clean_data, split_data
+from src.dataset import load_dataset
+from src.model import create_pipeline
+
+
+def matrix_nbytes(X):
+    if sp.issparse(X):
+        return int(X.data.nbytes + X.indices.nbytes + X.indptr.nbytes)
+    return int(X.memory_usage(deep=True).sum())
+
+
+def run_mode(sparse, repeat):
+    X_train, X_test, y_train, y_test = split_data(clean_data(load_dataset()))
+    categorical_columns = X_train.select_dtypes(include=['object']).columns.tolist()
+
+    start = time.perf_counter()
+    one_hot = OneHotEncoder(sparse_output=sparse, handle_unknown='ignore')
+    one_hot.fit(X_train[categorical_columns])
+    X_train_encoded = apply_encoding(X_train, one_hot)
+    X_test_encoded = apply_encoding(X_test, one_hot)
+    encode_time = time.perf_counter() - start
+
+    fit_times = []
+    for _ in range(repeat):
+        model = create_pipeline().set_params(regressor__missing=0.0 if sparse else np.nan)
+        start = time.perf_counter()
+        model.fit(X_train_encoded, y_train)
+        fit_times.append(time.perf_counter() - start)
+
+    return {
+        'mode': 'sparse' if sparse else 'dense',
+        'categorical_columns': categorical_columns,
+        'n_features': int(X_train_encoded.shape[1]),
+        'train_matrix_bytes': matrix_nbytes(X_train_encoded),
+        'encode_seconds': round(encode_time, 4),
+        'fit_seconds': round(float(np.median(fit_times)), 4),
+        'test_r2': round(float(r2_score(y_test, model.predict(X_test_encoded))), 4),
+        # ru_maxrss dalam KB di Linux
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main(repeat=3, output=None):
+    results = []
+    for sparse in (False, True):
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            results.append(pool.submit(run_mode, sparse, repeat).result())
+
+    print(json.dumps(results, indent=4))
+    if output:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=4)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark dense vs sparse one-hot encoding")
+    parser.add_argument('--repeat', type=int, default=3, help="fits per mode, the median is reported")
+    parser.add_argument('--output', help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    main(repeat=args.repeat, output=args.output)
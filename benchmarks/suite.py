@@ -0,0 +1,176 @@
+"""Benchmark suite for the API and the training pipeline.
+
+    python -m benchmarks.suite run                          # all sections
+    python -m benchmarks.suite run --sections latency throughput --save-baseline
+    python -m benchmarks.suite compare                      # last results vs baseline
+
+``run`` writes ``Config.BENCHMARK_RESULTS_PATH``; ``compare`` exits with
+code 1 when a metric got worse than the baseline by more than the tolerance.
+Each section runs in its own process, ``throughput`` starts its own uvicorn.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+from datetime import datetime, timezone
+from config.config import Config
+from benchmarks import comps, forest, latency, pipeline, throughput
+from benchmarks.common import run_isolated
+
+SECTIONS = {
+    'latency': latency.run,
+    'throughput': throughput.run,
+    'pipeline': pipeline.run,
+    'forest': forest.run,
+    'comps': comps.run,
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=Config.BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    return {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'serving_mode': Config.SERVING_MODE,
+        'inference_backend': Config.INFERENCE_BACKEND,
+    }
+
+
+def run(sections=None, output=None, options=None):
+    """Run the selected sections and write the results JSON."""
+    sections = sections or list(SECTIONS)
+    options = options or {}
+    results = {'environment': environment()}
+    for name in sections:
+        print(f"Running {name} benchmark...", file=sys.stderr)
+        results[name] = run_isolated(SECTIONS[name], **options.get(name, {}))
+
+    output = output or Config.BENCHMARK_RESULTS_PATH
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=4)
+    return results
+
+
+def comparable_metrics(results):
+    """Flatten results into {name: (value, higher_is_better)} for the metrics worth comparing."""
+    metrics = {}
+    if 'latency' in results:
+        section = results['latency']
+        for path in ('predict_row_ms', 'predict_keys_ms'):
+            for stat in ('p50', 'p95', 'p99'):
+                metrics[f"latency.{path}.{stat}"] = (section[path][stat], False)
+        metrics['latency.peak_rss_mb'] = (section['peak_rss_mb'], False)
+
+    if 'throughput' in results:
+        for level in results['throughput']['levels']:
+            prefix = f"throughput.c{level['concurrency']}"
+            metrics[f"{prefix}.throughput_rps"] = (level['throughput_rps'], True)
+            if level['latency_ms'] is not None:
+                metrics[f"{prefix}.latency_ms.p95"] = (level['latency_ms']['p95'], False)
+        if results['throughput'].get('server_peak_rss_mb') is not None:
+            metrics['throughput.server_peak_rss_mb'] = (results['throughput']['server_peak_rss_mb'], False)
+
+    if 'pipeline' in results:
+        for stage, seconds in results['pipeline']['seconds'].items():
+            metrics[f"pipeline.{stage}_seconds"] = (seconds, False)
+        metrics['pipeline.peak_rss_mb'] = (results['pipeline']['peak_rss_mb'], False)
+
+    if 'forest' in results:
+        for size in results['forest']['batch_sizes']:
+            metrics[f"forest.b{size['batch_size']}.latency_ms.p50"] = (size['forest']['latency_ms']['p50'], False)
+
+    if 'comps' in results:
+        for scale in results['comps']['scales']:
+            for path in ('search_geo_ms', 'search_attributes_ms'):
+                metrics[f"comps.x{scale['scale']}.{path}.p95"] = (scale[path]['p95'], False)
+    return metrics
+
+
+def compare(results, baseline, tolerance=None):
+    """Relative change of every shared metric, with the ones beyond ``tolerance`` flagged."""
+    tolerance = Config.BENCHMARK_TOLERANCE if tolerance is None else tolerance
+    current = comparable_metrics(results)
+    reference = comparable_metrics(baseline)
+
+    rows = []
+    for name in sorted(set(current) & set(reference)):
+        value, higher_is_better = current[name]
+        base, _ = reference[name]
+        change = (value - base) / base if base else 0.0
+        worse = -change if higher_is_better else change
+        rows.append({
+            'metric': name,
+            'baseline': base,
+            'current': value,
+            'change': round(change, 4),
+            'regression': worse > tolerance,
+        })
+    return rows
+
+
+def print_comparison(rows, tolerance):
+    print(f"{'metric':<45} {'baseline':>12} {'current':>12} {'change':>9}")
+    for row in rows:
+        flag = '  REGRESSION' if row['regression'] else ''
+        print(f"{row['metric']:<45} {row['baseline']:>12.4f} {row['current']:>12.4f} {row['change']:>+9.1%}{flag}")
+    regressions = sum(row['regression'] for row in rows)
+    print(f"{regressions} regression(s) beyond {tolerance:.0%} out of {len(rows)} metrics")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the API and the training pipeline")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="run benchmarks and write the results JSON")
+    run_parser.add_argument('--sections', nargs='+', choices=list(SECTIONS), help="default: all sections")
+    run_parser.add_argument('--output', help=f"default: {Config.BENCHMARK_RESULTS_PATH}")
+    run_parser.add_argument('--requests', type=int, default=2000, help="latency samples per path")
+    run_parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+    run_parser.add_argument('--http-requests', type=int, default=500, help="requests per concurrency level")
+    run_parser.add_argument('--full-search', action='store_true', help="time train_model with the full search grid")
+    run_parser.add_argument('--save-baseline', action='store_true', help="also store the results as the baseline")
+
+    compare_parser = commands.add_parser('compare', help="compare results against the stored baseline")
+    compare_parser.add_argument('--results', help=f"default: {Config.BENCHMARK_RESULTS_PATH}")
+    compare_parser.add_argument('--baseline', help=f"default: {Config.BENCHMARK_BASELINE_PATH}")
+    compare_parser.add_argument('--tolerance', type=float, default=Config.BENCHMARK_TOLERANCE)
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        results = run(args.sections, args.output, {
+            'latency': {'n_requests': args.requests},
+            'throughput': {'concurrency': tuple(args.concurrency), 'n_requests': args.http_requests},
+            'pipeline': {'full_search': args.full_search},
+        })
+        print(json.dumps(results, indent=4))
+        if args.save_baseline:
+            shutil.copyfile(args.output or Config.BENCHMARK_RESULTS_PATH, Config.BENCHMARK_BASELINE_PATH)
+            print(f"Baseline saved to {Config.BENCHMARK_BASELINE_PATH}", file=sys.stderr)
+        return 0
+
+    with open(args.results or Config.BENCHMARK_RESULTS_PATH, 'r') as f:
+        results = json.load(f)
+    with open(args.baseline or Config.BENCHMARK_BASELINE_PATH, 'r') as f:
+        baseline = json.load(f)
+    rows = compare(results, baseline, args.tolerance)
+    print_comparison(rows, args.tolerance)
+    return 1 if any(row['regression'] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
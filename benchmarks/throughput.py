@@ -0,0 +1,123 @@
+"""Requests per second of ``POST /predict`` against a local uvicorn server."""
+import http.client
+import json
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config.config import Config
+from benchmarks.common import percentiles
+from benchmarks.latency import request_keys
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port):
+    """Start ``uvicorn app:app`` in the background, with the current environment."""
+    return subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'app:app', '--host', '127.0.0.1', '--port', str(port),
+         '--log-level', 'warning'],
+        cwd=Config.BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+def wait_ready(server, port, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {server.returncode} before it was ready")
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+        try:
+            connection.request('GET', '/model/version')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        finally:
+            connection.close()
+        time.sleep(0.2)
+    raise TimeoutError(f"uvicorn not ready after {timeout}s")
+
+
+def server_peak_rss_mb(pid):
+    """Peak RSS of the server process from /proc (Linux), None elsewhere."""
+    try:
+        with open(f"/proc/{pid}/status", 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        return None
+    return None
+
+
+def run_level(port, concurrency, payloads):
+    """Send every payload with ``concurrency`` client threads, one keep-alive connection per thread."""
+    local = threading.local()
+    connections = []
+    headers = {'Content-Type': 'application/json'}
+
+    def send(payload):
+        connection = getattr(local, 'connection', None)
+        if connection is None:
+            connection = local.connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            connections.append(connection)
+        body = json.dumps(payload)
+        start = time.perf_counter()
+        connection.request('POST', '/predict', body=body, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        return (time.perf_counter() - start) * 1000, response.status
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(send, payloads))
+    elapsed = time.perf_counter() - start
+    for connection in connections:
+        connection.close()
+
+    latencies = [ms for ms, status in results if status == 200]
+    return {
+        'concurrency': concurrency,
+        'requests': len(payloads),
+        'errors': sum(status != 200 for _, status in results),
+        'throughput_rps': round(len(latencies) / elapsed, 2),
+        'latency_ms': percentiles(latencies) if latencies else None,
+    }
+
+
+def run(concurrency=(1, 4, 16), n_requests=500):
+    """Throughput at each concurrency level. Every request is a different listing, so the cache misses."""
+    port = free_port()
+    server = start_server(port)
+    try:
+        wait_ready(server, port)
+        keys = request_keys(n_requests * (len(concurrency) + 1), seed=2)
+        payloads = [
+            {'PRICE': 200000, 'BEDS': beds, 'BATH': bath, 'PROPERTYSQFT': sqft, 'LOCALITY': locality}
+            for beds, bath, sqft, locality, *_ in keys
+        ]
+
+        # pemanasan koneksi dan model sebelum diukur
+        run_level(port, 1, payloads[:50])
+        levels = [
+            run_level(port, level, payloads[(idx + 1) * n_requests:(idx + 2) * n_requests])
+            for idx, level in enumerate(concurrency)
+        ]
+        return {
+            'serving_mode': Config.SERVING_MODE,
+            'executor': Config.INFERENCE_EXECUTOR,
+            'workers': Config.INFERENCE_WORKERS,
+            'batching': Config.BATCHING_ENABLED,
+            'levels': levels,
+            'server_peak_rss_mb': server_peak_rss_mb(server.pid),
+        }
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
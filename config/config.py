@@ -13,10 +13,32 @@ class Config:
     # Data paths
     DATA_PATH = ARTIFACTS_DIR / "NY-House-Dataset.csv"
     MODEL_PATH = ARTIFACTS_DIR / "best_model.pkl"
+    BOOSTER_PATH = ARTIFACTS_DIR / "best_model.ubj"
+    BUNDLE_PATH = ARTIFACTS_DIR / "bundle.json"
+    FOREST_PATH = ARTIFACTS_DIR / "best_model_forest.npz"
+    SPATIAL_INDEX_PATH = ARTIFACTS_DIR / "spatial_index.pkl"
+    COMPS_INDEX_DIR = ARTIFACTS_DIR / "comps"
+    PREDICTION_TABLE_PATH = ARTIFACTS_DIR / "prediction_table.npy"
+    PREDICTION_TABLE_META_PATH = ARTIFACTS_DIR / "prediction_table.json"
     ENCODING_PATH = ARTIFACTS_DIR / "encoder.pkl"
     METRICS_PATH = ARTIFACTS_DIR / "metrics.json"
     ALL_METRICS_PATH = ARTIFACTS_DIR / "all_metrics.json"
     BEST_ESTIMATOR_PATH = ARTIFACTS_DIR / "best_estimators.json"
+    CV_RESULTS_PATH = ARTIFACTS_DIR / "cv_results.json"
+    CV_CACHE_DIR = ARTIFACTS_DIR / "cv_cache"
+    
+    # columnar (Parquet) cache dari dataset CSV
+    DATASET_CACHE_DIR = ARTIFACTS_DIR / "cache"
+    DATASET_CACHE_PATH = DATASET_CACHE_DIR / "NY-House-Dataset.parquet"
+    DATASET_CACHE_META_PATH = DATASET_CACHE_DIR / "NY-House-Dataset.json"
+    STAGE_CACHE_DIR = ARTIFACTS_DIR / "stages"
+    STAGE_CACHE_ENABLED = True
+    
+    # registry artefak ber-versi (hash isi), file CURRENT menunjuk versi yang dipakai API
+    REGISTRY_DIR = ARTIFACTS_DIR / "registry"
+    REGISTRY_CURRENT_PATH = REGISTRY_DIR / "CURRENT"
+    REGISTRY_ENABLED = True
+    REGISTRY_KEEP = 5  # jumlah versi yang disimpan, versi CURRENT tidak pernah dihapus
     
     #CSS PATH
     PROFILE_CSS = ASSETS_DIR/ "profile.css"
@@ -26,14 +48,46 @@ class Config:
     TEST_SIZE = 0.2
     TARGET_COLUMN = "PRICE"
     
+    # kolom kategorikal yang di-one-hot, bisa ditambah SUBLOCALITY, STREET_NAME, BROKERTITLE
+    CATEGORICAL_COLUMNS = os.getenv('CATEGORICAL_COLUMNS', 'LOCALITY').split(',')
+    # one-hot sebagai CSR sparse dari encoding sampai inference (untuk kardinalitas tinggi)
+    SPARSE_ENCODING = os.getenv('SPARSE_ENCODING', 'false').lower() == 'true'
+    
     #feature coloumns for model 
-    FEATURE_COLUMN = ['PRICE', 'BEDS', 'BATH', 'PROPERTYSQFT', 'LOCALITY']
+    FEATURE_COLUMN = ['PRICE', 'BEDS', 'BATH', 'PROPERTYSQFT'] + CATEGORICAL_COLUMNS
     
+    # fitur spasial : median harga k listing training terdekat (k-d tree dari LATITUDE/LONGITUDE)
+    SPATIAL_FEATURES = os.getenv('SPATIAL_FEATURES', 'false').lower() == 'true'
+    COORDINATE_COLUMNS = ['LATITUDE', 'LONGITUDE']  # opsional di request, tanpa koordinat dipakai median lokasi LOCALITY
+    SPATIAL_FEATURE_COLUMNS = ['KNN_LOG_PRICE', 'KNN_LOG_PRICE_PER_SQFT', 'KNN_DISTANCE_KM']
+    SPATIAL_K = 10
+    SPATIAL_REFERENCE_LATITUDE = 40.7  # lintang tengah NYC untuk proyeksi ke km
+    
+    
+    # columns yang disimpan di columnar cache beserta tipe datanya
+    DATASET_CACHE_ENABLED = True
+    DATASET_COLUMNS = FEATURE_COLUMN + (COORDINATE_COLUMNS if SPATIAL_FEATURES else [])
+    DATASET_DTYPES = {
+        'PRICE': 'int64',
+        'BEDS': 'int64',
+        'BATH': 'float64',
+        'PROPERTYSQFT': 'float64',
+        'LOCALITY': 'object',
+        'SUBLOCALITY': 'object',
+        'STREET_NAME': 'object',
+        'BROKERTITLE': 'object',
+        'ADDRESS': 'object',
+        'LATITUDE': 'float64',
+        'LONGITUDE': 'float64',
+    }
+    # dibaca float64 dari CSV (sel kosong = NaN), di-cast int64 setelah baris NA dibuang
+    DATASET_INT_COLUMNS = ['PRICE', 'BEDS']
     
     # feature LOCALITY 
     LOCALITY_COLUMN = ['New York', 'New York County', 'The Bronx', 'Kings County',
        'Bronx County', 'Queens County', 'Richmond County',
        'United States', 'Brooklyn', 'Queens', 'Flatbush']
+    DEFAULT_LOCALITY = 'New York'
     
     #feature description
     FEATURE_DESCRIPTIONS = {
@@ -65,6 +119,18 @@ class Config:
     # drop columns
     DROP_COLUMNS = ['TYPE','STATE','ADDRESS','MAIN_ADDRESS','ADMINISTRATIVE_AREA_LEVEL_2','STREET_NAME', 'LONG_NAME', 'FORMATTED_ADDRESS','LONGITUDE', 'LATITUDE','BROKERTITLE','SUBLOCALITY']
     
+    # ingestion : 'memory' (satu DataFrame) atau 'chunked' (streaming untuk data besar)
+    INGESTION_MODE = os.getenv('INGESTION_MODE', 'memory')
+    CHUNK_SIZE = int(os.getenv('CHUNK_SIZE', 100000))
+    OUTLIER_RULE = 'range'  # 'range' (DATA_VALIDATION) atau 'iqr'
+    IQR_SAMPLE_SIZE = 100000
+    
+    # design matrix di file memmap (float32 numerik, uint8 one-hot), training dibaca dari file
+    # ingestion chunked selalu lewat matrix store, split tidak pernah di-load utuh
+    MATRIX_STORE_ENABLED = os.getenv('MATRIX_STORE_ENABLED', 'false').lower() == 'true' or INGESTION_MODE == 'chunked'
+    EXTERNAL_MEMORY = os.getenv('EXTERNAL_MEMORY', 'auto')  # 'auto', 'on' atau 'off'
+    EXTERNAL_MEMORY_RAM_FRACTION = 0.5  # 'auto' : external memory jika matrix > fraksi RAM tersedia
+    
     # change type int 
     BATH = 'BATH'
     PROPERTYSQFT = 'PROPERTYSQFT'
@@ -77,6 +143,20 @@ class Config:
         'regressor__learning_rate' : [0.05, 0.01, 0.1], 
         }
     CV_FOLDS = 5
+    XGB_N_JOBS = -1
+    
+    # hyperparameter search : 'grid', 'random', 'halving' atau 'halving_random'
+    SEARCH_STRATEGY = os.getenv('SEARCH_STRATEGY', 'grid')
+    SEARCH_N_ITER = 20  # jumlah kandidat untuk 'random' dan 'halving_random'
+    SEARCH_N_JOBS = 0  # 0 = otomatis, seimbang dengan thread XGBoost
+    HALVING_FACTOR = 3
+    CV_CACHE_ENABLED = True  # key : data, kandidat, parameter pipeline lain, versi xgboost dan sklearn
+    
+    # training mode : 'search' (n_estimators ikut di-grid) atau 'early_stopping'
+    TRAINING_MODE = os.getenv('TRAINING_MODE', 'search')
+    EARLY_STOPPING_ROUNDS = 20
+    EARLY_STOPPING_MAX_ESTIMATORS = max(PARAMS['regressor__n_estimators'])
+    EARLY_STOPPING_VALIDATION_SIZE = 0.1
     SCORING = 'neg_mean_squared_error'
     
     
@@ -86,6 +166,83 @@ class Config:
     API_VERSION = "1.0.0"
     HOST = "0.0.0.0"
     PORT = 8000
+    BATCH_MAX_RECORDS = 10000
+    VERIFY_ENCODER_PARITY = True
+    
+    # inference backend : 'pipeline' (pickle sklearn Pipeline), 'booster' (native XGBoost)
+    # atau 'forest' (tree dikompilasi ke array NumPy, tanpa XGBoost saat serving)
+    INFERENCE_BACKEND = os.getenv('INFERENCE_BACKEND', 'pipeline')
+    VERIFY_BACKEND_PARITY = True
+    EXPORT_FOREST = True
+    FOREST_CHUNK_ROWS = 64  # baris per langkah evaluasi, buffer (baris x tree) tetap di cache CPU
+    FOREST_PARITY_RTOL = 1e-6  # toleransi terhadap booster XGBoost (log price), biasanya selisihnya nol
+    
+    # serving mode : 'full' (pickle + parity check) atau 'lite' (hanya booster native/forest + bundle.json)
+    SERVING_MODE = os.getenv('SERVING_MODE', 'full')
+    EXPORT_BUNDLE = True
+    
+    # prediction cache (LRU + TTL)
+    CACHE_ENABLED = True
+    CACHE_MAX_SIZE = 10000
+    CACHE_TTL = 3600
+    ARTIFACT_CHECK_INTERVAL = 5  # detik, interval watcher artefak / pointer CURRENT
+    
+    # precomputed prediction table (grid BEDS x BATH x LOCALITY x PROPERTYSQFT)
+    BUILD_PREDICTION_TABLE = True
+    PREDICTION_TABLE_ENABLED = os.getenv('PREDICTION_TABLE_ENABLED', 'false').lower() == 'true'
+    TABLE_SQFT_STEP = 50
+    TABLE_INTERPOLATE = False
+    TABLE_BATCH_SIZE = 100000
+    
+    # comparable listings (/comps) : k-d tree per LOCALITY di array memmap, dibangun saat training
+    BUILD_COMPS_INDEX = True
+    COMPS_COLUMNS = ['ADDRESS', 'PRICE', 'BEDS', 'BATH', 'PROPERTYSQFT', 'LOCALITY', 'LATITUDE', 'LONGITUDE']
+    COMPS_K = 10
+    COMPS_MAX_K = 100
+    COMPS_LEAF_SIZE = 32  # listing per leaf, dibandingkan sekaligus dengan numpy
+    # satu satuan jarak similarity : 1 kamar tidur = 1 kamar mandi = 0.25 log sqft (~28%) = 1 km
+    COMPS_SCALES = {'BEDS': 1.0, 'BATH': 1.0, 'PROPERTYSQFT': 0.25, 'DISTANCE_KM': 1.0}
+    
+    # bulk scoring offline (python score.py) : file dibaca per chunk, di-score di process pool
+    SCORE_CHUNK_ROWS = int(os.getenv('SCORE_CHUNK_ROWS', 50000))
+    SCORE_WORKERS = int(os.getenv('SCORE_WORKERS', os.cpu_count() or 1))
+    SCORE_BACKEND = os.getenv('SCORE_BACKEND', 'booster')  # booster paling cepat untuk batch besar
+    SCORE_PREDICTION_COLUMN = 'PREDICTED_PRICE'
+    SCORE_ERROR_COLUMN = 'SCORE_ERROR'
+    # BATH dan PROPERTYSQFT dipotong ke integer seperti saat training (astype(int)) sebelum validasi
+    SCORE_COERCE = os.getenv('SCORE_COERCE','true').lower()=='true'
+    
+    # inference executor : 'thread' atau 'process'
+    INFERENCE_EXECUTOR = os.getenv('INFERENCE_EXECUTOR', 'thread')
+    INFERENCE_WORKERS = int(os.getenv('INFERENCE_WORKERS', 2))
+    INFERENCE_QUEUE_SIZE = int(os.getenv('INFERENCE_QUEUE_SIZE', 64))
+    RETRY_AFTER_SECONDS = 1
+    WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', 1))  # jumlah worker uvicorn
+    XGB_SERVING_THREADS = int(os.getenv('XGB_SERVING_THREADS', 0))  # 0 = otomatis
+    
+    # micro-batching untuk request /predict yang datang bersamaan
+    BATCHING_ENABLED = os.getenv('BATCHING_ENABLED', 'false').lower() == 'true'
+    BATCH_WINDOW_MS = float(os.getenv('BATCH_WINDOW_MS', 2))
+    BATCH_MAX_SIZE = int(os.getenv('BATCH_MAX_SIZE', 64))
+    
+    # metrics Prometheus di GET /metrics, timer per stage tidak aktif jika false
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_BUCKETS = [0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5]
+    
+    # logging : queue + listener di background thread, file per logger di LOGS_DIR
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')  # 'text' atau 'json' (satu objek JSON per baris)
+    LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 1.0))  # fraksi log per-request yang ditulis
+    LOG_ROTATION = os.getenv('LOG_ROTATION', 'size')  # 'size' atau 'time'
+    LOG_MAX_BYTES = 10 * 1024 * 1024
+    LOG_ROTATE_WHEN = 'midnight'
+    LOG_BACKUP_COUNT = 7
+    LOG_QUEUE_SIZE = 10000  # record dibuang (dihitung) jika antrian penuh, request tidak pernah menunggu
+    
+    # benchmark suite (python -m benchmarks.suite)
+    BENCHMARK_RESULTS_PATH = ARTIFACTS_DIR / "benchmark_results.json"
+    BENCHMARK_BASELINE_PATH = ARTIFACTS_DIR / "benchmark_baseline.json"
+    BENCHMARK_TOLERANCE = 0.25  # perubahan relatif yang dianggap regresi, run identik bisa beda ~20%
     
     
     
@@ -94,7 +251,11 @@ class Config:
     PAGE_TITLE = "Dataset Summary Dashboard"
     PAGE_ICON = "🐋"
     LAYOUT = "wide"
-    
+    # ringkasan dataset dashboard dihitung sekali per proses (utils/dashboard.py)
+    DASHBOARD_HIST_BINS = 30
+    # 'aggregate' : histogram & box plot digambar dari bin/kuartil, 'raw' : semua baris dikirim ke browser
+    DASHBOARD_CHART_MODE = os.getenv('DASHBOARD_CHART_MODE', 'aggregate')
+
     # path assets STREAMLIT
     RESUME_PATH = ASSETS_DIR / "CV Mahindra.pdf"
     PROFILE_PATH = ASSETS_DIR / "profile.jpeg" 
@@ -115,9 +276,9 @@ class Config:
     }
     
     @classmethod
-    def is_valid_feature_value(cls, feature, value):
-        """Check if a feature value is within valid range."""
-        ranges = cls.get_feature_range(feature)
+    def is_valid_feature_value(cls, feature, value, ranges=None):
+        """Check if a feature value is within valid range (``ranges`` overrides the configured one)."""
+        ranges = cls.get_feature_range(feature) if ranges is None else ranges
         
         #jika fitur kategorikal (berupa list)
         if isinstance(ranges,list):
@@ -150,7 +311,9 @@ class Config:
             "BEDS" : {'min' : 1, 'max': 10},
             "BATH" : {'min' : 1, 'max': 5},
             "PROPERTYSQFT" :  {'min' : 100, 'max': 100000},
-            "LOCALITY" : cls.LOCALITY_COLUMN
+            "LOCALITY" : cls.LOCALITY_COLUMN,
+            "LATITUDE" : {'min' : 40.4, 'max' : 41.0},
+            "LONGITUDE" : {'min' : -74.3, 'max' : -73.6}
         }
         return range.get(feature,None)
     
\ No newline at end of file
@@ -6,6 +6,8 @@ import plotly.graph_objects as go
 import numpy as np
 import seaborn as sns
 from config.config import Config
+from utils.charts import box_figure, histogram_figure
+from utils.dashboard import load_dashboard_data
 import json
 from utils.styling import load_css
 
@@ -15,37 +17,6 @@ load_css()
 
 
     
-def hitung_outlier_iqr(series):
-    """Menghitung jumlah outlier menggunakan Rentang Interkuartil (IQR)."""
-    Q1 = series.quantile(0.25)
-    Q3 = series.quantile(0.75)
-    IQR = Q3 - Q1
-    
-    # Batas atas dan bawah
-    batas_bawah = Q1 - 1.5 * IQR
-    batas_atas = Q3 + 1.5 * IQR
-    
-    # Hitung outlier
-    outlier_count = ((series < batas_bawah) | (series > batas_atas)).sum()
-    
-    # Hitung persentase
-    total_data = len(series)
-    outlier_percent = (outlier_count / total_data) * 100 if total_data > 0 else 0
-    
-    return outlier_count, outlier_percent, total_data
-
-
-
-# Load and cache data with proper cache decorator
-@st.cache_data(ttl=3600)
-def load_data():
-    """Load and cache the dataset"""
-    try:
-        return pd.read_csv(Config.DATA_PATH)
-    except Exception as e:
-        st.error(f"Error loading data: {e}")
-        return None
-
 @st.cache_data(ttl=3600)
 def load_model_artifacts():
     """Load and cache model metrics and feature importance"""
@@ -64,13 +35,10 @@ def load_model_artifacts():
 
 try:
     # Load data and model artifacts
-    df = load_data()
+    df, summary = load_dashboard_data()
     metrics = load_model_artifacts()
 
     if df is not None:
-        df_numeric = df[Config.FEATURE_COLUMN].select_dtypes(include='number')
-        feature_columns = df[Config.FEATURE_COLUMN]
-        
         
         st.title("📊 Data Analytics & Model Performance")
 
@@ -91,38 +59,46 @@ try:
             col1, col2 = st.columns(2)
             
             with col1:
-                fig = px.histogram(
-                    df, 
-                    x=feature,
-                    marginal="box",
-                    title=f"Distribution of {feature}"
-                )
+                if Config.DASHBOARD_CHART_MODE == 'aggregate':
+                    fig = histogram_figure(
+                        summary['features'][feature],
+                        title=f"Distribution of {feature}",
+                        marginal_box=True
+                    )
+                else:
+                    fig = px.histogram(
+                        df, 
+                        x=feature,
+                        marginal="box",
+                        title=f"Distribution of {feature}"
+                    )
                 st.plotly_chart(fig, use_container_width=True)
             
             with col2:
-                stats = df[feature].describe()
+                stats = summary['features'][feature]['describe']
                 st.dataframe(stats,use_container_width=True)
             
             
             col1, col2 = st.columns(2)
             with col1:
-                st.metric("♾️Duplicated Value",feature_columns.duplicated().sum())
+                st.metric("♾️Duplicated Value",summary['duplicated'])
                 
             
             # # --- HeatMap Correlation --- 
             
             
             # st.subheader(f"Correlation Heatmap")
-            # if df_numeric.shape[1] < 2:
+            # if summary['corr'].shape[1] < 2:
             #     st.warning("Anda memerlukan setidaknya dua kolom numerik untuk membuat heatmap")
             # else :
-            #     corr_matrix = df_numeric.corr()
+            #     corr_matrix = summary['corr']
             #     st.dataframe(corr_matrix.style.background_gradient(cmap="plasma",axis=None).format("{:.2f}"),use_container_width=True)
             
             
             # --- Hitung outlier ---
-            if df[feature].dtypes != "object" : 
-                count, percent, total = hitung_outlier_iqr(df[feature])
+            if summary['features'][feature]['numeric'] : 
+                outliers = summary['features'][feature]['outliers']
+                count, percent, total = outliers['count'], outliers['percent'], outliers['total']
                 delta_str = f"Target < 5.0%"
                 if percent > 5.0:
                     delta_color = "inverse" # Merah jika tinggi
@@ -164,11 +140,16 @@ try:
                 # --- Tampilan Visualisasi (Opsional) ---
                 st.subheader("Visualisasi Outlier (Box Plot)")
 
-                # Buat figure Matplotlib secara eksplisit
-                fig, ax = plt.subplots(figsize=(8, 4))
-                sns.boxplot(x=df[feature], ax=ax)
-                ax.set_title(f"Box Plot untuk {feature}")
-                st.pyplot(fig)
+                if Config.DASHBOARD_CHART_MODE == 'aggregate':
+                    # kuartil & whisker dari ringkasan, tanpa render Matplotlib tiap rerun
+                    fig = box_figure(summary['features'][feature], f"Box Plot untuk {feature}", name=feature)
+                    st.plotly_chart(fig, use_container_width=True)
+                else:
+                    # Buat figure Matplotlib secara eksplisit
+                    fig, ax = plt.subplots(figsize=(8, 4))
+                    sns.boxplot(x=df[feature], ax=ax)
+                    ax.set_title(f"Box Plot untuk {feature}")
+                    st.pyplot(fig)
             
 
         
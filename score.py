@@ -0,0 +1,35 @@
+import argparse
+from config.config import Config
+from src.scoring import score_file
+from utils.logger import setup_logger
+
+logger = setup_logger('score')
+
+
+def main(input_path, output_path, chunk_size=None, workers=None, backend=None, resume=False, overwrite=False,
+         coerce=None):
+    try :
+        logger.info(f"Scoring {input_path} -> {output_path}")
+        return score_file(input_path, output_path, chunk_size, workers, backend, resume, overwrite, coerce)
+
+    except Exception as e:
+        logger.error(f"Error Score {e}")
+        raise
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Score a listings file (CSV or Parquet) with the trained model")
+    parser.add_argument('input', help="listings file, .csv or .parquet")
+    parser.add_argument('output', help=".csv file or .parquet directory (one file per chunk)")
+    parser.add_argument('--chunk-size', type=int, default=Config.SCORE_CHUNK_ROWS, help="rows per chunk")
+    parser.add_argument('--workers', type=int, default=Config.SCORE_WORKERS, help="scoring processes, 1 = in-process")
+    parser.add_argument('--backend', default=Config.SCORE_BACKEND, choices=['pipeline', 'booster', 'forest'])
+    parser.add_argument('--resume', action='store_true', help="continue an interrupted run after its last complete chunk")
+    parser.add_argument('--overwrite', action='store_true', help="replace an existing output")
+    parser.add_argument(
+        '--coerce', action=argparse.BooleanOptionalAction, default=Config.SCORE_COERCE,
+        help="truncate BATH and PROPERTYSQFT to integers like training before validation"
+    )
+    args = parser.parse_args()
+
+    main(args.input, args.output, args.chunk_size, args.workers, args.backend, args.resume, args.overwrite, args.coerce)
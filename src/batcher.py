@@ -0,0 +1,151 @@
+import asyncio
+import threading
+from config.config import Config
+from src.executor import QueueFullError
+from utils.logger import setup_logger
+
+logger = setup_logger('batcher')
+
+
+class BatcherStoppedError(QueueFullError):
+    """Raised for requests still waiting for a batch when the batcher stops."""
+
+
+class MicroBatcher:
+    """Dynamic batching for concurrent single-row predictions.
+
+    Requests arriving within ``window_ms`` of the first one (or until
+    ``max_batch_size`` rows are collected) are scored with one vectorized
+    predict, and each caller's future is resolved with its own row and the
+    model version that scored it.
+    """
+
+    def __init__(self, executor, window_ms=None, max_batch_size=None):
+        self.executor = executor
+        self.window = (Config.BATCH_WINDOW_MS if window_ms is None else window_ms) / 1000
+        self.max_batch_size = max_batch_size or Config.BATCH_MAX_SIZE
+        self._queue = None
+        self._task = None
+        # request yang sudah diambil dari queue tapi batch-nya belum di-dispatch
+        self._collecting = []
+        self._running = False
+        # referensi ke batch yang sedang jalan, task tanpa referensi bisa di-garbage-collect
+        self._dispatches = set()
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.rows = 0
+        self.max_seen = 0
+        self.size_histogram = {}
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=Config.INFERENCE_QUEUE_SIZE * self.max_batch_size)
+        self._task = asyncio.create_task(self._run())
+        self._running = True
+        logger.info(f"Micro-batcher started, window {self.window * 1000:.1f} ms, max batch {self.max_batch_size}")
+
+    async def stop(self):
+        """Stop collecting, fail every request not yet dispatched and wait for the running batches."""
+        self._running = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        pending = self._collecting
+        self._collecting = []
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, _, future in pending:
+            if not future.done():
+                future.set_exception(BatcherStoppedError("Micro-batcher is shutting down"))
+
+        if self._dispatches:
+            await asyncio.gather(*self._dispatches, return_exceptions=True)
+        if pending:
+            logger.info(f"Micro-batcher stopped, {len(pending)} waiting request(s) rejected")
+
+    async def submit(self, serving, key):
+        if not self._running:
+            raise BatcherStoppedError("Micro-batcher is not running")
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((serving, key, future))
+        except asyncio.QueueFull:
+            raise QueueFullError("Micro-batch queue is full")
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = self._collecting = [await self._queue.get()]
+        deadline = loop.time() + self.window
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            self._collecting = []
+            self._record(len(batch))
+            # jalankan batch tanpa menahan pengumpulan batch berikutnya
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatch_done)
+
+    def _dispatch_done(self, task):
+        self._dispatches.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Error Micro-batch dispatch {task.exception()}")
+
+    async def _dispatch(self, batch):
+        # satu batch bisa berisi dua versi model tepat saat reload
+        groups = {}
+        for serving, key, future in batch:
+            groups.setdefault(id(serving), (serving, []))[1].append((key, future))
+
+        for serving, items in groups.values():
+            keys = [key for key, _ in items]
+            try:
+                predictions, version = await self.executor.predict_keys(serving, keys)
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), prediction in zip(items, predictions):
+                if not future.done():
+                    future.set_result((float(prediction), version))
+
+    def _record(self, size):
+        with self._lock:
+            self.batches += 1
+            self.rows += size
+            self.max_seen = max(self.max_seen, size)
+            bucket = 1
+            while bucket < size:
+                bucket *= 2
+            self.size_histogram[bucket] = self.size_histogram.get(bucket, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "window_ms": self.window * 1000,
+                "max_batch_size": self.max_batch_size,
+                "batches": self.batches,
+                "rows": self.rows,
+                "mean_batch_size": self.rows / self.batches if self.batches else 0.0,
+                "max_batch_size_seen": self.max_seen,
+                # key = batas atas bucket (1, 2, 4, ...)
+                "batch_size_histogram": dict(sorted(self.size_histogram.items())),
+            }
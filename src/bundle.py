@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+from config.config import Config
+from utils.logger import setup_logger
+
+logger = setup_logger('bundle')
+
+BUNDLE_FORMAT = 1
+
+
+class BundleEncoder:
+    """The parts of a fitted OneHotEncoder that ``CompiledEncoder`` reads, loaded from bundle JSON."""
+
+    def __init__(self, categories, encoded_names):
+        self.feature_names_in_ = list(categories)
+        self.categories_ = [list(values) for values in categories.values()]
+        self._encoded_names = list(encoded_names)
+
+    def get_feature_names_out(self, input_features=None):
+        return list(self._encoded_names)
+
+
+def booster_digest(path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def feature_ranges():
+    """Validation ranges of every request feature, as used by ``Config.is_valid_feature_value``."""
+    return {
+        feature: Config.get_feature_range(feature)
+        for feature in Config.FEATURE_COLUMN + Config.COORDINATE_COLUMNS
+        if Config.get_feature_range(feature) is not None
+    }
+
+
+def read_bundle(path=None, booster_path=None):
+    """Load bundle JSON and check it was exported from ``booster_path``."""
+    path = path or Config.BUNDLE_PATH
+    with open(path, 'r') as f:
+        bundle = json.load(f)
+
+    if bundle.get('format') != BUNDLE_FORMAT:
+        raise ValueError(f"Unsupported serving bundle format {bundle.get('format')}, re-export with python -m src.bundle")
+    if booster_path is not None and booster_digest(booster_path) != bundle['booster_sha256']:
+        raise ValueError(f"Serving bundle {path} is stale for {booster_path}, re-export with python -m src.bundle")
+    return bundle
+
+
+def export_bundle(paths=None):
+    """Write the minimal serving bundle next to the native booster.
+
+    The bundle holds everything the lite serving path needs besides the
+    booster itself : encoder categories, feature order, the missing value
+    and the validation ranges. Before writing, the encoder rebuilt from the
+    bundle is checked to produce the same matrix as the pickled one.
+    """
+    try :
+        import numpy as np
+        import xgboost as xgb
+        from src.inference import CompiledEncoder, _parity_frame
+        from src.registry import ArtifactPaths
+
+        paths = paths or ArtifactPaths.files()
+        with open(paths.encoder, 'rb') as f:
+            encoder = pickle.load(f)
+
+        booster = xgb.Booster()
+        booster.load_model(str(paths.booster))
+
+        categorical_columns = [str(col) for col in encoder.feature_names_in_]
+        encoded_names = [str(name) for name in encoder.get_feature_names_out(categorical_columns)]
+        categories = {
+            col: [str(value) for value in values]
+            for col, values in zip(categorical_columns, encoder.categories_)
+        }
+        feature_names = booster.feature_names or CompiledEncoder(encoder).columns
+
+        bundle_encoder = BundleEncoder(categories, encoded_names)
+        sample = _parity_frame(encoder)
+        expected = CompiledEncoder(encoder, feature_names, sparse=False).encode_frame(sample)
+        actual = CompiledEncoder(bundle_encoder, feature_names, sparse=False).encode_frame(sample)
+        # fitur spasial NaN di kedua sisi (tanpa index), cukup dibandingkan sebagai NaN
+        if not np.array_equal(expected, actual, equal_nan=True):
+            raise ValueError("Encoder rebuilt from the bundle differs from the pickled encoder")
+
+        bundle = {
+            'format': BUNDLE_FORMAT,
+            'booster': paths.booster.name,
+            'booster_sha256': booster_digest(paths.booster),
+            'feature_names': [str(name) for name in feature_names],
+            'categories': categories,
+            'encoded_names': encoded_names,
+            'missing': booster.attr('missing') or 'nan',
+            'sparse': Config.SPARSE_ENCODING,
+            'ranges': feature_ranges(),
+        }
+
+        tmp_path = paths.bundle.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(bundle, f, indent=4)
+        os.replace(tmp_path, paths.bundle)
+
+        logger.info(f"Exported serving bundle to {paths.bundle} ({len(feature_names)} features)")
+        return paths.bundle
+
+    except Exception as e:
+        logger.error(f"Error Export Bundle {e}")
+        raise
+
+
+if __name__ == '__main__':
+    # export bundle dari best_model.ubj dan encoder.pkl yang sudah ada
+    export_bundle()
@@ -0,0 +1,71 @@
+import threading
+from cachetools import TTLCache
+from config.config import Config
+from utils.logger import setup_logger
+
+logger = setup_logger('cache')
+
+
+class PredictionCache:
+    """Bounded LRU cache with TTL for predictions.
+
+    Entries are keyed on the validated (BEDS, BATH, PROPERTYSQFT, LOCALITY)
+    tuple, followed by any extra categorical columns, and belong to one
+    artifact version; binding a new version clears the cache so stale
+    predictions are never served.
+    """
+
+    def __init__(self, maxsize=None, ttl=None):
+        self.maxsize = maxsize or Config.CACHE_MAX_SIZE
+        self.ttl = ttl or Config.CACHE_TTL
+        self._cache = TTLCache(maxsize=self.maxsize, ttl=self.ttl)
+        self._lock = threading.Lock()
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(beds, bath, propertysqft, locality, *extra):
+        return (int(beds), int(bath), int(propertysqft), str(locality), *extra)
+
+    def bind(self, version):
+        """Attach the cache to an artifact version, clearing it on change."""
+        with self._lock:
+            if version != self.version:
+                if self.version is not None:
+                    logger.info(f"Artifact version changed {self.version} -> {version}, clearing prediction cache")
+                self._cache.clear()
+                self.version = version
+
+    def get(self, key):
+        with self._lock:
+            value = self._cache.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def set(self, key, value, version=None):
+        """Store a prediction; dropped when it was made by another artifact version."""
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            self._cache[key] = value
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._cache),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "version": self.version,
+            }
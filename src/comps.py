@@ -0,0 +1,328 @@
+import heapq
+import itertools
+import json
+import math
+import os
+import shutil
+import numpy as np
+from config.config import Config
+from src.spatial import KM_PER_DEGREE_LATITUDE, KM_PER_DEGREE_LONGITUDE, project
+from utils.logger import setup_logger
+
+logger = setup_logger('comps')
+
+COMPS_FORMAT = 1
+
+# dua tree per LOCALITY : dengan koordinat (request dengan lat/lon) dan tanpa
+TREES = {
+    'geo': ['BEDS', 'BATH', 'PROPERTYSQFT', 'X_KM', 'Y_KM'],
+    'attributes': ['BEDS', 'BATH', 'PROPERTYSQFT'],
+}
+TREE_ARRAYS = ['points', 'order', 'split_dim', 'split_value']
+
+# leaf dikumpulkan sampai sekian baris sebelum dihitung jaraknya dengan numpy
+SCORE_BATCH_ROWS = 128
+
+
+def _scaled_points(beds, bath, propertysqft, latitude=None, longitude=None) -> np.ndarray:
+    """Listing or request attributes in similarity units (``Config.COMPS_SCALES``)."""
+    scales = Config.COMPS_SCALES
+    columns = [
+        np.asarray(beds, dtype=np.float64) / scales['BEDS'],
+        np.asarray(bath, dtype=np.float64) / scales['BATH'],
+        np.log(np.asarray(propertysqft, dtype=np.float64)) / scales['PROPERTYSQFT'],
+    ]
+    if latitude is not None:
+        xy = project(latitude, longitude) / scales['DISTANCE_KM']
+        columns += [xy[:, 0], xy[:, 1]]
+    return np.column_stack(columns)
+
+
+def _longitude_km():
+    return KM_PER_DEGREE_LONGITUDE * math.cos(math.radians(Config.SPATIAL_REFERENCE_LATITUDE))
+
+
+def _query_point(beds, bath, propertysqft, latitude=None, longitude=None) -> np.ndarray:
+    """``_scaled_points`` of a single request, without the array round trips."""
+    scales = Config.COMPS_SCALES
+    values = [beds / scales['BEDS'], bath / scales['BATH'], math.log(propertysqft) / scales['PROPERTYSQFT']]
+    if latitude is not None:
+        values += [longitude * _longitude_km() / scales['DISTANCE_KM'], latitude * KM_PER_DEGREE_LATITUDE / scales['DISTANCE_KM']]
+    return np.array(values)
+
+
+def _tree_depth(n_rows, leaf_size):
+    return 0 if n_rows <= leaf_size else math.ceil(math.log2(n_rows / leaf_size))
+
+
+def _build_tree(points, leaf_size):
+    """Balanced k-d tree as arrays, nodes numbered heap style (children 2i+1, 2i+2).
+
+    Each node splits its row range at the middle on its widest dimension, so
+    the tree needs no child pointers and every leaf is a contiguous slice of
+    the reordered points. Returns (order, split_dim, split_value, depth).
+    """
+    depth = _tree_depth(len(points), leaf_size)
+    order = np.arange(len(points))
+    split_dim = np.zeros(2 ** depth - 1, dtype=np.int8)
+    split_value = np.zeros(2 ** depth - 1, dtype=np.float64)
+
+    stack = [(0, 0, len(points), 0)]
+    while stack:
+        node, lo, hi, level = stack.pop()
+        if level == depth:
+            continue
+        mid = (lo + hi) // 2
+        rows = order[lo:hi]
+        values = points[rows]
+        dim = int(np.argmax(values.max(axis=0) - values.min(axis=0)))
+        order[lo:hi] = rows[np.argpartition(values[:, dim], mid - lo)]
+        split_dim[node] = dim
+        split_value[node] = points[order[mid], dim]
+        stack.append((2 * node + 1, lo, mid, level + 1))
+        stack.append((2 * node + 2, mid, hi, level + 1))
+    return order, split_dim, split_value, depth
+
+
+def build_comps_index(directory=None, leaf_size=None, listings_df=None):
+    """Build the comparable-listings index from the listing dataset (or ``listings_df``).
+
+    Listings are grouped by LOCALITY; each group gets a k-d tree over
+    (BEDS, BATH, log PROPERTYSQFT, location) and one without the location.
+    Everything is written as .npy files plus ``meta.json`` so the API can
+    memory-map it. The directory is replaced in one rename.
+    """
+    try :
+        from src.dataset import dataset_fingerprint, load_dataset
+
+        directory = directory or Config.COMPS_INDEX_DIR
+        leaf_size = leaf_size or Config.COMPS_LEAF_SIZE
+
+        if listings_df is None:
+            # outlier yang sama dengan clean_data
+            df = load_dataset(Config.COMPS_COLUMNS)
+            df = df.drop(Config.DROP_VALUE_PRICE + Config.DROP_VALUE_BEDS + Config.DROP_VALUE_PROPERTYSQFT, errors='ignore')
+            dataset = dataset_fingerprint()
+        else:
+            df, dataset = listings_df[Config.COMPS_COLUMNS], None
+        # listing tanpa atribut lengkap tidak dipakai
+        df = df.dropna().drop_duplicates()
+        df = df[(df['PRICE'] > 0) & (df['PROPERTYSQFT'] > 0)]
+        df = df.sort_values('LOCALITY', kind='stable').reset_index(drop=True)
+
+        localities = sorted(df['LOCALITY'].unique().tolist())
+        bounds = np.append(np.searchsorted(df['LOCALITY'].to_numpy(dtype=str), localities), len(df))
+
+        listings = {
+            'address': df['ADDRESS'].to_numpy(dtype=str),
+            'price': df['PRICE'].to_numpy(dtype=np.int64),
+            'beds': df['BEDS'].to_numpy(dtype=np.int64),
+            'bath': df['BATH'].to_numpy(dtype=np.float64),
+            'propertysqft': df['PROPERTYSQFT'].to_numpy(dtype=np.float64),
+            'locality': np.repeat(np.arange(len(localities), dtype=np.int32), np.diff(bounds)),
+            'latitude': df['LATITUDE'].to_numpy(dtype=np.float64),
+            'longitude': df['LONGITUDE'].to_numpy(dtype=np.float64),
+        }
+        points = _scaled_points(
+            listings['beds'], listings['bath'], listings['propertysqft'], listings['latitude'], listings['longitude']
+        )
+
+        arrays = {}
+        segments = {name: [] for name in TREES}
+        for name, columns in TREES.items():
+            tree_points = points[:, :len(columns)]
+            parts = {key: [] for key in TREE_ARRAYS}
+            node_offset = 0
+            for start, stop in zip(bounds[:-1], bounds[1:]):
+                order, split_dim, split_value, depth = _build_tree(tree_points[start:stop], leaf_size)
+                parts['points'].append(tree_points[start:stop][order])
+                parts['order'].append(order + start)
+                parts['split_dim'].append(split_dim)
+                parts['split_value'].append(split_value)
+                segments[name].append([int(start), int(stop), node_offset, depth])
+                node_offset += len(split_dim)
+            for key in TREE_ARRAYS:
+                arrays[f"{name}_{key}"] = np.concatenate(parts[key])
+
+        tmp_dir = directory.with_name(directory.name + '.tmp')
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        for key, values in {**listings, **arrays}.items():
+            np.save(tmp_dir / f"{key}.npy", values)
+        with open(tmp_dir / 'meta.json', 'w') as f:
+            json.dump({
+                'format': COMPS_FORMAT,
+                'dataset': dataset,
+                'n_listings': len(df),
+                'leaf_size': leaf_size,
+                'scales': Config.COMPS_SCALES,
+                'localities': localities,
+                'segments': segments,
+            }, f, indent=4)
+
+        # rename direktori baru dulu, direktori lama baru dihapus (memmap yang masih terbuka tetap valid)
+        old_dir = directory.with_name(directory.name + '.old')
+        shutil.rmtree(old_dir, ignore_errors=True)
+        if directory.exists():
+            os.replace(directory, old_dir)
+        os.replace(tmp_dir, directory)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+        logger.info(f"Built comparable listings index for {len(df)} listings in {len(localities)} localities at {directory}")
+        return directory
+
+    except Exception as e:
+        logger.error(f"Error Build Comps Index {e}")
+        raise
+
+
+class ComparablesIndex:
+    """Memory-mapped comparable-listings index written by ``build_comps_index``.
+
+    ``search`` walks the k-d tree of the request's LOCALITY (every LOCALITY
+    when it is unknown) and only scores the leaves that can hold one of the
+    k nearest listings, so a lookup touches a few leaves of the memory-mapped
+    arrays instead of the whole listing table.
+    """
+
+    def __init__(self, directory=None):
+        directory = directory or Config.COMPS_INDEX_DIR
+        with open(directory / 'meta.json', 'r') as f:
+            meta = json.load(f)
+        if meta.get('format') != COMPS_FORMAT:
+            raise ValueError(f"Unsupported comps index format {meta.get('format')}, rebuild with python -m src.comps")
+
+        self.directory = directory
+        self.meta_mtime_ns = os.stat(directory / 'meta.json').st_mtime_ns
+        self.n_listings = meta['n_listings']
+        self.scales = meta['scales']
+        self.localities = meta['localities']
+        self.locality_code = {locality: code for code, locality in enumerate(self.localities)}
+        self.segments = meta['segments']
+
+        names = ['address', 'price', 'beds', 'bath', 'propertysqft', 'locality', 'latitude', 'longitude']
+        names += [f"{tree}_{key}" for tree in TREES for key in TREE_ARRAYS]
+        # np.asarray : view ndarray biasa di atas memmap (tanpa copy), lebih murah di loop search
+        self.arrays = {name: np.asarray(np.load(directory / f"{name}.npy", mmap_mode='r')) for name in names}
+        # kerangka tree kecil (~2 node per leaf) : list Python, lebih cepat dari skalar numpy saat descent
+        self.splits = {
+            tree: (self.arrays[f"{tree}_split_dim"].tolist(), self.arrays[f"{tree}_split_value"].tolist())
+            for tree in TREES
+        }
+
+    @classmethod
+    def load(cls, directory=None):
+        return cls(directory)
+
+    def changed(self):
+        """True when the index on disk was rebuilt since this one was loaded."""
+        try:
+            return os.stat(self.directory / 'meta.json').st_mtime_ns != self.meta_mtime_ns
+        except FileNotFoundError:
+            return False
+
+    def _score(self, points, query, ranges, best_distance, best_position, k):
+        """Merge the rows of leaf ``ranges`` into the current k best."""
+        # posisi semua baris di ranges tanpa satu np.arange per leaf
+        starts, stops = np.array(ranges).T
+        lengths = stops - starts
+        positions = np.arange(lengths.sum()) + np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        distance = np.concatenate([best_distance, ((points[positions] - query) ** 2).sum(axis=1)])
+        positions = np.concatenate([best_position, positions])
+        if len(distance) > k:
+            keep = np.argpartition(distance, k - 1)[:k]
+            distance, positions = distance[keep], positions[keep]
+        return distance, positions
+
+    def _search(self, tree, segments, query, k):
+        """Exact k nearest : best-first over the tree, leaves scored in vectorized batches.
+
+        Nodes are visited in order of their minimum possible distance, so the
+        search stops as soon as no unvisited leaf can beat the current k-th distance.
+        """
+        points = self.arrays[f"{tree}_points"]
+        split_dim, split_value = self.splits[tree]
+        query_values = query.tolist()
+
+        best_distance = np.empty(0)
+        best_position = np.empty(0, dtype=np.int64)
+        worst = np.inf
+        pending, pending_rows = [], 0
+        zero = (0.0,) * len(query_values)
+        sequence = itertools.count()
+        heap = [(0.0, next(sequence), 0, start, stop, depth, node_offset, zero) for start, stop, node_offset, depth in segments]
+        while heap and heap[0][0] < worst:
+            bound, _, node, lo, hi, depth, node_offset, offsets = heapq.heappop(heap)
+            if depth == 0:
+                pending.append((lo, hi))
+                pending_rows += hi - lo
+                if pending_rows >= max(k, SCORE_BATCH_ROWS):
+                    best_distance, best_position = self._score(points, query, pending, best_distance, best_position, k)
+                    worst = best_distance.max() if len(best_distance) >= k else np.inf
+                    pending, pending_rows = [], 0
+                continue
+
+            dim = split_dim[node_offset + node]
+            diff = query_values[dim] - split_value[node_offset + node]
+            mid = (lo + hi) // 2
+            left = (2 * node + 1, lo, mid, depth - 1, node_offset)
+            right = (2 * node + 2, mid, hi, depth - 1, node_offset)
+            near, far = (left, right) if diff < 0 else (right, left)
+            heapq.heappush(heap, (bound, next(sequence), *near, offsets))
+
+            # jarak minimum ke cell sisi jauh : offset dimensi ini diganti jarak ke bidang split
+            offset = max(offsets[dim], abs(diff))
+            far_bound = bound - offsets[dim] ** 2 + offset ** 2
+            if far_bound < worst:
+                heapq.heappush(heap, (far_bound, next(sequence), *far, offsets[:dim] + (offset,) + offsets[dim + 1:]))
+
+        if pending:
+            best_distance, best_position = self._score(points, query, pending, best_distance, best_position, k)
+        ranking = np.argsort(best_distance, kind='stable')
+        return np.sqrt(best_distance[ranking]), self.arrays[f"{tree}_order"][best_position[ranking]]
+
+    def search(self, beds, bath, propertysqft, locality=None, latitude=None, longitude=None, k=None) -> list:
+        """Top-k most similar listings, nearest first.
+
+        Similarity is the Euclidean distance over BEDS, BATH, log
+        PROPERTYSQFT and, when both coordinates are given, the location,
+        each divided by its ``Config.COMPS_SCALES`` unit.
+        """
+        k = min(k or Config.COMPS_K, self.n_listings)
+        has_location = latitude is not None and longitude is not None
+        tree = 'geo' if has_location else 'attributes'
+        query = _query_point(beds, bath, propertysqft, *((latitude, longitude) if has_location else ()))
+
+        code = self.locality_code.get(locality)
+        segments = self.segments[tree] if code is None else [self.segments[tree][code]]
+        distances, rows = self._search(tree, segments, query, k)
+
+        # satu gather per kolom untuk semua hasil
+        columns = {name: self.arrays[name][rows] for name in ('address', 'price', 'beds', 'bath', 'propertysqft', 'locality', 'latitude', 'longitude')}
+        comps = [
+            {
+                'ADDRESS': address,
+                'PRICE': price,
+                'BEDS': beds_value,
+                'BATH': bath_value,
+                'PROPERTYSQFT': sqft,
+                'LOCALITY': self.localities[code_value],
+                'LATITUDE': lat,
+                'LONGITUDE': lon,
+                'SIMILARITY_DISTANCE': round(distance, 6),
+            }
+            for address, price, beds_value, bath_value, sqft, code_value, lat, lon, distance in zip(
+                *(columns[name].tolist() for name in columns), distances.tolist()
+            )
+        ]
+        if has_location:
+            distances_km = np.hypot(
+                (columns['longitude'] - longitude) * _longitude_km(), (columns['latitude'] - latitude) * KM_PER_DEGREE_LATITUDE
+            )
+            for comp, distance_km in zip(comps, distances_km.tolist()):
+                comp['DISTANCE_KM'] = round(distance_km, 3)
+        return comps
+
+
+if __name__ == '__main__':
+    build_comps_index()
@@ -1,19 +1,92 @@
 import pandas as pd
 import numpy as np
+import scipy.sparse as sp
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import OneHotEncoder
 import pickle
 from config.config import Config
+from src.dataset import dataset_fingerprint, load_dataset
+from src.spatial import add_spatial_features
+from src.stages import StageCache
 from utils.logger import setup_logger
 
 logger = setup_logger('data_preparation')
 
-def load_prepare_data():
+def load_prepare_data(force=False):
+    """Run the preprocessing stages, reusing cached stage outputs when possible."""
+    if Config.INGESTION_MODE == 'chunked':
+        # tidak ada path chunked yang me-load seluruh split ke memori
+        raise ValueError("INGESTION_MODE=chunked trains through the matrix store, use build_matrix_stores")
+    
     try : 
-        logger.info("Loading data from csv")
-        df = pd.read_csv(Config.DATA_PATH)
+        stages = StageCache(force=force)
+        split, split_key = run_split_stages(stages)
+        
+        # stage 3 : one hot encoding
+        def _encode():
+            X_train, X_test, encoder = encoding_feature(split['X_train'], split['X_train'], split['X_test'])
+            return {'X_train': X_train, 'X_test': X_test, 'encoder': encoder}
+        
+        encoded, _ = stages.run('encode', {
+            'split': split_key,
+            'encoder': f'OneHotEncoder(sparse_output={Config.SPARSE_ENCODING}, handle_unknown=ignore)',
+        }, _encode)
+        
+        if 'encode' in stages.reused:
+            save_encoder(encoded['encoder'])
+        
+        logger.info(stages.summary())
+        logger.info(f"Data Preparations and Feature Engineering Successfully")
+        
+        return encoded['X_train'], encoded['X_test'], split['y_train'], split['y_test']
         
         
+    except Exception as e:
+        logger.error(f"Error Feature Engineering : {e}")
+        raise
+
+def run_split_stages(stages):
+    """Clean and split stages shared by the DataFrame and matrix store paths.
+    
+    With ``Config.SPATIAL_FEATURES`` the split also gets the nearest-listing
+    features, and the k-d tree is saved to ``Config.SPATIAL_INDEX_PATH``.
+    """
+    # stage 1 : load CSV, drop outlier, drop columns, duplicate, cast int
+    clean, clean_key = stages.run('clean', {
+        'dataset': dataset_fingerprint(),
+        'drop_value_price': Config.DROP_VALUE_PRICE,
+        'drop_value_beds': Config.DROP_VALUE_BEDS,
+        'drop_value_propertysqft': Config.DROP_VALUE_PROPERTYSQFT,
+        'drop_columns': Config.DROP_COLUMNS,
+        'categorical_columns': Config.CATEGORICAL_COLUMNS,
+        'dropna_columns': Config.FEATURE_COLUMN,
+        'int_columns': Config.DATASET_INT_COLUMNS + [Config.BATH, Config.PROPERTYSQFT],
+    }, lambda: {'df': clean_data(load_dataset())})
+    
+    # stage 2 : train test split
+    split, split_key = stages.run('split', {
+        'clean': clean_key,
+        'target': Config.TARGET_COLUMN,
+        'test_size': Config.TEST_SIZE,
+        'random_state': Config.RANDOM_STATE,
+    }, lambda: dict(zip(('X_train', 'X_test', 'y_train', 'y_test'), split_data(clean['df']))))
+    
+    if not Config.SPATIAL_FEATURES:
+        return split, split_key
+    
+    # stage 2b : fitur k listing terdekat dari k-d tree training
+    spatial, spatial_key = stages.run('spatial', {
+        'split': split_key,
+        'k': Config.SPATIAL_K,
+        'reference_latitude': Config.SPATIAL_REFERENCE_LATITUDE,
+        'columns': Config.SPATIAL_FEATURE_COLUMNS,
+        'fallback': 'locality_centroid',
+    }, lambda: add_spatial_features(split))
+    spatial['index'].save()
+    return spatial, spatial_key
+
+def clean_data(df:pd.DataFrame) -> pd.DataFrame :
+    try :
         #delete value outlier
         df.drop(Config.DROP_VALUE_PRICE, inplace=True)  # PRICE outliers
         df.drop(Config.DROP_VALUE_BEDS, inplace=True)  # BEDS outliers
@@ -21,11 +94,18 @@ def load_prepare_data():
         
         logger.info("Delete Outlier Value...")
         
-        #drop columns 
-        df.drop(Config.DROP_COLUMNS, axis=1, inplace=True)
+        #drop columns (cache hanya berisi kolom yang dibutuhkan), kolom kategorikal (dan koordinat untuk fitur spasial) tetap dipakai
+        keep_columns = Config.CATEGORICAL_COLUMNS + (Config.COORDINATE_COLUMNS if Config.SPATIAL_FEATURES else [])
+        drop_columns = [col for col in Config.DROP_COLUMNS if col not in keep_columns]
+        df.drop(columns=drop_columns, errors='ignore', inplace=True)
+        
+        logger.info(f"Delete Columns {drop_columns}")
         
-        logger.info(f"Delete Columns {Config.DROP_COLUMNS}")
+        # drop baris dengan fitur kosong (PRICE/BEDS kosong dibaca NaN dari CSV)
+        n_rows = len(df)
+        df.dropna(subset=Config.FEATURE_COLUMN, inplace=True)
         
+        logger.info(f"Drop {n_rows - len(df)} rows with missing values")
         
         # drop duplicate 
         df.drop_duplicates(inplace=True)
@@ -34,85 +114,77 @@ def load_prepare_data():
         
         
         #change type int
+        for col in Config.DATASET_INT_COLUMNS:
+            df[col] = df[col].astype('int64')
         df[Config.BATH] = df[Config.BATH].astype(int)
         df[Config.PROPERTYSQFT] = df[Config.PROPERTYSQFT].astype(int)
         
-        logger.info(f"Change type int columns BATH and PROPERTYSQFT ")
-        
-       
-        X_train, X_test, y_train, y_test = dataset_preparation(df)
-        logger.info(f"Data Preparations and Feature Engineering Successfully")
-        
-        
-        return X_train, X_test, y_train, y_test
-        
+        logger.info(f"Change type int columns {Config.DATASET_INT_COLUMNS} BATH and PROPERTYSQFT ")
         
+        return df
+    
     except Exception as e:
-        logger.error(f"Error Feature Engineering : {e}")
+        logger.error(f"Error Clean Data {e}")
         raise
 
-def dataset_preparation(df:pd.DataFrame) :
-    try : 
+def split_data(df:pd.DataFrame) :
+    try :
         X = df.drop(Config.TARGET_COLUMN,axis=1)
         y = np.log(df[Config.TARGET_COLUMN])
         
-        X_train, X_test, y_train, y_test = train_test_split(X,y, test_size=Config.TEST_SIZE,random_state=Config.RANDOM_STATE)
-        
-        #encoding data
-        X_train,X_test = encoding_feature(X,X_train,X_test)
-        logger.info("Success Encoding Data")
-        
-        return X_train, X_test, y_train, y_test
+        return train_test_split(X,y, test_size=Config.TEST_SIZE,random_state=Config.RANDOM_STATE)
     
     except Exception as e:
-        logger.error(f"Error Dataset Preparations {e}")
+        logger.error(f"Error Split Data {e}")
         raise
+
+def save_encoder(encoder) :
+    with open(Config.ENCODING_PATH,'wb') as f:
+        pickle.dump(encoder,f)
+    logger.info('save model One Hot Encoding')
     
 
 def encoding_feature(X:pd.DataFrame,X_train :pd.DataFrame,X_test:pd.DataFrame) :
     try : 
         categorical_columns = X.select_dtypes(include=['object']).columns.tolist()
-        numerical_columns = X.select_dtypes(include=['int64','float64']).columns.tolist()
         
         logger.info("Seperate Data Numerical and Categorical")
         
         
-        one_hot = OneHotEncoder(sparse_output=False,handle_unknown='ignore')
+        one_hot = OneHotEncoder(sparse_output=Config.SPARSE_ENCODING,handle_unknown='ignore')
         one_hot.fit(X_train[categorical_columns])
 
         #save model encoder
-        with open(Config.ENCODING_PATH,'wb') as f:
-            pickle.dump(one_hot,f)
-        logger.info('save model One Hot Encoding')
+        save_encoder(one_hot)
             
             
-        X_train_cat = one_hot.transform(X_train[categorical_columns])
-        X_test_cat = one_hot.transform(X_test[categorical_columns])
+        X_train_final = apply_encoding(X_train, one_hot)
+        X_test_final = apply_encoding(X_test, one_hot)
         
         logger.info("Apply One Hot Encoding")
         
-
-        encoded_categorical_columns = one_hot.get_feature_names_out(categorical_columns)
         
-        
-        X_train_cat_df = pd.DataFrame(X_train_cat, columns=encoded_categorical_columns, index=X_train.index)
-        X_test_cat_df = pd.DataFrame(X_test_cat, columns=encoded_categorical_columns, index=X_test.index)
-
-        X_train_num_df = X_train[numerical_columns].reset_index(drop=True)
-        X_test_num_df = X_test[numerical_columns].reset_index(drop=True)
-
-        X_train_final = pd.concat([X_train_num_df, X_train_cat_df.reset_index(drop=True)],axis=1)
-        X_test_final = pd.concat([X_test_num_df, X_test_cat_df.reset_index(drop=True)],axis=1)
-        
-        logger.info("Merge Data Encoding to DataFrame")
-        
-        
-        return X_train_final,X_test_final
+        return X_train_final,X_test_final,one_hot
     except Exception as e:
         logger.error(f"Error Encoding Feature {e}")
         raise
-    
 
+def apply_encoding(X:pd.DataFrame, one_hot) :
+    """Numerical columns followed by the one hot columns of a fitted encoder.
+    
+    Returns a DataFrame, or a float32 CSR matrix in the same column order
+    when the encoder was fitted with ``sparse_output=True``.
+    """
+    categorical_columns = list(one_hot.feature_names_in_)
+    numerical_columns = X.select_dtypes(include=['int64','float64']).columns.tolist()
+    
+    X_cat = one_hot.transform(X[categorical_columns])
+    if sp.issparse(X_cat):
+        X_num = sp.csr_matrix(X[numerical_columns].to_numpy(dtype=np.float32))
+        return sp.hstack([X_num, X_cat], format='csr', dtype=np.float32)
     
+    encoded_categorical_columns = one_hot.get_feature_names_out(categorical_columns)
+    X_cat_df = pd.DataFrame(X_cat, columns=encoded_categorical_columns)
     
-     
\ No newline at end of file
+    X_num_df = X[numerical_columns].reset_index(drop=True)
+    return pd.concat([X_num_df, X_cat_df],axis=1)
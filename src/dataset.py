@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import pandas as pd
+from config.config import Config
+from utils.logger import setup_logger
+
+logger = setup_logger('dataset')
+
+
+def file_sha256(path, chunk_size=1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def csv_dtypes(columns):
+    """``pd.read_csv`` dtypes for ``columns``, with the int columns parsed as float64.
+
+    A blank PRICE or BEDS cell would make an int64 column fail to parse;
+    as float64 it becomes NaN and the row is dropped during cleaning.
+    """
+    return {
+        col: 'float64' if col in Config.DATASET_INT_COLUMNS else Config.DATASET_DTYPES[col]
+        for col in columns if col in Config.DATASET_DTYPES
+    }
+
+
+def _read_meta():
+    if not Config.DATASET_CACHE_META_PATH.exists() or not Config.DATASET_CACHE_PATH.exists():
+        return None
+    with open(Config.DATASET_CACHE_META_PATH, 'r') as f:
+        return json.load(f)
+
+
+def _write_meta(meta):
+    tmp_path = Config.DATASET_CACHE_META_PATH.with_suffix('.json.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f, indent=4)
+    os.replace(tmp_path, Config.DATASET_CACHE_META_PATH)
+
+
+def _source_stat(path):
+    stat = path.stat()
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def build_dataset_cache(columns=None):
+    """Parse the CSV once and store the needed columns as Parquet."""
+    columns = list(columns or Config.DATASET_COLUMNS)
+
+    logger.info(f"Building columnar cache from {Config.DATA_PATH} for {columns}")
+    df = pd.read_csv(Config.DATA_PATH, usecols=columns, dtype=csv_dtypes(columns))[columns]
+    # seperti pd.read_csv biasa : int64 jika tidak ada sel kosong, NA dibuang di clean_data
+    for col in Config.DATASET_INT_COLUMNS:
+        if col in df.columns and df[col].notna().all():
+            df[col] = df[col].astype('int64')
+
+    Config.DATASET_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = Config.DATASET_CACHE_PATH.with_suffix('.parquet.tmp')
+    # index ikut disimpan, drop outlier memakai index baris CSV
+    df.to_parquet(tmp_path, engine='pyarrow', index=True)
+    os.replace(tmp_path, Config.DATASET_CACHE_PATH)
+
+    _write_meta({
+        'source': str(Config.DATA_PATH),
+        **_source_stat(Config.DATA_PATH),
+        'sha256': file_sha256(Config.DATA_PATH),
+        'columns': columns,
+        'rows': len(df),
+    })
+    return df
+
+
+def ensure_dataset_cache(columns=None):
+    """Make sure the Parquet cache is fresh and holds ``columns``.
+
+    Size and mtime are checked first; the CSV is only hashed when they
+    changed, and the cache is only rebuilt when the content changed too.
+    """
+    meta = _read_meta()
+    wanted = list(dict.fromkeys(list(Config.DATASET_COLUMNS) + list(columns or [])))
+
+    if meta is None:
+        return build_dataset_cache(wanted), True
+
+    missing = [col for col in wanted if col not in meta['columns']]
+    if missing:
+        logger.info(f"Columnar cache is missing {missing}, rebuilding")
+        return build_dataset_cache(meta['columns'] + missing), True
+
+    stat = _source_stat(Config.DATA_PATH)
+    if stat['size'] == meta['size'] and stat['mtime_ns'] == meta['mtime_ns']:
+        return None, False
+
+    if file_sha256(Config.DATA_PATH) == meta['sha256']:
+        # hanya mtime yang berubah, isi sama
+        _write_meta({**meta, **stat})
+        return None, False
+
+    logger.info(f"{Config.DATA_PATH} changed, rebuilding columnar cache")
+    return build_dataset_cache(meta['columns']), True
+
+
+def dataset_fingerprint() -> str:
+    """Content hash of the source CSV plus the cached columns."""
+    if Config.DATASET_CACHE_ENABLED:
+        ensure_dataset_cache()
+        meta = _read_meta()
+        return f"{meta['sha256']}:{','.join(Config.DATASET_COLUMNS)}"
+    return f"{file_sha256(Config.DATA_PATH)}:{','.join(Config.DATASET_COLUMNS)}"
+
+
+def load_dataset(columns=None) -> pd.DataFrame:
+    """Shared loader for the listing dataset.
+
+    Reads only ``columns`` (default ``Config.DATASET_COLUMNS``) from the
+    Parquet cache, rebuilding it from the CSV when the CSV changed.
+    """
+    try:
+        columns = list(columns or Config.DATASET_COLUMNS)
+        if not Config.DATASET_CACHE_ENABLED:
+            return pd.read_csv(Config.DATA_PATH, usecols=columns)[columns]
+
+        df, rebuilt = ensure_dataset_cache(columns)
+        if rebuilt:
+            return df[columns]
+        return pd.read_parquet(Config.DATASET_CACHE_PATH, engine='pyarrow', columns=columns)
+
+    except Exception as e:
+        logger.error(f"Error Load Dataset {e}")
+        raise
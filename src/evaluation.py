@@ -1,26 +1,47 @@
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import numpy as np
+import pandas as pd
 import json
 from config.config import Config
 from utils.logger import setup_logger
 
 logger = setup_logger('evaluation')
 
-def evaluate_model(model,X_test,y_test):
+def save_metrics(y_test, y_pred, extra_metrics=None):
+    metrics = {
+        'MAE' : mean_absolute_error(y_test,y_pred),
+        'RMSE' : mean_squared_error(y_test,y_pred),
+        'R2_SCORE': r2_score(y_test,y_pred)
+    }
+    if extra_metrics:
+        metrics.update(extra_metrics)
+    #save metrics
+    with open(Config.METRICS_PATH, 'w') as f:
+        json.dump(metrics,f,indent=4)
+    logger.info("Model evaluation completed and saved")
+    return metrics
+
+def evaluate_model(model,X_test,y_test,extra_metrics=None):
     try:
         y_pred = model.predict(X_test)
-        
-        metrics = {
-            'MAE' : mean_absolute_error(y_test,y_pred),
-            'RMSE' : mean_squared_error(y_test,y_pred),
-            'R2_SCORE': r2_score(y_test,y_pred)
-        }
-        #save metrics
-        with open(Config.METRICS_PATH, 'w') as f:
-            json.dump(metrics,f,indent=4)
-        logger.info("Model evaluation completed and saved")
-        return metrics
+        return save_metrics(y_test, y_pred, extra_metrics)
         
     except Exception as e:
         logger.error(f"Error Evaluate model {e}")
-        raise
\ No newline at end of file
+        raise
+
+def evaluate_model_from_store(model, test_store, extra_metrics=None):
+    """``evaluate_model`` on a MatrixStore, predicting one batch at a time.
+
+    Only one batch of the design matrix is in memory; the target stays memory-mapped.
+    """
+    try:
+        y_pred = np.empty(test_store.n_rows, dtype=np.float64)
+        for start, stop in test_store.batch_bounds():
+            batch = pd.DataFrame(test_store.batch(start, stop), columns=test_store.columns, copy=False)
+            y_pred[start:stop] = model.predict(batch)
+        return save_metrics(test_store.target, y_pred, extra_metrics)
+        
+    except Exception as e:
+        logger.error(f"Error Evaluate model from store {e}")
+        raise
@@ -0,0 +1,172 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from config.config import Config
+from utils.logger import setup_logger
+
+logger = setup_logger('executor')
+
+
+class QueueFullError(Exception):
+    """Raised when every worker is busy and the waiting queue is full."""
+
+
+# --- state di dalam worker process ---
+_worker_serving = None
+_worker_last_check = 0.0
+
+
+def _init_worker(backend):
+    global _worker_serving
+    from src.inference import ServingModel
+
+    _worker_serving = ServingModel.load(backend)
+
+
+def _current_worker_serving(version=None):
+    """Worker copy of the model, reloaded when the artifacts change.
+
+    ``version`` is the parent's model version. When it differs the
+    artifacts are checked right away instead of after
+    ``ARTIFACT_CHECK_INTERVAL``, so a worker follows a hot swap on the
+    first request that carries the new version.
+    """
+    global _worker_serving, _worker_last_check
+    from src.inference import ServingModel
+
+    now = time.monotonic()
+    if version != _worker_serving.version or now - _worker_last_check >= Config.ARTIFACT_CHECK_INTERVAL:
+        _worker_last_check = now
+        if _worker_serving.artifacts_changed():
+            _worker_serving = ServingModel.load(_worker_serving.predictor.backend)
+    return _worker_serving
+
+
+# tiap worker function mengembalikan (hasil, versi model yang dipakai)
+def _worker_predict_row(version, key):
+    serving = _current_worker_serving(version)
+    return serving.predict_row(*key), serving.version
+
+
+def _worker_predict_row_timed(version, key):
+    serving = _current_worker_serving(version)
+    return serving.predict_row_timed(*key), serving.version
+
+
+def _worker_predict_keys(version, keys):
+    serving = _current_worker_serving(version)
+    return serving.predict_keys(keys), serving.version
+
+
+def _worker_predict_frame(version, input_df):
+    serving = _current_worker_serving(version)
+    return serving.predict_frame(input_df), serving.version
+
+
+def _worker_predict_frame_timed(version, input_df):
+    serving = _current_worker_serving(version)
+    return serving.predict_frame_timed(input_df), serving.version
+
+
+class InferenceExecutor:
+    """Bounded pool that runs inference off the asyncio event loop.
+
+    At most ``workers`` predictions run at once and ``queue_size`` more may
+    wait; anything beyond that is rejected with QueueFullError so the API
+    can answer 503 instead of piling up latency.
+
+    Every ``predict_*`` returns (result, version) where version is the model
+    version that made the prediction. In process mode that is the worker's
+    copy, which can still differ from ``serving`` just after a hot swap.
+    """
+
+    def __init__(self, kind=None, workers=None, queue_size=None):
+        self.kind = kind or Config.INFERENCE_EXECUTOR
+        self.workers = workers or Config.INFERENCE_WORKERS
+        self.queue_size = Config.INFERENCE_QUEUE_SIZE if queue_size is None else queue_size
+
+        if self.kind == 'thread':
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='inference')
+        elif self.kind == 'process':
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(Config.INFERENCE_BACKEND,)
+            )
+        else:
+            raise ValueError(f"Unknown inference executor '{self.kind}', choose 'thread' or 'process'")
+
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+        self.stale = 0
+        logger.info(f"Inference executor '{self.kind}' with {self.workers} workers, queue {self.queue_size}")
+
+    async def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise QueueFullError("Inference queue is full")
+
+        with self._lock:
+            self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, fn, *args)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+
+    async def _submit_worker(self, serving, fn, *args):
+        result, version = await self._submit(fn, serving.version, *args)
+        if version != serving.version:
+            # worker belum memuat versi yang sama dengan parent
+            with self._lock:
+                self.stale += 1
+        return result, version
+
+    async def predict_row(self, serving, key):
+        if self.kind == 'process':
+            return await self._submit_worker(serving, _worker_predict_row, key)
+        return await self._submit(serving.predict_row, *key), serving.version
+
+    async def predict_row_timed(self, serving, key):
+        """``predict_row`` returning ((prediction, encoding seconds, inference seconds), version) from the worker."""
+        if self.kind == 'process':
+            return await self._submit_worker(serving, _worker_predict_row_timed, key)
+        return await self._submit(serving.predict_row_timed, *key), serving.version
+
+    async def predict_keys(self, serving, keys):
+        if self.kind == 'process':
+            return await self._submit_worker(serving, _worker_predict_keys, keys)
+        return await self._submit(serving.predict_keys, keys), serving.version
+
+    async def predict_frame(self, serving, input_df):
+        if self.kind == 'process':
+            return await self._submit_worker(serving, _worker_predict_frame, input_df)
+        return await self._submit(serving.predict_frame, input_df), serving.version
+
+    async def predict_frame_timed(self, serving, input_df):
+        if self.kind == 'process':
+            return await self._submit_worker(serving, _worker_predict_frame_timed, input_df)
+        return await self._submit(serving.predict_frame_timed, input_df), serving.version
+
+    def stats(self):
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "in_flight": self.in_flight,
+                "rejected": self.rejected,
+                # prediksi dari worker dengan versi model lain, tidak di-cache
+                "stale": self.stale,
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
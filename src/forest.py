@@ -0,0 +1,307 @@
+import json
+import os
+import numpy as np
+from config.config import Config
+from utils.logger import setup_logger
+
+logger = setup_logger('forest')
+
+FOREST_FORMAT = 1
+
+# array node yang disimpan di file .npz, satu entri per node dari semua tree
+NODE_ARRAYS = ['feature', 'threshold', 'left', 'default_left', 'value']
+
+
+def _parse_float(value) -> float:
+    # XGBoost >= 2 menyimpan base_score sebagai vector, mis. '[1.3749979E1]'
+    return float(str(value).strip('[]'))
+
+
+def _flatten_tree(tree, offset):
+    """Node arrays of one tree, renumbered breadth first so that every right child is ``left + 1``."""
+    left = tree['left_children']
+    right = tree['right_children']
+
+    order = [0]
+    depth = {0: 0}
+    for node in order:
+        if left[node] != -1:
+            order.extend((left[node], right[node]))
+            depth[left[node]] = depth[right[node]] = depth[node] + 1
+    new_id = {node: offset + idx for idx, node in enumerate(order)}
+
+    arrays = {name: [] for name in NODE_ARRAYS}
+    for node in order:
+        is_leaf = left[node] == -1
+        arrays['feature'].append(0 if is_leaf else tree['split_indices'][node])
+        # threshold NaN : x >= NaN selalu False, leaf tetap di tempat
+        arrays['threshold'].append(np.nan if is_leaf else tree['split_conditions'][node])
+        arrays['left'].append(new_id[node] if is_leaf else new_id[left[node]])
+        arrays['default_left'].append(True if is_leaf else bool(tree['default_left'][node]))
+        # split_conditions berisi nilai leaf (sudah dikali learning rate) untuk node leaf
+        arrays['value'].append(tree['split_conditions'][node] if is_leaf else 0.0)
+    return arrays, max(depth.values())
+
+
+def flatten_booster(booster) -> dict:
+    """Flatten every tree of a gbtree regression booster into shared node arrays.
+
+    Node ``i`` splits on ``feature[i]`` : rows with ``x < threshold[i]`` go
+    to ``left[i]``, the others to ``left[i] + 1``, missing values follow
+    ``default_left[i]``. Leaves point to themselves, so every tree can be
+    walked for ``max_depth`` steps without checking for leaves, and hold
+    their output in ``value``. ``roots`` is the first node of each tree.
+    """
+    model = json.loads(booster.save_raw(raw_format='json'))['learner']
+    objective = model['objective']['name']
+    if objective not in ('reg:squarederror', 'reg:absoluteerror', 'reg:pseudohubererror'):
+        raise ValueError(f"Objective '{objective}' has a non identity link, not supported by the compiled forest")
+    if model['gradient_booster']['name'] != 'gbtree':
+        raise ValueError(f"Booster '{model['gradient_booster']['name']}' is not supported, only gbtree")
+    if int(model['learner_model_param'].get('num_target', 1)) != 1:
+        raise ValueError("Multi-target boosters are not supported by the compiled forest")
+
+    arrays = {name: [] for name in NODE_ARRAYS}
+    roots = []
+    max_depth = 0
+    for tree in model['gradient_booster']['model']['trees']:
+        if any(tree['split_type']):
+            raise ValueError("Categorical splits are not supported by the compiled forest")
+
+        roots.append(len(arrays['feature']))
+        tree_arrays, depth = _flatten_tree(tree, roots[-1])
+        for name in NODE_ARRAYS:
+            arrays[name].extend(tree_arrays[name])
+        max_depth = max(max_depth, depth)
+
+    return {
+        'feature': np.asarray(arrays['feature'], dtype=np.int32),
+        'threshold': np.asarray(arrays['threshold'], dtype=np.float32),
+        'left': np.asarray(arrays['left'], dtype=np.int32),
+        'default_left': np.asarray(arrays['default_left'], dtype=bool),
+        'value': np.asarray(arrays['value'], dtype=np.float32),
+        'roots': np.asarray(roots, dtype=np.int32),
+        'max_depth': np.int32(max_depth),
+        'base_score': np.float64(_parse_float(model['learner_model_param']['base_score'])),
+        'n_features': np.int32(model['learner_model_param']['num_feature']),
+    }
+
+
+class CompiledForest:
+    """Tree ensemble as flat NumPy arrays, scored without XGBoost.
+
+    ``predict`` keeps one current node per (row, tree) and moves every one
+    of them a level down per step, so a batch costs ``max_depth`` rounds of
+    vectorized gathers regardless of the number of trees. Leaf values are
+    added in float32 in tree order like XGBoost, so predictions match the
+    booster exactly. Rows are scored in chunks of ``Config.FOREST_CHUNK_ROWS``
+    to bound the (rows, trees) buffers.
+    """
+
+    def __init__(self, arrays, feature_names=None, missing=float('nan'), booster_sha256=None, path=None):
+        # disimpan int32 di file, indeks int64 di memori supaya np.take tidak perlu konversi
+        self.feature = arrays['feature'].astype(np.int64)
+        self.threshold = arrays['threshold']
+        self.left = arrays['left'].astype(np.int64)
+        self.default_left = arrays['default_left']
+        self.default_right = (~self.default_left).astype(np.int64)
+        self.value = arrays['value']
+        self.roots = arrays['roots'].astype(np.int64)
+        self.max_depth = int(arrays['max_depth'])
+        self.base_score = float(arrays['base_score'])
+        self.n_features = int(arrays['n_features'])
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.missing = float(missing)
+        self.booster_sha256 = booster_sha256
+        self.path = path
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @classmethod
+    def from_booster(cls, booster, booster_sha256=None):
+        return cls(
+            flatten_booster(booster), booster.feature_names,
+            float(booster.attr('missing') or 'nan'), booster_sha256
+        )
+
+    @classmethod
+    def load(cls, path=None):
+        path = path or Config.FOREST_PATH
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['format']) != FOREST_FORMAT:
+                raise ValueError(f"Unsupported forest format {int(data['format'])}, re-export with python -m src.forest")
+            arrays = {name: data[name] for name in data.files}
+        feature_names = [str(name) for name in arrays['feature_names']] or None
+        return cls(arrays, feature_names, float(arrays['missing']), str(arrays['booster_sha256']), path)
+
+    def save(self, path):
+        """Write the arrays to ``path`` (.npz) atomically."""
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                format=np.int32(FOREST_FORMAT),
+                feature=self.feature.astype(np.int32),
+                threshold=self.threshold,
+                left=self.left.astype(np.int32),
+                default_left=self.default_left,
+                value=self.value,
+                roots=self.roots.astype(np.int32),
+                max_depth=np.int32(self.max_depth),
+                base_score=np.float64(self.base_score),
+                n_features=np.int32(self.n_features),
+                feature_names=np.asarray(self.feature_names or [], dtype=str),
+                missing=np.float64(self.missing),
+                booster_sha256=np.asarray(self.booster_sha256 or ''),
+            )
+        os.replace(tmp_path, path)
+        return path
+
+    def _dense(self, X) -> np.ndarray:
+        """float32 matrix with every missing entry as NaN.
+
+        Like XGBoost, entries absent from a sparse matrix are missing, and so
+        are entries equal to ``missing``.
+        """
+        if hasattr(X, 'tocoo'):
+            coo = X.tocoo()
+            dense = np.full(coo.shape, np.nan, dtype=np.float32)
+            dense[coo.row, coo.col] = coo.data
+        else:
+            dense = np.asarray(X, dtype=np.float32)
+        if dense.ndim != 2 or dense.shape[1] != self.n_features:
+            raise ValueError(f"Expected a (n_rows, {self.n_features}) matrix, got shape {dense.shape}")
+        if not np.isnan(self.missing):
+            dense = np.where(dense == self.missing, np.float32(np.nan), dense)
+        return dense
+
+    def _predict_chunk(self, X) -> np.ndarray:
+        n_rows = len(X)
+        flat = X.ravel()
+        row_offsets = (np.arange(n_rows, dtype=np.int64) * X.shape[1])[:, None]
+        node = np.repeat(self.roots[None, :], n_rows, axis=0)
+        has_missing = bool(np.isnan(flat).any())
+
+        for _ in range(self.max_depth):
+            values = np.take(flat, row_offsets + np.take(self.feature, node))
+            # anak kanan selalu left + 1, NaN >= threshold False sehingga dikoreksi lewat default_left
+            go_right = values >= np.take(self.threshold, node)
+            if has_missing:
+                go_right = np.where(np.isnan(values), np.take(self.default_right, node), go_right)
+            node = np.take(self.left, node) + go_right
+
+        # dijumlah berurutan dalam float32 dari base_score seperti XGBoost, hasilnya sama persis
+        leaves = np.empty((n_rows, self.n_trees + 1), dtype=np.float32)
+        leaves[:, 0] = self.base_score
+        leaves[:, 1:] = np.take(self.value, node)
+        return np.add.accumulate(leaves, axis=1)[:, -1]
+
+    def predict(self, X) -> np.ndarray:
+        """Margin (the model output, log price here) for every row of ``X``."""
+        X = self._dense(X)
+        chunk = Config.FOREST_CHUNK_ROWS
+        if len(X) <= chunk:
+            return self._predict_chunk(X)
+        return np.concatenate([self._predict_chunk(X[start:start + chunk]) for start in range(0, len(X), chunk)])
+
+
+def read_forest(path=None, booster_sha256=None):
+    """Load the compiled forest and check it was exported from the booster with ``booster_sha256``."""
+    forest = CompiledForest.load(path)
+    if booster_sha256 is not None and forest.booster_sha256 != booster_sha256:
+        raise ValueError(f"Compiled forest {forest.path} is stale for this booster, re-export with python -m src.forest")
+    return forest
+
+
+def check_forest_parity(forest, booster, X, rtol=None):
+    """Compare the compiled forest with ``booster.inplace_predict`` on ``X``, raise ValueError on mismatch."""
+    rtol = Config.FOREST_PARITY_RTOL if rtol is None else rtol
+    expected = booster.inplace_predict(X, missing=forest.missing)
+    actual = forest.predict(X)
+    if not np.allclose(expected, actual, rtol=rtol, atol=0):
+        max_diff = float(np.max(np.abs(expected - actual)))
+        raise ValueError(f"Compiled forest differs from the XGBoost booster, max diff {max_diff}")
+    return float(np.max(np.abs(expected - actual)))
+
+
+def parity_features(compiled_encoder, n_rows=1000, seed=0):
+    """Encoded rows for the parity check : the usual parity frame plus random listings."""
+    from src.inference import NUMERIC_FEATURES, _parity_frame
+
+    rng = np.random.default_rng(seed)
+    numeric = np.column_stack([
+        rng.integers(Config.get_feature_range(col)['min'], Config.get_feature_range(col)['max'] + 1, n_rows)
+        for col in NUMERIC_FEATURES
+    ]).astype(np.float32)
+    # -1 = kategori tidak dikenal (semua one-hot nol)
+    category_columns = np.column_stack([
+        rng.choice(list(index.values()) + [-1], n_rows) for index in compiled_encoder.key_indexes
+    ])
+    coordinates = None
+    if compiled_encoder.has_spatial:
+        # lokasi acak di dalam range, ditambah baris tanpa koordinat (fitur spasial NaN)
+        coordinates = np.column_stack([
+            rng.uniform(Config.get_feature_range(col)['min'], Config.get_feature_range(col)['max'], n_rows)
+            for col in Config.COORDINATE_COLUMNS
+        ])
+        coordinates[rng.random(n_rows) < 0.1] = np.nan
+    random_rows = compiled_encoder.encode_arrays(numeric, category_columns, coordinates)
+    frame_rows = compiled_encoder.encode_frame(_parity_frame())
+
+    if hasattr(random_rows, 'tocsr'):
+        import scipy.sparse as sp
+
+        return sp.vstack([frame_rows, random_rows]).tocsr()
+    return np.vstack([frame_rows, random_rows])
+
+
+def export_forest(paths=None):
+    """Compile the native booster into flat arrays next to it, for the 'forest' backend.
+
+    The booster is the one ``export_booster`` wrote from ``best_model.pkl``.
+    The arrays are scored against the booster before writing.
+    """
+    try :
+        import xgboost as xgb
+        from src.bundle import BundleEncoder, booster_digest, read_bundle
+        from src.inference import CompiledEncoder
+        from src.registry import ArtifactPaths
+
+        paths = paths or ArtifactPaths.files()
+        booster = xgb.Booster()
+        booster.load_model(str(paths.booster))
+        forest = CompiledForest.from_booster(booster, booster_digest(paths.booster))
+
+        if paths.bundle.exists():
+            bundle = read_bundle(paths.bundle, paths.booster)
+            encoder = BundleEncoder(bundle['categories'], bundle['encoded_names'])
+        else:
+            import pickle
+
+            with open(paths.encoder, 'rb') as f:
+                encoder = pickle.load(f)
+        spatial = None
+        if Config.SPATIAL_FEATURES:
+            from src.spatial import SpatialIndex
+
+            spatial = SpatialIndex.load(paths.spatial)
+        compiled_encoder = CompiledEncoder(encoder, booster.feature_names, spatial=spatial)
+        max_diff = check_forest_parity(forest, booster, parity_features(compiled_encoder))
+
+        forest.save(paths.forest)
+        logger.info(
+            f"Exported compiled forest to {paths.forest} ({forest.n_trees} trees, "
+            f"{len(forest.feature)} nodes, depth {forest.max_depth}, parity max diff {max_diff:.2e})"
+        )
+        return paths.forest
+
+    except Exception as e:
+        logger.error(f"Error Export Forest {e}")
+        raise
+
+
+if __name__ == '__main__':
+    # compile best_model.ubj yang sudah ada (export dari best_model.pkl saat training)
+    export_forest()
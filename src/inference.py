@@ -0,0 +1,719 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from pathlib import Path
+import numpy as np
+from config.config import Config
+from src.prediction_table import PredictionTable
+from src.registry import ArtifactPaths, current_version
+from utils.logger import setup_logger
+
+logger = setup_logger('inference')
+
+# columns yang harus bernilai integer (sama seperti FeatureInput)
+INTEGER_COLUMNS = ['PRICE', 'BEDS', 'BATH', 'PROPERTYSQFT']
+
+# fitur numerik yang masuk ke model (urutan sesuai training)
+NUMERIC_FEATURES = [
+    col for col in Config.FEATURE_COLUMN
+    if col != Config.TARGET_COLUMN and col not in Config.CATEGORICAL_COLUMNS
+]
+
+# kolom kategorikal selain LOCALITY, opsional di request (kategori tidak dikenal = nol)
+EXTRA_CATEGORICAL = [col for col in Config.CATEGORICAL_COLUMNS if col != 'LOCALITY']
+
+# urutan nilai kategorikal di request key : LOCALITY lalu kolom tambahan
+KEY_CATEGORICAL = ['LOCALITY'] + EXTRA_CATEGORICAL
+
+# koordinat di akhir request key, hanya jika model memakai fitur spasial
+KEY_COORDINATES = Config.COORDINATE_COLUMNS if Config.SPATIAL_FEATURES else []
+
+
+class CompiledEncoder:
+    """Fitted OneHotEncoder compiled into a fixed column layout.
+
+    The column layout follows the model's ``feature_names_in_`` when
+    available, and each category maps straight to its one-hot column index,
+    so encoding a request is a few array writes instead of a pandas round trip.
+    With ``sparse`` (default ``Config.SPARSE_ENCODING``) batches are built as
+    CSR matrices instead of dense arrays.
+
+    When the layout holds ``Config.SPATIAL_FEATURE_COLUMNS``, ``spatial`` (a
+    SpatialIndex) computes them from the coordinates at the end of each
+    request key, or from the LOCALITY centroid when those are missing.
+    Without an index they stay NaN.
+    """
+
+    def __init__(self, encoder, feature_names=None, sparse=None, spatial=None):
+        categorical_columns = [str(col) for col in encoder.feature_names_in_]
+        if sorted(categorical_columns) != sorted(KEY_CATEGORICAL):
+            raise ValueError(
+                f"Encoder was fitted on {categorical_columns}, Config.CATEGORICAL_COLUMNS is {Config.CATEGORICAL_COLUMNS}"
+            )
+
+        encoded_names = list(encoder.get_feature_names_out(categorical_columns))
+        if feature_names is None:
+            spatial_columns = Config.SPATIAL_FEATURE_COLUMNS if Config.SPATIAL_FEATURES else []
+            feature_names = NUMERIC_FEATURES + spatial_columns + encoded_names
+        self.columns = [str(name) for name in feature_names]
+        self.n_features = len(self.columns)
+        self.sparse = Config.SPARSE_ENCODING if sparse is None else sparse
+
+        position = {name: idx for idx, name in enumerate(self.columns)}
+        self.numeric_index = np.array([position[col] for col in NUMERIC_FEATURES])
+        self.has_spatial = all(col in position for col in Config.SPATIAL_FEATURE_COLUMNS)
+        self.spatial_index = (
+            np.array([position[col] for col in Config.SPATIAL_FEATURE_COLUMNS]) if self.has_spatial else None
+        )
+        self.spatial = spatial if self.has_spatial else None
+
+        category_index = {}
+        offset = 0
+        for col, categories in zip(categorical_columns, encoder.categories_):
+            names = encoded_names[offset:offset + len(categories)]
+            offset += len(categories)
+            category_index[col] = {
+                category: position[name]
+                for category, name in zip(categories, names)
+                if name in position
+            }
+        self.key_indexes = [category_index[col] for col in KEY_CATEGORICAL]
+        self.locality_index = category_index['LOCALITY']
+        self._local = threading.local()
+
+    def _row_buffer(self):
+        # satu buffer per thread supaya aman dipakai bersamaan
+        buffer = getattr(self._local, 'row', None)
+        if buffer is None:
+            buffer = np.zeros((1, self.n_features), dtype=np.float32)
+            self._local.row = buffer
+        return buffer
+
+    def _spatial_features(self, latitude, longitude) -> np.ndarray:
+        """(n, 3) spatial features of coordinate arrays, NaN without an index."""
+        if self.spatial is None:
+            return np.full((len(latitude), len(self.spatial_index)), np.nan, dtype=np.float32)
+        return self.spatial.query(latitude, longitude)
+
+    def _fill_coordinates(self, coordinates, localities) -> np.ndarray:
+        if self.spatial is None:
+            return coordinates
+        return np.column_stack(self.spatial.fill_coordinates(coordinates[:, 0], coordinates[:, 1], localities))
+
+    def key_coordinates(self, keys) -> np.ndarray:
+        """(n, 2) float coordinates at the end of request keys, missing ones from the LOCALITY centroid."""
+        n_coordinates = len(KEY_COORDINATES)
+        coordinates = np.array([
+            [np.nan if value is None else value for value in key[len(key) - n_coordinates:]] for key in keys
+        ], dtype=np.float64).reshape(len(keys), n_coordinates)
+        return self._fill_coordinates(coordinates, [key[3] for key in keys])
+
+    def encode_row(self, beds, bath, propertysqft, locality, *extra) -> np.ndarray:
+        """Fill the preallocated row for this thread and return it.
+
+        ``extra`` holds the values of ``EXTRA_CATEGORICAL`` in order, then the
+        ``KEY_COORDINATES``. The returned array is reused by the next call on
+        the same thread, so it must be consumed (predicted) before encoding another row.
+        """
+        row = self._row_buffer()
+        row.fill(0.0)
+        row[0, self.numeric_index] = (beds, bath, propertysqft)
+        for index, value in zip(self.key_indexes, (locality, *extra)):
+            column = index.get(value)
+            if column is not None:
+                row[0, column] = 1.0
+        if self.spatial_index is not None:
+            if self.spatial is not None and KEY_COORDINATES:
+                row[0, self.spatial_index] = self.spatial.query_row(*extra[len(EXTRA_CATEGORICAL):], locality)
+            else:
+                row[0, self.spatial_index] = np.nan
+        return row
+
+    def key_columns(self, keys) -> np.ndarray:
+        """One-hot column of each categorical value in request keys, -1 if unknown."""
+        columns = np.full((len(keys), len(self.key_indexes)), -1, dtype=np.int64)
+        for row, key in enumerate(keys):
+            for col, (index, value) in enumerate(zip(self.key_indexes, key[3:])):
+                columns[row, col] = index.get(value, -1)
+        return columns
+
+    def encode_arrays(self, numeric: np.ndarray, category_columns: np.ndarray, coordinates=None):
+        """Encode numeric values (n_rows, 3) and one-hot column positions.
+
+        ``category_columns`` holds, per row, the matrix column of each
+        categorical value (shape (n_rows,) for LOCALITY only, or
+        (n_rows, n_categorical)), or -1 for an unknown category (all zeros,
+        like handle_unknown='ignore'). ``coordinates`` (n_rows, 2) latitude
+        and longitude feed the spatial features, when the layout has them.
+        """
+        n_rows = len(numeric)
+        category_columns = np.asarray(category_columns).reshape(n_rows, -1)
+        known_rows, known_cols = np.nonzero(category_columns >= 0)
+        one_hot_columns = category_columns[known_rows, known_cols]
+
+        numeric_index = self.numeric_index
+        if self.spatial_index is not None:
+            if coordinates is None:
+                coordinates = np.full((n_rows, 2), np.nan)
+            spatial = self._spatial_features(coordinates[:, 0], coordinates[:, 1])
+            numeric = np.column_stack([np.asarray(numeric, dtype=np.float32), spatial])
+            numeric_index = np.concatenate([self.numeric_index, self.spatial_index])
+
+        if self.sparse:
+            import scipy.sparse as sp
+
+            n_numeric = len(numeric_index)
+            rows = np.concatenate([np.repeat(np.arange(n_rows), n_numeric), known_rows])
+            cols = np.concatenate([np.tile(numeric_index, n_rows), one_hot_columns])
+            values = np.concatenate([
+                np.asarray(numeric, dtype=np.float32).ravel(),
+                np.ones(len(known_rows), dtype=np.float32)
+            ])
+            return sp.csr_matrix((values, (rows, cols)), shape=(n_rows, self.n_features), dtype=np.float32)
+
+        matrix = np.zeros((n_rows, self.n_features), dtype=np.float32)
+        matrix[:, numeric_index] = numeric
+        matrix[known_rows, one_hot_columns] = 1.0
+        return matrix
+
+    def encode_frame(self, input_df: 'pd.DataFrame'):
+        """Encode validated rows into a new (n_rows, n_features) matrix."""
+        category_columns = np.column_stack([
+            input_df[col].map(index).fillna(-1).to_numpy(dtype=np.int64)
+            if col in input_df.columns else np.full(len(input_df), -1, dtype=np.int64)
+            for col, index in zip(KEY_CATEGORICAL, self.key_indexes)
+        ])
+        coordinates = None
+        if self.spatial_index is not None:
+            coordinates = np.column_stack([
+                input_df[col].to_numpy(dtype=np.float64, na_value=np.nan) if col in input_df.columns else np.full(len(input_df), np.nan)
+                for col in Config.COORDINATE_COLUMNS
+            ])
+            if 'LOCALITY' in input_df.columns:
+                coordinates = self._fill_coordinates(coordinates, input_df['LOCALITY'].to_numpy(dtype=object))
+        return self.encode_arrays(input_df[NUMERIC_FEATURES].to_numpy(dtype=np.float32), category_columns, coordinates)
+
+
+class PipelinePredictor:
+    """Serve the pickled sklearn Pipeline from ``train_model``."""
+
+    backend = 'pipeline'
+    artifact = 'model'
+
+    def __init__(self, model, path=None):
+        self.model = model
+        self.path = path
+        self.feature_names = getattr(model, 'feature_names_in_', None)
+
+    @classmethod
+    def load(cls, path=None):
+        path = path or Config.MODEL_PATH
+        with open(path, 'rb') as f:
+            return cls(pickle.load(f), path)
+
+    def set_threads(self, n_threads):
+        self.model.named_steps['regressor'].set_params(n_jobs=n_threads)
+
+    def predict(self, X) -> np.ndarray:
+        return self.model.predict(X)
+
+
+class BoosterPredictor:
+    """Serve the native XGBoost booster with ``inplace_predict``.
+
+    Skips sklearn validation and the DataFrame to DMatrix conversion;
+    input must already follow the training column layout.
+    """
+
+    backend = 'booster'
+    artifact = 'booster'
+
+    def __init__(self, booster, path=None):
+        self.booster = booster
+        self.path = path
+        self.feature_names = booster.feature_names
+        # disimpan oleh export_booster, sama dengan XGBRegressor.missing saat training
+        self.missing = float(booster.attr('missing') or 'nan')
+
+    @classmethod
+    def load(cls, path=None):
+        import xgboost as xgb
+
+        path = path or Config.BOOSTER_PATH
+        booster = xgb.Booster()
+        booster.load_model(str(path))
+        return cls(booster, path)
+
+    def set_threads(self, n_threads):
+        self.booster.set_param({'nthread': n_threads})
+
+    def predict(self, X) -> np.ndarray:
+        return self.booster.inplace_predict(X, missing=self.missing)
+
+
+class ForestPredictor:
+    """Serve the booster compiled to NumPy arrays by ``export_forest``, without importing XGBoost."""
+
+    backend = 'forest'
+    artifact = 'forest'
+
+    def __init__(self, forest, path=None):
+        self.forest = forest
+        self.path = path
+        self.feature_names = forest.feature_names
+        self.missing = forest.missing
+
+    @classmethod
+    def load(cls, path=None):
+        from src.forest import CompiledForest
+
+        forest = CompiledForest.load(path)
+        return cls(forest, forest.path)
+
+    def set_threads(self, n_threads):
+        # evaluasi NumPy selalu satu thread per prediksi
+        pass
+
+    def predict(self, X) -> np.ndarray:
+        return self.forest.predict(X)
+
+
+PREDICTORS = {
+    PipelinePredictor.backend: PipelinePredictor,
+    BoosterPredictor.backend: BoosterPredictor,
+    ForestPredictor.backend: ForestPredictor,
+}
+
+# backend yang bisa dipakai SERVING_MODE=lite (tanpa pickle)
+LITE_BACKENDS = [BoosterPredictor.backend, ForestPredictor.backend]
+
+
+def serving_threads():
+    """XGBoost threads per prediction so that all workers together fit the CPU count."""
+    if Config.XGB_SERVING_THREADS > 0:
+        return Config.XGB_SERVING_THREADS
+    concurrent = Config.INFERENCE_WORKERS * Config.WEB_CONCURRENCY
+    return max(1, (os.cpu_count() or 1) // concurrent)
+
+
+def load_predictor(backend=None, paths=None):
+    """Load the predictor selected by ``Config.INFERENCE_BACKEND`` from ``paths`` (an ArtifactPaths)."""
+    backend = backend or Config.INFERENCE_BACKEND
+    if backend not in PREDICTORS:
+        raise ValueError(f"Unknown inference backend '{backend}', choose from {list(PREDICTORS)}")
+
+    predictor_cls = PREDICTORS[backend]
+    predictor = predictor_cls.load(getattr(paths, predictor_cls.artifact) if paths is not None else None)
+    # n_jobs=-1 dari training akan oversubscribe core jika ada banyak worker
+    n_threads = serving_threads()
+    predictor.set_threads(n_threads)
+    logger.info(f"Loaded '{backend}' inference backend with {n_threads} XGBoost thread(s)")
+    return predictor
+
+
+def records_to_frame(records=None, columns=None):
+    """Build a DataFrame from a list of records or a columnar payload."""
+    import pandas as pd
+
+    if records is not None and columns is not None:
+        raise ValueError("Provide either 'records' or 'columns', not both")
+
+    if records is not None:
+        return pd.DataFrame.from_records(records)
+
+    if columns is not None:
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("All columns must have the same length")
+        return pd.DataFrame(columns)
+
+    raise ValueError("Provide either 'records' or 'columns'")
+
+
+def validate_frame(df: 'pd.DataFrame', ranges=None, features=None):
+    """Validate all rows at once.
+
+    ``ranges`` overrides the configured validation ranges per feature (the
+    ones stored in the serving bundle), ``features`` the required columns
+    (default ``Config.FEATURE_COLUMN``). Returns the cleaned DataFrame, a
+    boolean mask of valid rows and a dict mapping row position to an error
+    message for every invalid row.
+    """
+    import pandas as pd
+
+    df = df.reset_index(drop=True).copy()
+    n_rows = len(df)
+    errors = {}
+
+    if 'LOCALITY' not in df.columns:
+        df['LOCALITY'] = Config.DEFAULT_LOCALITY
+    else:
+        df['LOCALITY'] = df['LOCALITY'].where(df['LOCALITY'].notna(), Config.DEFAULT_LOCALITY)
+
+    def _mark(mask, message):
+        for idx in np.flatnonzero(mask):
+            errors.setdefault(int(idx), message)
+
+    for feature in features or Config.FEATURE_COLUMN:
+        if feature in EXTRA_CATEGORICAL:
+            # opsional, kategori yang tidak dikenal di-encode sebagai nol
+            if feature not in df.columns:
+                df[feature] = None
+            continue
+
+        if feature not in df.columns:
+            _mark(np.ones(n_rows, dtype=bool), f"Missing value for {feature}")
+            df[feature] = np.nan
+            continue
+
+        _mark(df[feature].isna().to_numpy(), f"Missing value for {feature}")
+
+        if feature in INTEGER_COLUMNS:
+            values = pd.to_numeric(df[feature], errors='coerce')
+            not_integer = values.isna() | (values % 1 != 0)
+            _mark(not_integer.to_numpy(), f"Invalid type for {feature}, expected integer")
+            df[feature] = values
+
+        feature_range = ranges[feature] if ranges else Config.get_feature_range(feature)
+        if isinstance(feature_range, list):
+            invalid = ~df[feature].isin(feature_range)
+        else:
+            values = df[feature]
+            invalid = ~values.between(feature_range['min'], feature_range['max'])
+        _mark(invalid.to_numpy(), f"Invalid value for {feature}")
+
+    # koordinat opsional : kosong = pakai median lokasi LOCALITY, selain itu harus di dalam rentang
+    for feature in KEY_COORDINATES:
+        if feature not in df.columns:
+            df[feature] = np.nan
+            continue
+
+        values = pd.to_numeric(df[feature], errors='coerce')
+        feature_range = (ranges or {}).get(feature) or Config.get_feature_range(feature)
+        invalid = df[feature].notna() & ~values.between(feature_range['min'], feature_range['max'])
+        _mark(invalid.to_numpy(), f"Invalid value for {feature}")
+        df[feature] = values
+
+    valid_mask = np.ones(n_rows, dtype=bool)
+    valid_mask[list(errors)] = False
+
+    return df, valid_mask, errors
+
+
+def build_feature_frame(input_df: 'pd.DataFrame', encoder, spatial=None) -> 'pd.DataFrame':
+    """Apply the training-time one hot encoding (and spatial features from ``spatial``) to validated rows."""
+    import pandas as pd
+    import scipy.sparse as sp
+
+    spatial_df = None
+    if spatial is not None:
+        spatial_df = spatial.add_features(input_df)[Config.SPATIAL_FEATURE_COLUMNS].reset_index(drop=True)
+
+    input_df = input_df[Config.FEATURE_COLUMN].reset_index(drop=True)
+
+    if Config.TARGET_COLUMN in input_df.columns:
+        input_df = input_df.drop(columns=[Config.TARGET_COLUMN])
+
+    # satu kali transform untuk semua baris
+    categorical_columns = list(encoder.feature_names_in_)
+    new_encoded = encoder.transform(input_df[categorical_columns])
+    if sp.issparse(new_encoded):
+        new_encoded = new_encoded.toarray()
+    get_name_feature_encode = encoder.get_feature_names_out(categorical_columns)
+    df_encoded = pd.DataFrame(new_encoded, columns=get_name_feature_encode)
+
+    input_df = input_df.drop(columns=categorical_columns)
+    for feature in input_df.columns:
+        input_df[feature] = input_df[feature].astype('int64')
+
+    return pd.concat([input_df, spatial_df, df_encoded], axis=1)
+
+
+def predict_frame(predictor, compiled_encoder: CompiledEncoder, input_df: 'pd.DataFrame') -> np.ndarray:
+    """Run a single vectorized prediction and convert back from log price."""
+    features = compiled_encoder.encode_frame(input_df)
+    prediction = predictor.predict(features)
+    return np.exp(prediction).astype(float)
+
+
+def _parity_records(encoder=None):
+    samples = [(1, 1, 100), (2, 3, 2000), (4, 2, 1500), (10, 5, 100000)]
+    records = [
+        {'PRICE': Config.DATA_VALIDATION['PRICE']['min'], 'BEDS': beds, 'BATH': bath,
+         'PROPERTYSQFT': sqft, 'LOCALITY': locality}
+        for beds, bath, sqft in samples
+        for locality in Config.LOCALITY_COLUMN
+    ]
+
+    # kolom kategorikal tambahan : berganti-ganti kategori yang dikenal encoder, plus satu nilai asing
+    if encoder is not None:
+        categories = dict(zip(encoder.feature_names_in_, encoder.categories_))
+        for col in EXTRA_CATEGORICAL:
+            values = list(categories[col][:7]) + ['<unknown>']
+            for idx, record in enumerate(records):
+                record[col] = values[idx % len(values)]
+
+    # koordinat : Manhattan, Brooklyn, Bronx, Queens, Staten Island, plus satu tanpa koordinat
+    if KEY_COORDINATES:
+        points = [(40.758, -73.9855), (40.6782, -73.9442), (40.8448, -73.8648), (40.7282, -73.7949),
+                  (40.5795, -74.1502), (None, None)]
+        for idx, record in enumerate(records):
+            record.update(zip(KEY_COORDINATES, points[idx % len(points)]))
+    return records
+
+
+def record_key(record):
+    """Request key (BEDS, BATH, PROPERTYSQFT, LOCALITY, *EXTRA_CATEGORICAL, *KEY_COORDINATES) of a record."""
+    return (
+        record['BEDS'], record['BATH'], record['PROPERTYSQFT'], record['LOCALITY'],
+        *[record.get(col) for col in EXTRA_CATEGORICAL],
+        *[record.get(col) for col in KEY_COORDINATES],
+    )
+
+
+def _parity_frame(encoder=None):
+    import pandas as pd
+
+    return pd.DataFrame(_parity_records(encoder))
+
+
+def check_spatial_layout(compiled_encoder: CompiledEncoder):
+    """Raise ValueError when the model's use of spatial features does not match ``Config.SPATIAL_FEATURES``."""
+    if compiled_encoder.has_spatial != Config.SPATIAL_FEATURES:
+        trained = 'with' if compiled_encoder.has_spatial else 'without'
+        raise ValueError(
+            f"Model was trained {trained} spatial features, set SPATIAL_FEATURES={str(compiled_encoder.has_spatial).lower()}"
+        )
+
+
+def check_encoder_parity(predictor, encoder, compiled_encoder: CompiledEncoder, rtol=1e-6):
+    """Compare the compiled encoder against the pandas encoding path.
+
+    Scores every locality for a handful of listings through both paths and
+    raises ValueError when any prediction differs.
+    """
+    input_df = _parity_frame(encoder)
+    records = _parity_records(encoder)
+
+    legacy = predictor.predict(build_feature_frame(input_df, encoder, compiled_encoder.spatial))
+    compiled_frame = predictor.predict(compiled_encoder.encode_frame(input_df))
+    compiled_row = np.array([
+        predictor.predict(compiled_encoder.encode_row(*record_key(record)))[0]
+        for record in records
+    ])
+
+    for name, candidate in (('encode_frame', compiled_frame), ('encode_row', compiled_row)):
+        if not np.allclose(legacy, candidate, rtol=rtol, atol=0):
+            max_diff = float(np.max(np.abs(legacy - candidate)))
+            raise ValueError(f"Compiled encoder ({name}) differs from pandas path, max diff {max_diff}")
+
+    logger.info(f"Compiled encoder parity check passed on {len(records)} rows")
+
+
+def check_backend_parity(predictor, reference, compiled_encoder: CompiledEncoder, encoder=None, rtol=1e-6):
+    """Compare a serving backend against a reference predictor (the pickled Pipeline)."""
+    features = compiled_encoder.encode_frame(_parity_frame(encoder))
+    expected = np.asarray(reference.predict(features))
+    actual = np.asarray(predictor.predict(features))
+
+    if not np.allclose(expected, actual, rtol=rtol, atol=0):
+        max_diff = float(np.max(np.abs(expected - actual)))
+        raise ValueError(f"Backend '{predictor.backend}' differs from '{reference.backend}', max diff {max_diff}")
+
+    logger.info(f"Backend '{predictor.backend}' parity check passed on {features.shape[0]} rows")
+
+
+def artifact_fingerprint(paths) -> str:
+    """Cheap fingerprint of artifact files based on their size and mtime."""
+    digest = hashlib.sha256()
+    for path in paths:
+        path = Path(path)
+        if path.exists():
+            stat = path.stat()
+            digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        else:
+            digest.update(f"{path}:missing;".encode())
+    return digest.hexdigest()[:16]
+
+
+class ServingModel:
+    """Predictor, encoder and compiled layout loaded together as one unit.
+
+    Loaded from the registry version CURRENT points to (``source='registry'``),
+    or from the flat files in ``Config.ARTIFACTS_DIR`` when there is no
+    registry yet (``source='files'``, versioned by file fingerprint).
+
+    ``lite`` mode (``Config.SERVING_MODE='lite'``) reads only the native
+    booster (or the compiled forest) and the JSON serving bundle : no
+    pickle, no sklearn encoder and no pandas until a batch request needs it.
+    """
+
+    def __init__(self, predictor, encoder, compiled_encoder: CompiledEncoder, version: str, table=None,
+                 paths=None, source='files', lite=False, ranges=None):
+        self.predictor = predictor
+        self.encoder = encoder
+        self.compiled_encoder = compiled_encoder
+        self.version = version
+        self.table = table
+        self.paths = paths or ArtifactPaths.files()
+        self.source = source
+        self.lite = lite
+        self.ranges = ranges
+        self.loaded_at = time.time()
+
+    @staticmethod
+    def watched_paths(predictor, paths=None, lite=False):
+        paths = paths or ArtifactPaths.files()
+        watched = [predictor.path, paths.bundle if lite else paths.encoder]
+        if Config.SPATIAL_FEATURES:
+            watched.append(paths.spatial)
+        if Config.PREDICTION_TABLE_ENABLED:
+            watched.append(paths.table_meta)
+        return watched
+
+    @property
+    def artifact_paths(self):
+        return self.watched_paths(self.predictor, self.paths, self.lite)
+
+    @classmethod
+    def load(cls, backend=None, version=None, registry=None, lite=None):
+        """Load ``version`` from the registry, default the CURRENT one, else the flat files.
+
+        ``registry=False`` always loads the flat files (the artifacts just trained).
+        ``lite`` defaults to ``Config.SERVING_MODE == 'lite'`` and serves the compiled
+        forest when ``backend`` is 'forest', the native booster otherwise.
+        """
+        registry = Config.REGISTRY_ENABLED if registry is None else registry
+        lite = Config.SERVING_MODE == 'lite' if lite is None else lite
+        if version is None and registry:
+            version = current_version()
+        source = 'registry' if version is not None else 'files'
+        paths = ArtifactPaths.for_version(version) if version is not None else ArtifactPaths.files()
+
+        ranges = None
+        spatial = None
+        if Config.SPATIAL_FEATURES:
+            from src.spatial import SpatialIndex
+
+            # k-d tree yang dibangun saat training, tidak dibangun ulang
+            spatial = SpatialIndex.load(paths.spatial)
+
+        if lite:
+            from src.bundle import BundleEncoder, read_bundle
+
+            bundle = read_bundle(paths.bundle, paths.booster)
+            backend = backend or Config.INFERENCE_BACKEND
+            predictor = load_predictor(backend if backend in LITE_BACKENDS else BoosterPredictor.backend, paths)
+            if predictor.backend == ForestPredictor.backend and predictor.forest.booster_sha256 != bundle['booster_sha256']:
+                raise ValueError(f"Compiled forest {paths.forest} is stale, re-export with python -m src.forest")
+            encoder = BundleEncoder(bundle['categories'], bundle['encoded_names'])
+            # parity bundle vs encoder pickle (dan forest vs booster) sudah dicek saat export
+            compiled_encoder = CompiledEncoder(encoder, bundle['feature_names'], sparse=bundle['sparse'], spatial=spatial)
+            check_spatial_layout(compiled_encoder)
+            ranges = bundle['ranges']
+        else:
+            predictor = load_predictor(backend, paths)
+            with open(paths.encoder, 'rb') as f:
+                encoder = pickle.load(f)
+
+            # compile encoder ke layout kolom yang tetap
+            compiled_encoder = CompiledEncoder(encoder, predictor.feature_names, spatial=spatial)
+            check_spatial_layout(compiled_encoder)
+            if Config.VERIFY_ENCODER_PARITY:
+                check_encoder_parity(predictor, encoder, compiled_encoder)
+            if Config.VERIFY_BACKEND_PARITY and predictor.backend != PipelinePredictor.backend:
+                check_backend_parity(predictor, PipelinePredictor.load(paths.model), compiled_encoder, encoder)
+
+        table = None
+        if Config.PREDICTION_TABLE_ENABLED:
+            if EXTRA_CATEGORICAL or KEY_COORDINATES:
+                logger.warning(f"Prediction table only covers LOCALITY, disabled with {EXTRA_CATEGORICAL + KEY_COORDINATES}")
+            else:
+                # tabel di registry sudah dicek saat publish
+                table = PredictionTable.load(paths.table, paths.table_meta, verify=source == 'files')
+
+        if version is None:
+            version = artifact_fingerprint(cls.watched_paths(predictor, paths, lite))
+        logger.info(f"Loaded model version {version} from {source} ({'lite' if lite else 'full'} mode)")
+        return cls(predictor, encoder, compiled_encoder, version, table, paths, source, lite, ranges)
+
+    def artifacts_changed(self) -> bool:
+        """True when CURRENT moved to another version, or the flat files changed on disk."""
+        current = current_version() if Config.REGISTRY_ENABLED else None
+        if current is not None:
+            return current != self.version
+        if self.source == 'registry':
+            return False
+        return artifact_fingerprint(self.artifact_paths) != self.version
+
+    def warm(self):
+        """Score a few rows through the row and batch paths before serving traffic.
+
+        Lite mode skips the DataFrame path so pandas stays unimported until a batch request.
+        """
+        if not self.lite:
+            self.predict_frame(_parity_frame(self.encoder).head(4))
+        keys = [record_key(record) for record in _parity_records(self.encoder)[:4]]
+        self.predict_row(*keys[0])
+        self.predict_keys(keys)
+
+    def is_valid_feature_value(self, feature, value) -> bool:
+        """``Config.is_valid_feature_value`` with the ranges this model was exported with."""
+        ranges = self.ranges.get(feature) if self.ranges else None
+        return Config.is_valid_feature_value(feature, value, ranges)
+
+    def predict_row(self, beds, bath, propertysqft, locality, *extra) -> float:
+        if self.table is not None:
+            log_price = self.table.lookup(beds, bath, propertysqft, locality)
+            if log_price is not None:
+                return float(np.exp(log_price))
+
+        row = self.compiled_encoder.encode_row(beds, bath, propertysqft, locality, *extra)
+        prediction = self.predictor.predict(row)
+        return float(np.exp(prediction[0]))
+
+    def predict_row_timed(self, beds, bath, propertysqft, locality, *extra):
+        """``predict_row`` that also returns the seconds spent encoding and in the model (or table)."""
+        start = time.perf_counter()
+        if self.table is not None:
+            log_price = self.table.lookup(beds, bath, propertysqft, locality)
+            if log_price is not None:
+                return float(np.exp(log_price)), 0.0, time.perf_counter() - start
+
+        row = self.compiled_encoder.encode_row(beds, bath, propertysqft, locality, *extra)
+        encoded = time.perf_counter()
+        prediction = self.predictor.predict(row)
+        return float(np.exp(prediction[0])), encoded - start, time.perf_counter() - encoded
+
+    def predict_keys(self, keys) -> np.ndarray:
+        """Score many (BEDS, BATH, PROPERTYSQFT, LOCALITY, *EXTRA_CATEGORICAL, *KEY_COORDINATES) tuples in one call."""
+        predictions = np.empty(len(keys), dtype=float)
+        pending = []
+        for idx, key in enumerate(keys):
+            log_price = self.table.lookup(*key) if self.table is not None else None
+            if log_price is None:
+                pending.append(idx)
+            else:
+                predictions[idx] = np.exp(log_price)
+
+        if pending:
+            numeric = np.array([keys[idx][:3] for idx in pending], dtype=np.float32)
+            pending_keys = [keys[idx] for idx in pending]
+            category_columns = self.compiled_encoder.key_columns(pending_keys)
+            coordinates = self.compiled_encoder.key_coordinates(pending_keys) if KEY_COORDINATES else None
+            features = self.compiled_encoder.encode_arrays(numeric, category_columns, coordinates)
+            predictions[pending] = np.exp(self.predictor.predict(features))
+        return predictions
+
+    def predict_frame(self, input_df: 'pd.DataFrame') -> np.ndarray:
+        return predict_frame(self.predictor, self.compiled_encoder, input_df)
+
+    def predict_frame_timed(self, input_df: 'pd.DataFrame'):
+        """``predict_frame`` that also returns the seconds spent encoding and in the model."""
+        start = time.perf_counter()
+        features = self.compiled_encoder.encode_frame(input_df)
+        encoded = time.perf_counter()
+        prediction = self.predictor.predict(features)
+        return np.exp(prediction).astype(float), encoded - start, time.perf_counter() - encoded
@@ -0,0 +1,185 @@
+import json
+import os
+import pickle
+import shutil
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sklearn.preprocessing import OneHotEncoder
+from config.config import Config
+from src.dataset import csv_dtypes, file_sha256
+from src.stages import stage_key
+from utils.logger import setup_logger
+
+logger = setup_logger('ingestion')
+
+NUMERIC_COLUMNS = ['PRICE', 'BEDS', 'BATH', 'PROPERTYSQFT']
+
+
+def iter_chunks(path=None, chunk_size=None):
+    """Stream the listing file in chunks with only the model columns."""
+    path = path or Config.DATA_PATH
+    columns = list(Config.FEATURE_COLUMN)
+    yield from pd.read_csv(path, usecols=columns, dtype=csv_dtypes(columns), chunksize=chunk_size or Config.CHUNK_SIZE)
+
+
+def iqr_bounds(series: pd.Series):
+    """Q1 - 1.5*IQR and Q3 + 1.5*IQR, same rule as hitung_outlier_iqr on the analytics page."""
+    q1 = series.quantile(0.25)
+    q3 = series.quantile(0.75)
+    iqr = q3 - q1
+    return q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+
+def _reservoir_sample(path, chunk_size, sample_size, seed):
+    """Uniform sample of the numeric columns in one streaming pass (bounded memory)."""
+    rng = np.random.default_rng(seed)
+    sample = None
+    seen = 0
+    for chunk in iter_chunks(path, chunk_size):
+        values = chunk[NUMERIC_COLUMNS].to_numpy(dtype=np.float64)
+        # skor acak per baris, simpan sample_size skor terkecil
+        keys = rng.random(len(values))
+        candidates = np.column_stack([keys, values])
+        sample = candidates if sample is None else np.vstack([sample, candidates])
+        if len(sample) > sample_size:
+            sample = sample[np.argpartition(sample[:, 0], sample_size)[:sample_size]]
+        seen += len(values)
+    logger.info(f"Reservoir sample of {0 if sample is None else len(sample)} rows out of {seen}")
+    return pd.DataFrame(sample[:, 1:], columns=NUMERIC_COLUMNS)
+
+
+def outlier_bounds(path=None, rule=None, chunk_size=None):
+    """Per-column (low, high) bounds used to filter rows while streaming."""
+    rule = rule or Config.OUTLIER_RULE
+    if rule == 'range':
+        return {col: (limits['min'], limits['max']) for col, limits in Config.DATA_VALIDATION.items()}
+    if rule == 'iqr':
+        sample = _reservoir_sample(path or Config.DATA_PATH, chunk_size or Config.CHUNK_SIZE,
+                                   Config.IQR_SAMPLE_SIZE, Config.RANDOM_STATE)
+        return {col: iqr_bounds(sample[col]) for col in NUMERIC_COLUMNS}
+    raise ValueError(f"Unknown outlier rule '{rule}', choose 'range' or 'iqr'")
+
+
+def _clean_chunk(chunk: pd.DataFrame, bounds) -> pd.DataFrame:
+    chunk = chunk.dropna(subset=Config.FEATURE_COLUMN)
+    mask = np.ones(len(chunk), dtype=bool)
+    for col, (low, high) in bounds.items():
+        mask &= chunk[col].between(low, high).to_numpy()
+    chunk = chunk[mask].copy()
+
+    for col in Config.DATASET_INT_COLUMNS:
+        chunk[col] = chunk[col].astype('int64')
+    chunk[Config.BATH] = chunk[Config.BATH].astype(int)
+    chunk[Config.PROPERTYSQFT] = chunk[Config.PROPERTYSQFT].astype(int)
+    return chunk
+
+
+def ingest_chunked(output_dir, path=None, chunk_size=None):
+    """Stream the CSV into cleaned train/test Parquet files and a fitted encoder.
+
+    Per chunk: drop rows with a missing feature or outside the outlier
+    bounds, cast the int columns, drop rows whose content hash was already
+    seen, assign train/test by content hash (deterministic, no shuffle over
+    the whole file) and collect the categories of
+    ``Config.CATEGORICAL_COLUMNS`` for the encoder. Only one chunk plus the
+    hash set is held in memory at any time.
+    """
+    path = path or Config.DATA_PATH
+    chunk_size = chunk_size or Config.CHUNK_SIZE
+    bounds = outlier_bounds(path, chunk_size=chunk_size)
+    logger.info(f"Chunked ingestion of {path}, chunk size {chunk_size}, bounds {bounds}")
+
+    tmp_dir = output_dir.with_name(output_dir.name + '.tmp')
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    writers = {}
+    seen_hashes = set()
+    categories = {col: set() for col in Config.CATEGORICAL_COLUMNS}
+    stats = {'rows_read': 0, 'rows_missing': 0, 'rows_outlier': 0, 'rows_duplicate': 0, 'rows_train': 0, 'rows_test': 0}
+    test_threshold = int(Config.TEST_SIZE * 10000)
+
+    try:
+        for chunk in iter_chunks(path, chunk_size):
+            stats['rows_read'] += len(chunk)
+            missing = int(chunk[Config.FEATURE_COLUMN].isna().any(axis=1).sum())
+            cleaned = _clean_chunk(chunk, bounds)
+            stats['rows_missing'] += missing
+            stats['rows_outlier'] += len(chunk) - len(cleaned) - missing
+
+            hashes = pd.util.hash_pandas_object(cleaned, index=False).to_numpy()
+            keep = ~pd.Series(hashes).duplicated().to_numpy()
+            keep &= np.array([value not in seen_hashes for value in hashes.tolist()], dtype=bool)
+            seen_hashes.update(hashes[keep].tolist())
+            stats['rows_duplicate'] += int((~keep).sum())
+
+            cleaned = cleaned[keep]
+            hashes = hashes[keep]
+            for col, values in categories.items():
+                values.update(cleaned[col].unique().tolist())
+
+            is_test = (hashes % 10000) < test_threshold
+            for name, part in (('train', cleaned[~is_test]), ('test', cleaned[is_test])):
+                if part.empty:
+                    continue
+                table = pa.Table.from_pandas(part, preserve_index=False)
+                if name not in writers:
+                    writers[name] = pq.ParquetWriter(tmp_dir / f"{name}.parquet", table.schema)
+                writers[name].write_table(table)
+                stats[f'rows_{name}'] += len(part)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    if 'train' not in writers or 'test' not in writers:
+        raise ValueError(f"Chunked ingestion produced no {'train' if 'train' not in writers else 'test'} rows")
+
+    # encoder di-fit dari kategori yang dikumpulkan per chunk
+    category_lists = {col: sorted(values) for col, values in categories.items()}
+    one_hot = OneHotEncoder(categories=list(category_lists.values()), sparse_output=Config.SPARSE_ENCODING,
+                            handle_unknown='ignore')
+    one_hot.fit(pd.DataFrame({col: values[:1] for col, values in category_lists.items()}))
+    with open(tmp_dir / 'encoder.pkl', 'wb') as f:
+        pickle.dump(one_hot, f)
+
+    with open(tmp_dir / 'manifest.json', 'w') as f:
+        json.dump({**stats, 'bounds': {col: list(map(float, b)) for col, b in bounds.items()}}, f, indent=4)
+
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.replace(tmp_dir, output_dir)
+    logger.info(f"Chunked ingestion finished {stats}")
+    return output_dir
+
+
+def ingest_key(path=None):
+    path = path or Config.DATA_PATH
+    return stage_key('ingest', {
+        'source': file_sha256(path),
+        'chunk_size': Config.CHUNK_SIZE,
+        'outlier_rule': Config.OUTLIER_RULE,
+        'data_validation': Config.DATA_VALIDATION,
+        'iqr_sample_size': Config.IQR_SAMPLE_SIZE,
+        'test_size': Config.TEST_SIZE,
+        'columns': Config.FEATURE_COLUMN,
+        'sparse_encoding': Config.SPARSE_ENCODING,
+    })
+
+
+def ensure_ingested(path=None, force=False):
+    """Run chunked ingestion unless an output for the same inputs exists."""
+    output_dir = Config.STAGE_CACHE_DIR / f"ingest-{ingest_key(path)[:16]}"
+    if not force and (output_dir / 'manifest.json').exists():
+        logger.info(f"Stage 'ingest' reused from {output_dir.name}")
+        return output_dir, True
+
+    Config.STAGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    return ingest_chunked(output_dir, path), False
+
+
+def iter_ingested(output_dir, split, batch_size=None):
+    """Stream cleaned rows of one split back out of the Parquet file."""
+    parquet = pq.ParquetFile(output_dir / f"{split}.parquet")
+    for batch in parquet.iter_batches(batch_size=batch_size or Config.CHUNK_SIZE):
+        yield batch.to_pandas()
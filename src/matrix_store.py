@@ -0,0 +1,263 @@
+import json
+import os
+import pickle
+import shutil
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import xgboost as xgb
+from sklearn.preprocessing import OneHotEncoder
+from config.config import Config
+from src.data_preparation import run_split_stages, save_encoder
+from src.ingestion import ensure_ingested, iter_ingested
+from src.stages import StageCache, stage_key
+from utils.logger import setup_logger
+
+logger = setup_logger('matrix_store')
+
+NUMERIC_DTYPE = np.float32
+ONEHOT_DTYPE = np.uint8
+TARGET_DTYPE = np.float64
+
+
+class MatrixWriter:
+    """Append encoded batches of one split to raw float32/uint8 files."""
+
+    def __init__(self, directory, numeric_columns, onehot_columns):
+        self.directory = directory
+        self.numeric_columns = list(numeric_columns)
+        self.onehot_columns = list(onehot_columns)
+        self.n_rows = 0
+        directory.mkdir(parents=True, exist_ok=True)
+        self._files = {name: open(directory / f"{name}.bin", 'wb') for name in ('numeric', 'onehot', 'target')}
+
+    def append(self, numeric, onehot, target):
+        np.ascontiguousarray(numeric, dtype=NUMERIC_DTYPE).tofile(self._files['numeric'])
+        np.ascontiguousarray(onehot, dtype=ONEHOT_DTYPE).tofile(self._files['onehot'])
+        np.ascontiguousarray(target, dtype=TARGET_DTYPE).tofile(self._files['target'])
+        self.n_rows += len(target)
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        with open(self.directory / 'meta.json', 'w') as f:
+            json.dump({
+                'n_rows': self.n_rows,
+                'numeric_columns': self.numeric_columns,
+                'onehot_columns': self.onehot_columns,
+            }, f, indent=4)
+
+
+class MatrixStore:
+    """Read-only memory-mapped view of one encoded split.
+
+    Numeric columns are float32, one-hot columns uint8 and the (log) target
+    float64. ``batch`` assembles a dense float32 slice of the design matrix,
+    so only the rows being used are paged in.
+    """
+
+    def __init__(self, directory):
+        with open(directory / 'meta.json', 'r') as f:
+            meta = json.load(f)
+        self.directory = directory
+        self.n_rows = meta['n_rows']
+        self.numeric_columns = meta['numeric_columns']
+        self.onehot_columns = meta['onehot_columns']
+        self.columns = self.numeric_columns + self.onehot_columns
+
+        self.numeric = self._map('numeric', NUMERIC_DTYPE, (self.n_rows, len(self.numeric_columns)))
+        self.onehot = self._map('onehot', ONEHOT_DTYPE, (self.n_rows, len(self.onehot_columns)))
+        self.target = self._map('target', TARGET_DTYPE, (self.n_rows,))
+
+    def _map(self, name, dtype, shape):
+        return np.memmap(self.directory / f"{name}.bin", dtype=dtype, mode='r', shape=shape)
+
+    @property
+    def dense_nbytes(self):
+        """Size of the full design matrix once expanded to float32."""
+        return self.n_rows * len(self.columns) * np.dtype(NUMERIC_DTYPE).itemsize
+
+    def batch(self, start, stop) -> np.ndarray:
+        out = np.empty((stop - start, len(self.columns)), dtype=NUMERIC_DTYPE)
+        n_numeric = len(self.numeric_columns)
+        out[:, :n_numeric] = self.numeric[start:stop]
+        out[:, n_numeric:] = self.onehot[start:stop]
+        return out
+
+    def batch_bounds(self, batch_size=None):
+        batch_size = batch_size or Config.CHUNK_SIZE
+        for start in range(0, self.n_rows, batch_size):
+            yield start, min(start + batch_size, self.n_rows)
+
+    def frame(self) -> pd.DataFrame:
+        """Whole split as a float32 DataFrame, for the in-memory search and evaluation."""
+        return pd.DataFrame(self.batch(0, self.n_rows), columns=self.columns, copy=False)
+
+
+class MatrixStoreIter(xgb.DataIter):
+    """Feed a ``MatrixStore`` to XGBoost batch by batch."""
+
+    def __init__(self, store, batch_size=None, cache_prefix=None):
+        self.store = store
+        self.bounds = list(store.batch_bounds(batch_size))
+        self._position = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data):
+        if self._position >= len(self.bounds):
+            return False
+        start, stop = self.bounds[self._position]
+        input_data(
+            data=self.store.batch(start, stop),
+            label=self.store.target[start:stop],
+            feature_names=self.store.columns,
+        )
+        self._position += 1
+        return True
+
+    def reset(self):
+        self._position = 0
+
+
+def available_memory():
+    """Free physical memory in bytes, None when the platform does not report it."""
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def use_external_memory(store) -> bool:
+    """Resolve ``Config.EXTERNAL_MEMORY`` ('on', 'off' or 'auto') for a store."""
+    if Config.EXTERNAL_MEMORY in ('on', 'off'):
+        return Config.EXTERNAL_MEMORY == 'on'
+    available = available_memory()
+    if available is None:
+        return False
+    return store.dense_nbytes > available * Config.EXTERNAL_MEMORY_RAM_FRACTION
+
+
+def store_dmatrix(store, external_memory=None, missing=np.nan):
+    """Quantized DMatrix streamed from the store.
+
+    In-memory mode keeps only the quantized matrix (one byte per value);
+    external-memory mode also pages the quantized pages to disk next to the store.
+    ``missing`` must be the regressor's value (0.0 under SPARSE_ENCODING), so
+    the dense one-hot zeros are missing here just like in a CSR matrix.
+    """
+    if external_memory is None:
+        external_memory = use_external_memory(store)
+
+    if external_memory:
+        logger.info(f"Building external-memory DMatrix from {store.directory.name} ({store.n_rows} rows, missing={missing})")
+        data_iter = MatrixStoreIter(store, cache_prefix=str(store.directory / 'xgb-cache'))
+        return xgb.ExtMemQuantileDMatrix(data_iter, missing=missing)
+
+    logger.info(f"Building quantized DMatrix from {store.directory.name} ({store.n_rows} rows, missing={missing})")
+    return xgb.QuantileDMatrix(MatrixStoreIter(store), missing=missing)
+
+
+def _encode_batch(X: pd.DataFrame, numeric_columns, one_hot):
+    categorical_columns = list(one_hot.feature_names_in_)
+    onehot = one_hot.transform(X[categorical_columns])
+    if sp.issparse(onehot):
+        # store selalu dense uint8, encoder chunked bisa sparse
+        onehot = onehot.toarray()
+    onehot = onehot.astype(ONEHOT_DTYPE)
+    return X[numeric_columns].to_numpy(dtype=NUMERIC_DTYPE), onehot
+
+
+def _write_split(directory, batches, one_hot):
+    """Encode (X, y) batches straight into the memmap files of one split."""
+    onehot_columns = list(one_hot.get_feature_names_out(list(one_hot.feature_names_in_)))
+    writer = None
+    try:
+        for X, y in batches:
+            numeric_columns = X.select_dtypes(include=['int64', 'float64']).columns.tolist()
+            if writer is None:
+                writer = MatrixWriter(directory, numeric_columns, onehot_columns)
+            numeric, onehot = _encode_batch(X, numeric_columns, one_hot)
+            writer.append(numeric, onehot, y)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is None:
+        raise ValueError(f"No rows to write for {directory.name}")
+    logger.info(f"Wrote {writer.n_rows} rows to matrix store {directory.parent.name}/{directory.name}")
+
+
+def _frame_batches(X: pd.DataFrame, y: pd.Series, batch_size):
+    for start in range(0, len(X), batch_size):
+        yield X.iloc[start:start + batch_size], y.iloc[start:start + batch_size].to_numpy()
+
+
+def _ingested_batches(output_dir, split):
+    for chunk in iter_ingested(output_dir, split):
+        yield chunk.drop(columns=Config.TARGET_COLUMN), np.log(chunk[Config.TARGET_COLUMN]).to_numpy()
+
+
+def build_matrix_stores(force=False):
+    """Write the encoded train/test design matrices once and open them memory-mapped.
+
+    Follows ``Config.INGESTION_MODE``: the memory path reuses the clean and
+    split stages, the chunked path streams the ingested Parquet files. Only
+    one batch of encoded rows is held in memory while writing. The store is
+    keyed like a preprocessing stage and reused when its inputs are unchanged.
+    Returns (train_store, test_store).
+    """
+    try :
+        if Config.INGESTION_MODE == 'chunked':
+            if Config.SPATIAL_FEATURES:
+                raise ValueError("SPATIAL_FEATURES needs the whole training split for the k-d tree, use INGESTION_MODE=memory")
+            output_dir, _ = ensure_ingested(force=force)
+            key = stage_key('matrix', {'ingest': output_dir.name})
+        else:
+            split, split_key = run_split_stages(StageCache(force=force))
+            key = stage_key('matrix', {
+                'split': split_key,
+                'encoder': 'OneHotEncoder(sparse_output=False, handle_unknown=ignore)',
+            })
+
+        directory = Config.STAGE_CACHE_DIR / f"matrix-{key[:16]}"
+        if force or not (directory / 'manifest.json').exists():
+            tmp_dir = directory.with_name(directory.name + '.tmp')
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            tmp_dir.mkdir(parents=True)
+
+            if Config.INGESTION_MODE == 'chunked':
+                with open(output_dir / 'encoder.pkl', 'rb') as f:
+                    one_hot = pickle.load(f)
+                sources = {name: _ingested_batches(output_dir, name) for name in ('train', 'test')}
+            else:
+                X_train = split['X_train']
+                categorical_columns = X_train.select_dtypes(include=['object']).columns.tolist()
+                one_hot = OneHotEncoder(sparse_output=False, handle_unknown='ignore')
+                one_hot.fit(X_train[categorical_columns])
+                sources = {
+                    name: _frame_batches(split[f'X_{name}'], split[f'y_{name}'], Config.CHUNK_SIZE)
+                    for name in ('train', 'test')
+                }
+
+            for name, batches in sources.items():
+                _write_split(tmp_dir / name, batches, one_hot)
+            with open(tmp_dir / 'encoder.pkl', 'wb') as f:
+                pickle.dump(one_hot, f)
+
+            # manifest ditulis terakhir sebagai penanda store lengkap
+            with open(tmp_dir / 'manifest.json', 'w') as f:
+                json.dump({'key': key, 'ingestion_mode': Config.INGESTION_MODE}, f, indent=4)
+            shutil.rmtree(directory, ignore_errors=True)
+            os.replace(tmp_dir, directory)
+            logger.info(f"Matrix store '{directory.name}' computed")
+        else:
+            logger.info(f"Matrix store reused from {directory.name}")
+
+        with open(directory / 'encoder.pkl', 'rb') as f:
+            save_encoder(pickle.load(f))
+
+        return MatrixStore(directory / 'train'), MatrixStore(directory / 'test')
+
+    except Exception as e:
+        logger.error(f"Error Build Matrix Store {e}")
+        raise
@@ -0,0 +1,235 @@
+import bisect
+import threading
+import time
+from config.config import Config
+
+# content type Prometheus text exposition format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = list(zip(labelnames, labelvalues)) + (extra or [])
+    if not pairs:
+        return ''
+    escaped = [
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    ]
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """A named metric with one value (or histogram) per combination of label values."""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for labelvalues, value in sorted(self._values.items()):
+                lines.extend(self._samples(labelvalues, value))
+        return lines
+
+    def _samples(self, labelvalues, value):
+        return [f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"]
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value, *labelvalues):
+        with self._lock:
+            self._values[labelvalues] = value
+
+
+class Histogram(Metric):
+    """Cumulative-bucket histogram, ``Config.METRICS_BUCKETS`` seconds by default."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=None):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = sorted(buckets or Config.METRICS_BUCKETS)
+
+    def observe(self, value, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labelvalues)
+            if state is None:
+                # [jumlah per bucket ..., +Inf], sum
+                state = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def _samples(self, labelvalues, state):
+        counts, total = state
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + [float('inf')], counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, labelvalues, [('le', _format_value(bound))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, labelvalues)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+REQUESTS = Counter('house_requests_total', "HTTP requests by endpoint and status code", ('endpoint', 'status'))
+ERRORS = Counter('house_request_errors_total', "HTTP requests answered with status >= 400", ('endpoint', 'status'))
+REQUEST_SECONDS = Histogram('house_request_seconds', "HTTP request latency", ('endpoint',))
+STAGE_SECONDS = Histogram('house_stage_seconds', "Latency of each stage of a prediction request", ('endpoint', 'stage'))
+ROWS = Counter('house_predicted_rows_total', "Valid rows scored by batch endpoints", ('endpoint',))
+MODEL_INFO = Gauge('house_model_info', "Model version currently served (value is always 1)",
+                   ('version', 'backend', 'mode', 'source'))
+MODEL_LOADED_AT = Gauge('house_model_loaded_timestamp_seconds', "Unix time the current model was loaded")
+CACHE_HITS = Gauge('house_prediction_cache_hits', "Prediction cache hits since start")
+CACHE_MISSES = Gauge('house_prediction_cache_misses', "Prediction cache misses since start")
+CACHE_HIT_RATIO = Gauge('house_prediction_cache_hit_ratio', "Prediction cache hits / lookups")
+CACHE_SIZE = Gauge('house_prediction_cache_size', "Entries in the prediction cache")
+TABLE_HIT_RATIO = Gauge('house_prediction_table_hit_ratio', "Prediction table hits / lookups")
+EXECUTOR_IN_FLIGHT = Gauge('house_executor_in_flight', "Predictions running or queued in the inference executor")
+EXECUTOR_REJECTED = Gauge('house_executor_rejected', "Predictions rejected with 503 since start")
+EXECUTOR_STALE = Gauge('house_executor_stale', "Predictions made by a worker still on another model version")
+LOG_DROPPED = Gauge('house_log_records_dropped', "Log records dropped because the log queue was full")
+
+METRICS = [
+    REQUESTS, ERRORS, REQUEST_SECONDS, STAGE_SECONDS, ROWS, MODEL_INFO, MODEL_LOADED_AT,
+    CACHE_HITS, CACHE_MISSES, CACHE_HIT_RATIO, CACHE_SIZE, TABLE_HIT_RATIO, EXECUTOR_IN_FLIGHT, EXECUTOR_REJECTED,
+    EXECUTOR_STALE, LOG_DROPPED,
+]
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+class StageTimer:
+    """Lap timer for the stages of one request.
+
+    ``lap(stage)`` records the time since the previous lap (or the start)
+    under ``stage``; ``record`` adds a duration measured elsewhere, e.g. in
+    an inference worker.
+    """
+
+    __slots__ = ('endpoint', '_last')
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self._last = time.perf_counter()
+
+    def lap(self, stage, exclude=0.0):
+        """Record the time since the last lap, minus ``exclude`` seconds already recorded elsewhere."""
+        now = time.perf_counter()
+        STAGE_SECONDS.observe(max(0.0, now - self._last - exclude), self.endpoint, stage)
+        self._last = now
+
+    def record(self, stage, seconds):
+        STAGE_SECONDS.observe(seconds, self.endpoint, stage)
+
+
+class NullTimer:
+    """Stand-in for StageTimer when metrics are disabled, every call is a no-op."""
+
+    __slots__ = ()
+
+    def lap(self, stage, exclude=0.0):
+        pass
+
+    def record(self, stage, seconds):
+        pass
+
+
+NULL_TIMER = NullTimer()
+
+
+def stage_timer(endpoint):
+    return StageTimer(endpoint) if Config.METRICS_ENABLED else NULL_TIMER
+
+
+def update_serving_gauges(serving, cache_stats=None, executor_stats=None):
+    """Refresh the gauges that describe the current state, right before a scrape."""
+    MODEL_INFO.clear()
+    MODEL_INFO.set(1, serving.version, serving.predictor.backend, 'lite' if serving.lite else 'full', serving.source)
+    MODEL_LOADED_AT.set(serving.loaded_at)
+
+    if cache_stats is not None:
+        CACHE_HITS.set(cache_stats['hits'])
+        CACHE_MISSES.set(cache_stats['misses'])
+        CACHE_HIT_RATIO.set(cache_stats['hit_rate'])
+        CACHE_SIZE.set(cache_stats['size'])
+
+    TABLE_HIT_RATIO.clear()
+    if serving.table is not None:
+        table_stats = serving.table.stats()
+        lookups = table_stats['hits'] + table_stats['misses']
+        TABLE_HIT_RATIO.set(table_stats['hits'] / lookups if lookups else 0.0)
+
+    if executor_stats is not None:
+        EXECUTOR_IN_FLIGHT.set(executor_stats['in_flight'])
+        EXECUTOR_REJECTED.set(executor_stats['rejected'])
+        EXECUTOR_STALE.set(executor_stats['stale'])
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests and errors and timing them per route.
+
+    The endpoint label is the route path template (e.g. ``/predict``), or
+    ``unmatched`` for 404s, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get('route')
+            endpoint = getattr(route, 'path', 'unmatched')
+            REQUESTS.inc(endpoint, str(status))
+            if status >= 400:
+                ERRORS.inc(endpoint, str(status))
+            REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint)
@@ -1,9 +1,16 @@
 from sklearn.pipeline import Pipeline
+from sklearn.base import clone
 from xgboost import XGBRegressor
-from sklearn.model_selection import GridSearchCV
 from config.config import Config
+from src.matrix_store import store_dmatrix, use_external_memory
+from src.search import run_early_stopping_search, run_search
 from utils.logger import setup_logger
+import xgboost as xgb
+import numpy as np
+import pandas as pd
+import json
 import pickle
+import time
 
 logger = setup_logger('model')
 
@@ -14,37 +21,139 @@ def create_pipeline():
             random_state=Config.RANDOM_STATE,
             n_estimators=200,
             learning_rate=0.1,
-            n_jobs=-1
+            n_jobs=Config.XGB_N_JOBS,
+            # CSR tidak menyimpan nol, jadi nol dianggap missing di path dense juga
+            missing=0.0 if Config.SPARSE_ENCODING else np.nan
         ))
     ]) 
     
+def search_best_params(pipeline, X_train, y_train):
+    if Config.TRAINING_MODE == 'early_stopping':
+        logger.info("Starting model training with early stopping")
+        best_params, best_score, _ = run_early_stopping_search(pipeline, X_train, y_train)
+    else:
+        logger.info(f"Starting model training with {Config.SEARCH_STRATEGY} search")
+        best_params, best_score, _ = run_search(pipeline, X_train, y_train)
+    
+    logger.info(f"Best parameters : {best_params}")
+    logger.info(f"Best Score : {best_score}")
+    return best_params
+
+def last_best_params():
+    """Best parameters of the previous search, empty (pipeline defaults) if there is none."""
+    if not Config.CV_RESULTS_PATH.exists():
+        logger.warning("No previous search results, training with the pipeline defaults")
+        return {}
+    with open(Config.CV_RESULTS_PATH, 'r') as f:
+        return json.load(f)['best_params']
+
+def early_stopping_metrics(n_estimators):
+    """Best iteration of every CV fold of the selected candidate and their median.
+
+    Read from the last early stopping search in ``CV_RESULTS_PATH``, the one
+    that set ``n_estimators`` (median + 1).
+    """
+    metrics = {'N_ESTIMATORS': n_estimators}
+    if not Config.CV_RESULTS_PATH.exists():
+        logger.warning("No previous search results, best iterations unknown")
+        return metrics
+    with open(Config.CV_RESULTS_PATH, 'r') as f:
+        search = json.load(f)
+    if search['strategy'] != 'early_stopping':
+        logger.warning(f"Last search used {search['strategy']}, best iterations unknown")
+        return metrics
+
+    params = {name: value for name, value in search['best_params'].items() if name != 'regressor__n_estimators'}
+    best = next(result for result in search['results'] if result['params'] == params)
+    metrics['BEST_ITERATIONS'] = best['best_iterations']
+    metrics['BEST_ITERATION_MEDIAN'] = float(np.median(best['best_iterations']))
+    return metrics
+
 def train_model(pipeline, X_train, y_train):
     try :
-        logger.info("Starting model training with GridSearchCV")
-        
-        grid_search = GridSearchCV(
-            estimator=pipeline,
-            param_grid=Config.PARAMS,
-            cv=Config.CV_FOLDS,
-            scoring=Config.SCORING
-        )
-        
-        grid_search.fit(X_train,y_train)
+        best_params = search_best_params(pipeline, X_train, y_train)
         
-        logger.info(f"Best parameters : {grid_search.best_params_}")
-        logger.info(f"Best Score : {grid_search.best_score_}")
-        
-        #get feature importance from the best model
-        
-        best_model = grid_search.best_estimator_
+        # refit best parameters on the full training data
+        start = time.perf_counter()
+        best_model = clone(pipeline).set_params(**best_params)
+        best_model.fit(X_train, y_train)
+        logger.info(f"Refit best model in {time.perf_counter() - start:.2f}s")
         
         with open(Config.MODEL_PATH, 'wb') as f:
             pickle.dump(best_model,f)        
         
+        export_booster(best_model)
+        
         return best_model
          
         
         
     except Exception as e:
         logger.error(f"Error Train Model {e}")
-        raise
\ No newline at end of file
+        raise
+
+
+def train_model_from_store(pipeline, train_store):
+    """Train from the memory-mapped design matrix of ``build_matrix_stores``.
+    
+    The search runs on the float32 matrix as in ``train_model``. When the
+    matrix does not fit in memory (external memory), the search is skipped and
+    the best parameters of the last search are reused. The final fit streams
+    the store into a quantized DMatrix, then the booster is wrapped back into
+    the pipeline so serving keeps loading ``best_model.pkl``.
+    """
+    try :
+        external_memory = use_external_memory(train_store)
+        if external_memory:
+            best_params = last_best_params()
+            logger.info(f"External memory training with parameters {best_params}")
+        else:
+            # frame() hanya dipanggil di sini, saat store muat di memori
+            best_params = search_best_params(pipeline, train_store.frame(), pd.Series(train_store.target))
+        
+        best_model = clone(pipeline).set_params(**best_params)
+        regressor = best_model.named_steps['regressor']
+        
+        start = time.perf_counter()
+        # missing sama dengan regressor, nol dari store dense = missing di bawah SPARSE_ENCODING
+        dtrain = store_dmatrix(train_store, external_memory, missing=regressor.missing)
+        booster = xgb.train(regressor.get_xgb_params(), dtrain, num_boost_round=regressor.n_estimators)
+        logger.info(f"Refit best model from matrix store in {time.perf_counter() - start:.2f}s")
+        
+        booster.set_attr(missing=str(regressor.missing))
+        booster.save_model(str(Config.BOOSTER_PATH))
+        regressor.load_model(str(Config.BOOSTER_PATH))
+        logger.info(f"Save native XGBoost booster to {Config.BOOSTER_PATH}")
+        
+        with open(Config.MODEL_PATH, 'wb') as f:
+            pickle.dump(best_model,f)
+        
+        return best_model
+    
+    except Exception as e:
+        logger.error(f"Error Train Model From Store {e}")
+        raise
+
+
+def export_booster(pipeline, path=None):
+    """Save the fitted XGBoost booster in native format next to the pickle."""
+    try :
+        path = path or Config.BOOSTER_PATH
+        regressor = pipeline.named_steps['regressor']
+        booster = regressor.get_booster()
+        # nilai missing ikut disimpan supaya inplace_predict sama dengan Pipeline
+        booster.set_attr(missing=str(regressor.missing))
+        booster.save_model(str(path))
+        
+        logger.info(f"Save native XGBoost booster to {path}")
+        return path
+    
+    except Exception as e:
+        logger.error(f"Error Export Booster {e}")
+        raise
+
+
+if __name__ == '__main__':
+    # export booster dari best_model.pkl yang sudah ada
+    with open(Config.MODEL_PATH, 'rb') as f:
+        export_booster(pickle.load(f))
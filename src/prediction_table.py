@@ -0,0 +1,175 @@
+import argparse
+import json
+import threading
+import numpy as np
+from config.config import Config
+from utils.logger import setup_logger
+
+logger = setup_logger('prediction_table')
+
+
+def table_axes(sqft_step=None):
+    """Grid axes of the table, derived from the validation ranges."""
+    sqft_step = sqft_step or Config.TABLE_SQFT_STEP
+    beds = Config.get_feature_range('BEDS')
+    bath = Config.get_feature_range('BATH')
+    sqft = Config.get_feature_range('PROPERTYSQFT')
+
+    return {
+        'beds_min': beds['min'],
+        'beds_count': beds['max'] - beds['min'] + 1,
+        'bath_min': bath['min'],
+        'bath_count': bath['max'] - bath['min'] + 1,
+        'localities': list(Config.get_feature_range('LOCALITY')),
+        'sqft_min': sqft['min'],
+        'sqft_step': sqft_step,
+        'sqft_count': (sqft['max'] - sqft['min']) // sqft_step + 1,
+    }
+
+
+def table_version():
+    """Version of the training artifacts the table was scored from."""
+    from src.inference import artifact_fingerprint
+
+    return artifact_fingerprint([Config.MODEL_PATH, Config.ENCODING_PATH])
+
+
+def build_prediction_table(serving=None, sqft_step=None, batch_size=None):
+    """Score the full (BEDS, BATH, LOCALITY, PROPERTYSQFT) grid in batches.
+
+    Saves the log-price table as a float32 .npy file plus a JSON file with
+    the axes and the artifact version it belongs to.
+    """
+    try:
+        from src.inference import EXTRA_CATEGORICAL, KEY_COORDINATES, ServingModel
+
+        if EXTRA_CATEGORICAL or KEY_COORDINATES:
+            logger.warning(f"Prediction table only covers LOCALITY, skipped with {EXTRA_CATEGORICAL + KEY_COORDINATES}")
+            return None
+
+        # tabel dibuat dari artefak hasil training, bukan versi CURRENT di registry
+        serving = serving or ServingModel.load(registry=False)
+        batch_size = batch_size or Config.TABLE_BATCH_SIZE
+        axes = table_axes(sqft_step)
+        shape = (axes['beds_count'], axes['bath_count'], len(axes['localities']), axes['sqft_count'])
+        total = int(np.prod(shape))
+
+        logger.info(f"Building prediction table {shape} ({total} rows), sqft step {axes['sqft_step']}")
+
+        encoder = serving.compiled_encoder
+        locality_columns = np.array(
+            [encoder.locality_index.get(locality, -1) for locality in axes['localities']],
+            dtype=np.int64
+        )
+
+        table = np.empty(total, dtype=np.float32)
+        for start in range(0, total, batch_size):
+            flat_idx = np.arange(start, min(start + batch_size, total))
+            beds_idx, bath_idx, loc_idx, sqft_idx = np.unravel_index(flat_idx, shape)
+
+            numeric = np.column_stack([
+                beds_idx + axes['beds_min'],
+                bath_idx + axes['bath_min'],
+                axes['sqft_min'] + sqft_idx * axes['sqft_step'],
+            ]).astype(np.float32)
+            features = encoder.encode_arrays(numeric, locality_columns[loc_idx])
+            table[flat_idx] = serving.predictor.predict(features)
+
+        np.save(Config.PREDICTION_TABLE_PATH, table.reshape(shape))
+        meta = {**axes, 'shape': list(shape), 'version': table_version()}
+        with open(Config.PREDICTION_TABLE_META_PATH, 'w') as f:
+            json.dump(meta, f, indent=4)
+
+        logger.info(f"Save prediction table to {Config.PREDICTION_TABLE_PATH} ({table.nbytes / 1e6:.1f} MB)")
+        return Config.PREDICTION_TABLE_PATH
+
+    except Exception as e:
+        logger.error(f"Error Build Prediction Table {e}")
+        raise
+
+
+class PredictionTable:
+    """Memory-mapped lookup over the precomputed prediction grid."""
+
+    def __init__(self, table: np.ndarray, meta: dict, interpolate=None):
+        self.table = table
+        self.meta = meta
+        self.interpolate = Config.TABLE_INTERPOLATE if interpolate is None else interpolate
+        self.locality_index = {locality: idx for idx, locality in enumerate(meta['localities'])}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path=None, meta_path=None, verify=True):
+        """Load the table, or return None when it is missing or (with ``verify``) stale."""
+        path = path or Config.PREDICTION_TABLE_PATH
+        meta_path = meta_path or Config.PREDICTION_TABLE_META_PATH
+        if not path.exists() or not meta_path.exists():
+            logger.warning(f"Prediction table not found at {path}, falling back to the model")
+            return None
+
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        if verify and meta.get('version') != table_version():
+            logger.warning("Prediction table was built from other artifacts, falling back to the model")
+            return None
+
+        table = np.load(path, mmap_mode='r')
+        logger.info(f"Loaded prediction table {table.shape} from {path}")
+        return cls(table, meta)
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def lookup(self, beds, bath, propertysqft, locality):
+        """Return the log-price prediction, or None when the grid has no answer."""
+        meta = self.meta
+        beds_idx = beds - meta['beds_min']
+        bath_idx = bath - meta['bath_min']
+        loc_idx = self.locality_index.get(locality)
+        position, offset = divmod(propertysqft - meta['sqft_min'], meta['sqft_step'])
+
+        if (loc_idx is None
+                or not 0 <= beds_idx < meta['beds_count']
+                or not 0 <= bath_idx < meta['bath_count']
+                or not 0 <= position < meta['sqft_count']):
+            self._count(False)
+            return None
+
+        row = self.table[beds_idx, bath_idx, loc_idx]
+        if offset == 0:
+            self._count(True)
+            return row[position]
+
+        if not self.interpolate or position + 1 >= meta['sqft_count']:
+            self._count(False)
+            return None
+
+        # interpolasi linear pada log price di antara dua titik grid
+        weight = offset / meta['sqft_step']
+        self._count(True)
+        return np.float32((1 - weight) * row[position] + weight * row[position + 1])
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "shape": list(self.table.shape),
+                "sqft_step": self.meta['sqft_step'],
+                "interpolate": self.interpolate,
+            }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build the dense prediction table")
+    parser.add_argument('--sqft-step', type=int, default=Config.TABLE_SQFT_STEP)
+    parser.add_argument('--batch-size', type=int, default=Config.TABLE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    build_prediction_table(sqft_step=args.sqft_step, batch_size=args.batch_size)
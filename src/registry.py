@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from config.config import Config
+from utils.logger import setup_logger
+
+logger = setup_logger('registry')
+
+# settings yang ikut disimpan sebagai training config di setiap versi
+TRAINING_CONFIG_KEYS = [
+    'RANDOM_STATE', 'TEST_SIZE', 'TARGET_COLUMN', 'FEATURE_COLUMN', 'CATEGORICAL_COLUMNS',
+    'SPARSE_ENCODING', 'DROP_COLUMNS', 'DATA_VALIDATION', 'INGESTION_MODE', 'OUTLIER_RULE',
+    'PARAMS', 'CV_FOLDS', 'SCORING', 'SEARCH_STRATEGY', 'TRAINING_MODE', 'EARLY_STOPPING_ROUNDS',
+    'MATRIX_STORE_ENABLED', 'SPATIAL_FEATURES', 'SPATIAL_K',
+]
+
+
+class ArtifactPaths:
+    """Where the serving artifacts of one model version live."""
+
+    def __init__(self, model, booster, encoder, metrics, table, table_meta, bundle, forest, spatial, directory=None):
+        self.model = model
+        self.booster = booster
+        self.encoder = encoder
+        self.metrics = metrics
+        self.table = table
+        self.table_meta = table_meta
+        self.bundle = bundle
+        self.forest = forest
+        self.spatial = spatial
+        self.directory = directory
+
+    @classmethod
+    def files(cls):
+        """The flat files ``train.py`` writes directly under ``Config.ARTIFACTS_DIR``."""
+        return cls(
+            Config.MODEL_PATH, Config.BOOSTER_PATH, Config.ENCODING_PATH, Config.METRICS_PATH,
+            Config.PREDICTION_TABLE_PATH, Config.PREDICTION_TABLE_META_PATH, Config.BUNDLE_PATH,
+            Config.FOREST_PATH, Config.SPATIAL_INDEX_PATH
+        )
+
+    @classmethod
+    def for_version(cls, version):
+        directory = version_dir(version)
+        flat = cls.files()
+        return cls(
+            *(directory / path.name for path in (
+                flat.model, flat.booster, flat.encoder, flat.metrics, flat.table, flat.table_meta, flat.bundle, flat.forest,
+                flat.spatial)),
+            directory=directory
+        )
+
+    def items(self):
+        return {
+            'model': self.model,
+            'booster': self.booster,
+            'encoder': self.encoder,
+            'metrics': self.metrics,
+            'prediction_table': self.table,
+            'prediction_table_meta': self.table_meta,
+            'bundle': self.bundle,
+            'forest': self.forest,
+            'spatial': self.spatial,
+        }
+
+
+def version_dir(version):
+    return Config.REGISTRY_DIR / version
+
+
+def training_config():
+    """Snapshot of the settings and search result that produced the artifacts."""
+    from src.dataset import dataset_fingerprint
+
+    config = {key: getattr(Config, key) for key in TRAINING_CONFIG_KEYS}
+    config['dataset'] = dataset_fingerprint()
+    if Config.CV_RESULTS_PATH.exists():
+        with open(Config.CV_RESULTS_PATH, 'r') as f:
+            config['best_params'] = json.load(f)['best_params']
+    return config
+
+
+def read_manifest(version):
+    path = version_dir(version) / 'manifest.json'
+    if not path.exists():
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def current_version():
+    """Version the CURRENT pointer refers to, None when there is no usable pointer."""
+    if not Config.REGISTRY_CURRENT_PATH.exists():
+        return None
+    version = Config.REGISTRY_CURRENT_PATH.read_text().strip()
+    if read_manifest(version) is None:
+        logger.warning(f"CURRENT points to unknown version '{version}'")
+        return None
+    return version
+
+
+def set_current(version):
+    """Atomically point CURRENT at an existing version."""
+    if read_manifest(version) is None:
+        raise ValueError(f"Unknown model version '{version}'")
+
+    tmp_path = Config.REGISTRY_CURRENT_PATH.with_suffix('.tmp')
+    tmp_path.write_text(version)
+    os.replace(tmp_path, Config.REGISTRY_CURRENT_PATH)
+    logger.info(f"CURRENT -> {version}")
+
+
+def list_versions():
+    """Manifests of all stored versions, oldest first."""
+    if not Config.REGISTRY_DIR.exists():
+        return []
+    manifests = [read_manifest(path.name) for path in Config.REGISTRY_DIR.iterdir() if path.is_dir()]
+    return sorted((m for m in manifests if m is not None), key=lambda m: m['created_at'])
+
+
+def prune(keep=None):
+    """Delete the oldest versions beyond ``keep``, never the current one."""
+    keep = Config.REGISTRY_KEEP if keep is None else keep
+    current = current_version()
+    versions = [m['version'] for m in list_versions() if m['version'] != current]
+    stale = versions[:max(0, len(versions) - (keep - 1 if current else keep))]
+    for version in stale:
+        shutil.rmtree(version_dir(version), ignore_errors=True)
+        logger.info(f"Pruned model version {version}")
+    return stale
+
+
+def publish(source=None, make_current=True):
+    """Copy freshly trained artifacts into a content-hashed version directory.
+
+    The version id is the hash of every file plus the training config, so
+    publishing identical artifacts twice reuses the same directory. The
+    prediction table, the serving bundle and the compiled forest are included only when they
+    were built from these artifacts, the spatial index only when ``SPATIAL_FEATURES`` is on. CURRENT is switched last, after the directory is complete.
+    """
+    try:
+        from src.dataset import file_sha256
+        from src.bundle import booster_digest, read_bundle
+        from src.forest import read_forest
+        from src.prediction_table import table_version
+
+        source = source or ArtifactPaths.files()
+        files = source.items()
+        required = ['model', 'booster', 'encoder', 'metrics'] + (['spatial'] if Config.SPATIAL_FEATURES else [])
+        missing = [name for name in required if not files[name].exists()]
+        if missing:
+            raise FileNotFoundError(f"Cannot publish, missing artifacts {missing}")
+
+        table_ok = source.table.exists() and source.table_meta.exists()
+        if table_ok:
+            with open(source.table_meta, 'r') as f:
+                table_ok = json.load(f).get('version') == table_version()
+        if not table_ok:
+            files.pop('prediction_table')
+            files.pop('prediction_table_meta')
+
+        try:
+            read_bundle(source.bundle, source.booster)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Serving bundle not published: {e}")
+            files.pop('bundle')
+
+        try:
+            read_forest(source.forest, booster_digest(source.booster))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Compiled forest not published: {e}")
+            files.pop('forest')
+
+        if not Config.SPATIAL_FEATURES:
+            files.pop('spatial')
+
+        config = training_config()
+        hashes = {name: file_sha256(path) for name, path in files.items()}
+        digest = hashlib.sha256(json.dumps({'files': hashes, 'config': config}, sort_keys=True, default=str).encode())
+        version = digest.hexdigest()[:12]
+        directory = version_dir(version)
+
+        if read_manifest(version) is None:
+            tmp_dir = directory.with_name(directory.name + '.tmp')
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            tmp_dir.mkdir(parents=True)
+
+            for path in files.values():
+                shutil.copy2(path, tmp_dir / path.name)
+            with open(tmp_dir / 'training_config.json', 'w') as f:
+                json.dump(config, f, indent=4, default=str)
+            with open(files['metrics'], 'r') as f:
+                metrics = json.load(f)
+
+            # manifest ditulis terakhir sebagai penanda versi lengkap
+            with open(tmp_dir / 'manifest.json', 'w') as f:
+                json.dump({
+                    'version': version,
+                    'created_at': datetime.now(timezone.utc).isoformat(),
+                    'files': {name: {'file': path.name, 'sha256': hashes[name]} for name, path in files.items()},
+                    'metrics': metrics,
+                }, f, indent=4)
+
+            shutil.rmtree(directory, ignore_errors=True)
+            os.replace(tmp_dir, directory)
+            logger.info(f"Published model version {version}")
+        else:
+            logger.info(f"Model version {version} already published")
+
+        if make_current:
+            set_current(version)
+            prune()
+        return version
+
+    except Exception as e:
+        logger.error(f"Error Publish Artifacts {e}")
+        raise
+
+
+if __name__ == '__main__':
+    # publish artefak yang sudah ada di artifact/ sebagai versi baru
+    publish()
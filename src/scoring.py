@@ -0,0 +1,324 @@
+import json
+import multiprocessing
+import os
+import shutil
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from config.config import Config
+from utils.logger import setup_logger
+
+logger = setup_logger('scoring')
+
+# kolom numerik input dibaca sebagai float, sisanya string supaya tipe tiap chunk sama
+NUMERIC_INPUT_COLUMNS = ['PRICE', 'BEDS', 'BATH', 'PROPERTYSQFT', 'LATITUDE', 'LONGITUDE']
+# kolom yang di-cast int di load_prepare_data
+TRAINING_INT_COLUMNS = [Config.BATH, Config.PROPERTYSQFT]
+
+
+def file_format(path) -> str:
+    suffix = Path(path).suffix.lower()
+    if suffix == '.csv':
+        return 'csv'
+    if suffix in ('.parquet', '.pq'):
+        return 'parquet'
+    raise ValueError(f"Unsupported file type '{suffix}' for {path}, use .csv or .parquet")
+
+
+def iter_input_chunks(path, chunk_size, skip_chunks=0):
+    """Yield (chunk number, DataFrame) from a CSV or Parquet listings file, starting at ``skip_chunks``."""
+    if file_format(path) == 'parquet':
+        parquet_file = pq.ParquetFile(path)
+        for number, batch in enumerate(parquet_file.iter_batches(batch_size=chunk_size)):
+            if number >= skip_chunks:
+                yield number, batch.to_pandas()
+        return
+
+    header = pd.read_csv(path, nrows=0).columns
+    dtypes = {col: 'float64' if col in NUMERIC_INPUT_COLUMNS else 'string' for col in header}
+    # chunk yang sudah di-score dilewati per record, bukan per baris fisik :
+    # field dengan newline di dalam kutip (ADDRESS, BROKERTITLE) memakai lebih dari satu baris
+    reader = pd.read_csv(path, dtype=dtypes, chunksize=chunk_size)
+    for number, chunk in enumerate(reader):
+        if number >= skip_chunks:
+            yield number, chunk
+
+
+def input_rows(path):
+    """Row count when it is cheap to know (Parquet metadata), else None."""
+    if file_format(path) == 'parquet':
+        return pq.ParquetFile(path).metadata.num_rows
+    return None
+
+
+def coerce_training_types(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Truncate BATH and PROPERTYSQFT to integers like ``astype(int)`` in training.
+
+    Listings such as 2.5 baths are scored as the model saw them in training
+    (2) instead of failing the integer check. Non-numeric values are left
+    for validation to reject.
+    """
+    chunk = chunk.copy()
+    for col in TRAINING_INT_COLUMNS:
+        if col in chunk.columns:
+            values = pd.to_numeric(chunk[col], errors='coerce')
+            chunk[col] = np.trunc(values).where(values.notna(), chunk[col])
+    return chunk
+
+
+def score_chunk(serving, chunk: pd.DataFrame, coerce=False) -> pd.DataFrame:
+    """The chunk with the predicted price and, for rows that failed validation, the error.
+
+    With ``coerce`` the training cast is applied before validation; the
+    output keeps the input values as they were.
+    """
+    from src.inference import validate_frame
+
+    # PRICE bukan input model, tidak wajib ada di file yang di-score
+    features = [col for col in Config.FEATURE_COLUMN if col != Config.TARGET_COLUMN]
+    input_df = coerce_training_types(chunk) if coerce else chunk
+    input_df, valid_mask, errors = validate_frame(input_df, serving.ranges, features)
+
+    predictions = np.full(len(input_df), np.nan)
+    if valid_mask.any():
+        predictions[valid_mask] = serving.predict_frame(input_df[valid_mask])
+
+    output = chunk.reset_index(drop=True)
+    output[Config.SCORE_PREDICTION_COLUMN] = predictions
+    output[Config.SCORE_ERROR_COLUMN] = pd.Series(
+        [errors.get(idx) for idx in range(len(output))], dtype='string'
+    )
+    return output
+
+
+# --- state di dalam worker process ---
+_worker_serving = None
+_worker_coerce = False
+
+
+def _init_worker(backend, version, coerce):
+    global _worker_serving, _worker_coerce
+    from src.inference import ServingModel
+
+    # satu proses per core, XGBoost cukup satu thread
+    _worker_serving = ServingModel.load(backend, version=version, registry=version is not None, lite=False)
+    _worker_serving.predictor.set_threads(1)
+    _worker_coerce = coerce
+
+
+def _worker_score_chunk(chunk):
+    return score_chunk(_worker_serving, chunk, _worker_coerce)
+
+
+class ScoreWriter:
+    """Incremental output : one CSV file appended per chunk, or a Parquet directory with one file per chunk.
+
+    ``checkpoint`` is what a resumed run needs to continue from the last complete chunk.
+    """
+
+    def __init__(self, path, output_format, checkpoint=None):
+        self.path = Path(path)
+        self.format = output_format
+        self.schema = None
+        checkpoint = checkpoint or {}
+
+        if self.format == 'csv':
+            # potong sisa chunk yang belum tercatat di checkpoint
+            self.bytes_written = checkpoint.get('output_bytes', 0)
+            with open(self.path, 'ab') as f:
+                f.truncate(self.bytes_written)
+        else:
+            self.path.mkdir(parents=True, exist_ok=True)
+            done = checkpoint.get('chunks_done', 0)
+            for part in self.path.glob('part-*.parquet'):
+                if int(part.stem.split('-')[1]) >= done:
+                    part.unlink()
+            if done:
+                self.schema = pq.read_schema(self._part_path(0))
+
+    def _part_path(self, number):
+        return self.path / f"part-{number:05d}.parquet"
+
+    def write(self, number, output: pd.DataFrame):
+        if self.format == 'csv':
+            with open(self.path, 'ab') as f:
+                output.to_csv(f, header=self.bytes_written == 0, index=False)
+                f.flush()
+                os.fsync(f.fileno())
+                self.bytes_written = f.tell()
+            return
+
+        if self.schema is None:
+            table = pa.Table.from_pandas(output, preserve_index=False)
+            # kolom yang kosong semua di chunk pertama tetap string di chunk berikutnya
+            self.schema = pa.schema([
+                field.with_type(pa.string()) if pa.types.is_null(field.type) else field for field in table.schema
+            ])
+        table = pa.Table.from_pandas(output, schema=self.schema, preserve_index=False)
+        tmp_path = self._part_path(number).with_suffix('.parquet.tmp')
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, self._part_path(number))
+
+    def checkpoint(self):
+        return {'output_bytes': self.bytes_written} if self.format == 'csv' else {}
+
+
+def progress_path(output):
+    output = Path(output)
+    return output.with_name(output.name + '.progress.json')
+
+
+def _input_stat(path):
+    stat = os.stat(path)
+    return {'input': str(Path(path).resolve()), 'input_size': stat.st_size, 'input_mtime_ns': stat.st_mtime_ns}
+
+
+def _write_progress(path, progress):
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(progress, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def model_fingerprint(version):
+    """Size and mtime fingerprint of the model files, catches a retrain when the registry is off."""
+    from src.inference import artifact_fingerprint
+    from src.registry import ArtifactPaths
+
+    paths = ArtifactPaths.for_version(version) if version is not None else ArtifactPaths.files()
+    return artifact_fingerprint([paths.model, paths.booster, paths.forest, paths.encoder, paths.spatial])
+
+
+def _resume_progress(input_path, output, chunk_size, version, coerce):
+    """Checkpoint of an interrupted run on the same input, chunk size, model and coerce setting."""
+    path = progress_path(output)
+    if not path.exists():
+        raise FileNotFoundError(f"No progress file {path} to resume from")
+    with open(path, 'r') as f:
+        progress = json.load(f)
+
+    expected = {
+        **_input_stat(input_path), 'chunk_size': chunk_size, 'model_version': version,
+        'model_fingerprint': model_fingerprint(version), 'coerce': coerce,
+    }
+    changed = [key for key, value in expected.items() if progress.get(key) != value]
+    if changed:
+        raise ValueError(f"Cannot resume {output}, {changed} changed since the interrupted run")
+    return progress
+
+
+def score_file(input_path, output_path, chunk_size=None, workers=None, backend=None, resume=False, overwrite=False,
+               coerce=None):
+    """Score every listing in ``input_path`` and write them with their predicted price to ``output_path``.
+
+    Chunks are read, scored and written in order with at most two chunks
+    per worker in memory. After each written chunk a progress file records
+    where to continue, so ``resume=True`` picks up after the last complete
+    chunk of an interrupted run. ``coerce`` (default ``Config.SCORE_COERCE``)
+    applies the training integer cast before validation.
+    """
+    try :
+        from src.inference import ServingModel
+        from src.registry import current_version
+
+        input_path, output_path = Path(input_path), Path(output_path)
+        chunk_size = chunk_size or Config.SCORE_CHUNK_ROWS
+        workers = workers or Config.SCORE_WORKERS
+        backend = backend or Config.SCORE_BACKEND
+        coerce = Config.SCORE_COERCE if coerce is None else coerce
+        output_format = file_format(output_path)
+        # versi model dikunci di awal, semua worker dan resume memakai versi yang sama
+        version = current_version() if Config.REGISTRY_ENABLED else None
+
+        if resume:
+            progress = _resume_progress(input_path, output_path, chunk_size, version, coerce)
+            if progress['complete']:
+                logger.info(f"{output_path} is already complete, nothing to resume")
+                return progress
+            logger.info(f"Resuming {output_path} after chunk {progress['chunks_done']} ({progress['rows_done']} rows)")
+        else:
+            if output_path.exists() and not overwrite:
+                raise FileExistsError(f"{output_path} exists, pass resume=True (--resume) or overwrite=True (--overwrite)")
+            if output_path.is_dir():
+                shutil.rmtree(output_path)
+            elif output_path.exists():
+                output_path.unlink()
+            progress = {
+                **_input_stat(input_path), 'output': str(output_path), 'chunk_size': chunk_size,
+                'model_version': version, 'model_fingerprint': model_fingerprint(version),
+                'backend': backend, 'coerce': coerce,
+                'chunks_done': 0, 'rows_done': 0, 'rows_invalid': 0, 'complete': False,
+            }
+
+        writer = ScoreWriter(output_path, output_format, progress)
+        total_rows = input_rows(input_path)
+        chunks = iter_input_chunks(input_path, chunk_size, progress['chunks_done'])
+        checkpoint_path = progress_path(output_path)
+
+        pool = None
+        if workers > 1:
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(backend, version, coerce)
+            )
+        else:
+            serving = ServingModel.load(backend, version=version, registry=version is not None, lite=False)
+            serving.predictor.set_threads(os.cpu_count() or 1)
+
+        start = time.perf_counter()
+        rows_at_start = progress['rows_done']
+        pending = deque()
+        try:
+            while True:
+                # maksimal dua chunk per worker di memori
+                while len(pending) < 2 * workers:
+                    item = next(chunks, None)
+                    if item is None:
+                        break
+                    number, chunk = item
+                    result = pool.submit(_worker_score_chunk, chunk) if pool is not None else score_chunk(serving, chunk, coerce)
+                    pending.append((number, result))
+                if not pending:
+                    break
+
+                number, result = pending.popleft()
+                output = result.result() if pool is not None else result
+                writer.write(number, output)
+
+                progress['chunks_done'] = number + 1
+                progress['rows_done'] += len(output)
+                progress['rows_invalid'] += int(output[Config.SCORE_ERROR_COLUMN].notna().sum())
+                _write_progress(checkpoint_path, {**progress, **writer.checkpoint()})
+
+                elapsed = time.perf_counter() - start
+                rate = (progress['rows_done'] - rows_at_start) / elapsed if elapsed > 0 else 0.0
+                message = f"Scored chunk {number} : {progress['rows_done']} rows, {rate:,.0f} rows/s"
+                if total_rows and rate > 0:
+                    remaining = (total_rows - progress['rows_done']) / rate
+                    message += f", {progress['rows_done'] / total_rows:.1%} done, ETA {remaining:.0f} s"
+                logger.info(message)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        elapsed = time.perf_counter() - start
+        progress['complete'] = True
+        progress['seconds'] = round(elapsed, 3)
+        progress['rows_per_second'] = round((progress['rows_done'] - rows_at_start) / elapsed, 1) if elapsed > 0 else None
+        _write_progress(checkpoint_path, {**progress, **writer.checkpoint()})
+        logger.info(
+            f"Scored {progress['rows_done']} rows ({progress['rows_invalid']} invalid) into {output_path} "
+            f"in {elapsed:.1f} s with {workers} worker(s)"
+        )
+        return progress
+
+    except Exception as e:
+        logger.error(f"Error Score File {e}")
+        raise
@@ -0,0 +1,305 @@
+import hashlib
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import sklearn
+import xgboost as xgb
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import KFold, ParameterGrid, ParameterSampler, train_test_split
+from config.config import Config
+from utils.logger import setup_logger
+
+logger = setup_logger('search')
+
+
+def search_parallelism(n_tasks=None):
+    """Split the CPU between parallel CV fits and XGBoost threads per fit.
+
+    Returns (n_jobs, xgb_threads) such that n_jobs * xgb_threads <= cpu_count,
+    so folds running side by side do not oversubscribe the cores.
+    """
+    cores = os.cpu_count() or 1
+    n_jobs = Config.SEARCH_N_JOBS if Config.SEARCH_N_JOBS > 0 else min(cores, Config.CV_FOLDS)
+    if n_tasks is not None:
+        n_jobs = max(1, min(n_jobs, n_tasks))
+    xgb_threads = max(1, cores // n_jobs)
+    return n_jobs, xgb_threads
+
+
+def data_hash(X, y) -> str:
+    """Content hash of the training data used as part of the CV cache key."""
+    digest = hashlib.sha256()
+    if sp.issparse(X):
+        X = X.tocsr()
+        digest.update(json.dumps(['csr', *X.shape]).encode())
+        for part in (X.data, X.indices, X.indptr):
+            digest.update(np.ascontiguousarray(part).tobytes())
+    else:
+        digest.update(json.dumps([str(col) for col in X.columns]).encode())
+        digest.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    digest.update(pd.util.hash_pandas_object(pd.Series(np.asarray(y)), index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def pipeline_params(pipeline, params):
+    """Pipeline parameters not set by the candidate, the ones that do not change the fit left out."""
+    return {
+        name: value for name, value in pipeline.get_params(deep=True).items()
+        # step object dan jumlah thread tidak mempengaruhi skor
+        if name not in params and name != 'regressor__n_jobs'
+        and (value is None or isinstance(value, (bool, int, float, str)))
+    }
+
+
+def _candidate_key(data_key, pipeline, params, extra=None):
+    payload = {
+        'data': data_key,
+        'params': params,
+        'pipeline': pipeline_params(pipeline, params),
+        'versions': {'xgboost': xgb.__version__, 'sklearn': sklearn.__version__},
+        'cv_folds': Config.CV_FOLDS,
+        'scoring': Config.SCORING,
+        'random_state': Config.RANDOM_STATE,
+        'extra': extra or {},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class CVCache:
+    """One JSON file per evaluated (data, params) combination."""
+
+    def __init__(self, directory=None, enabled=None):
+        self.directory = directory or Config.CV_CACHE_DIR
+        self.enabled = Config.CV_CACHE_ENABLED if enabled is None else enabled
+        if self.enabled:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key):
+        path = self.directory / f"{key}.json"
+        if not self.enabled or not path.exists():
+            return None
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def set(self, key, result):
+        if not self.enabled:
+            return
+        tmp_path = self.directory / f"{key}.json.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(result, f, indent=4)
+        os.replace(tmp_path, self.directory / f"{key}.json")
+
+
+def _rows(X, idx):
+    """Row subset of a DataFrame or a CSR matrix."""
+    return X[idx] if sp.issparse(X) else X.iloc[idx]
+
+
+def _fit_fold(pipeline, params, X, y, train_idx, test_idx):
+    scorer = get_scorer(Config.SCORING)
+    model = clone(pipeline).set_params(**params)
+
+    start = time.perf_counter()
+    model.fit(_rows(X, train_idx), y.iloc[train_idx])
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    score = scorer(model, _rows(X, test_idx), y.iloc[test_idx])
+    score_time = time.perf_counter() - start
+    return {'score': score, 'fit_time': fit_time, 'score_time': score_time}
+
+
+def _fit_fold_early_stopping(pipeline, params, X, y, train_idx, test_idx):
+    """Grow trees until the validation split stops improving, then score the fold."""
+    scorer = get_scorer(Config.SCORING)
+    model = clone(pipeline).set_params(
+        **params,
+        regressor__n_estimators=Config.EARLY_STOPPING_MAX_ESTIMATORS,
+        regressor__early_stopping_rounds=Config.EARLY_STOPPING_ROUNDS
+    )
+    fit_idx, val_idx = train_test_split(
+        train_idx,
+        test_size=Config.EARLY_STOPPING_VALIDATION_SIZE,
+        random_state=Config.RANDOM_STATE
+    )
+
+    start = time.perf_counter()
+    model.fit(
+        _rows(X, fit_idx), y.iloc[fit_idx],
+        regressor__eval_set=[(_rows(X, val_idx), y.iloc[val_idx])],
+        regressor__verbose=False
+    )
+    fit_time = time.perf_counter() - start
+
+    # predict memakai best_iteration secara otomatis
+    start = time.perf_counter()
+    score = scorer(model, _rows(X, test_idx), y.iloc[test_idx])
+    score_time = time.perf_counter() - start
+    best_iteration = int(model.named_steps['regressor'].best_iteration)
+    return {'score': score, 'fit_time': fit_time, 'score_time': score_time, 'best_iteration': best_iteration}
+
+
+def candidate_params(strategy=None):
+    strategy = strategy or Config.SEARCH_STRATEGY
+    if strategy == 'grid':
+        return list(ParameterGrid(Config.PARAMS))
+    if strategy == 'random':
+        return list(ParameterSampler(Config.PARAMS, n_iter=Config.SEARCH_N_ITER, random_state=Config.RANDOM_STATE))
+    raise ValueError(f"Unknown search strategy '{strategy}'")
+
+
+def cached_search(pipeline, X_train, y_train, candidates, fit_fold=_fit_fold, extra=None):
+    """Cross-validate candidates, skipping the ones already in the CV cache.
+
+    Uncached (candidate, fold) fits run in parallel; every candidate result is
+    written to the cache as soon as the search finishes.
+    """
+    cache = CVCache()
+    data_key = data_hash(X_train, y_train)
+    y_train = pd.Series(np.asarray(y_train))
+    splits = list(KFold(n_splits=Config.CV_FOLDS).split(X_train))
+
+    keys = [_candidate_key(data_key, pipeline, params, extra) for params in candidates]
+    results = {}
+    todo = []
+    for key, params in zip(keys, candidates):
+        cached = cache.get(key)
+        if cached is not None:
+            results[key] = {**cached, 'cached': True}
+        else:
+            todo.append((key, params))
+
+    logger.info(f"{len(candidates)} candidates, {len(candidates) - len(todo)} from CV cache, {len(todo)} to evaluate")
+
+    if todo:
+        tasks = [(key, params, fold) for key, params in todo for fold in splits]
+        n_jobs, xgb_threads = search_parallelism(len(tasks))
+        search_pipeline = clone(pipeline).set_params(regressor__n_jobs=xgb_threads)
+        logger.info(f"Running {len(tasks)} fits with {n_jobs} parallel jobs x {xgb_threads} XGBoost threads")
+
+        start = time.perf_counter()
+        fold_results = Parallel(n_jobs=n_jobs)(
+            delayed(fit_fold)(search_pipeline, params, X_train, y_train, train_idx, test_idx)
+            for _, params, (train_idx, test_idx) in tasks
+        )
+        logger.info(f"Evaluated {len(todo)} candidates in {time.perf_counter() - start:.1f}s")
+
+        n_folds = len(splits)
+        for i, (key, params) in enumerate(todo):
+            folds = fold_results[i * n_folds:(i + 1) * n_folds]
+            scores = [fold['score'] for fold in folds]
+            result = {
+                'params': params,
+                'mean_test_score': float(np.mean(scores)),
+                'std_test_score': float(np.std(scores)),
+                'fold_scores': [float(score) for score in scores],
+                'fit_time': float(sum(fold['fit_time'] for fold in folds)),
+                'score_time': float(sum(fold['score_time'] for fold in folds)),
+            }
+            if 'best_iteration' in folds[0]:
+                result['best_iterations'] = [fold['best_iteration'] for fold in folds]
+            cache.set(key, result)
+            results[key] = {**result, 'cached': False}
+
+    # urutan sama dengan kandidat supaya tie-break sama seperti GridSearchCV
+    return [results[key] for key in keys]
+
+
+def halving_search(pipeline, X_train, y_train, strategy):
+    """Successive halving over Config.PARAMS (no CV cache, sklearn handles the rounds)."""
+    from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+    from sklearn.model_selection import HalvingGridSearchCV, HalvingRandomSearchCV
+
+    n_jobs, xgb_threads = search_parallelism()
+    search_pipeline = clone(pipeline).set_params(regressor__n_jobs=xgb_threads)
+    kwargs = dict(
+        cv=Config.CV_FOLDS,
+        scoring=Config.SCORING,
+        factor=Config.HALVING_FACTOR,
+        random_state=Config.RANDOM_STATE,
+        n_jobs=n_jobs,
+    )
+    if strategy == 'halving':
+        search = HalvingGridSearchCV(search_pipeline, Config.PARAMS, **kwargs)
+    else:
+        search = HalvingRandomSearchCV(search_pipeline, Config.PARAMS, n_candidates=Config.SEARCH_N_ITER, **kwargs)
+    search.fit(X_train, y_train)
+
+    cv = search.cv_results_
+    final_iter = max(cv['iter'])
+    results = []
+    for i, params in enumerate(cv['params']):
+        # hanya kandidat yang bertahan sampai iterasi terakhir yang dibandingkan
+        if cv['iter'][i] != final_iter:
+            continue
+        results.append({
+            'params': params,
+            'mean_test_score': float(cv['mean_test_score'][i]),
+            'std_test_score': float(cv['std_test_score'][i]),
+            'fit_time': float(cv['mean_fit_time'][i] * Config.CV_FOLDS),
+            'score_time': float(cv['mean_score_time'][i] * Config.CV_FOLDS),
+            'n_resources': int(cv['n_resources'][i]),
+            'cached': False,
+        })
+    logger.info(f"Successive halving ran {len(cv['params'])} candidate evaluations over {final_iter + 1} rounds")
+    return results
+
+
+def run_search(pipeline, X_train, y_train, strategy=None):
+    """Run the configured hyperparameter search and return (best_params, best_score, results)."""
+    strategy = strategy or Config.SEARCH_STRATEGY
+    logger.info(f"Starting hyperparameter search, strategy '{strategy}'")
+
+    if strategy in ('halving', 'halving_random'):
+        results = halving_search(pipeline, X_train, y_train, strategy)
+    else:
+        results = cached_search(pipeline, X_train, y_train, candidate_params(strategy))
+
+    best = _select_best(strategy, results)
+    return best['params'], best['mean_test_score'], results
+
+
+def _select_best(strategy, results, best_params=None):
+    for result in results:
+        source = 'cache' if result['cached'] else f"{result['fit_time'] + result['score_time']:.2f}s"
+        logger.info(f"{result['params']} score {result['mean_test_score']:.4f} ({source})")
+
+    best = max(results, key=lambda result: result['mean_test_score'])
+    best_params = best_params or best['params']
+
+    with open(Config.CV_RESULTS_PATH, 'w') as f:
+        json.dump({'strategy': strategy, 'best_params': best_params, 'results': results}, f, indent=4)
+    return best
+
+
+def run_early_stopping_search(pipeline, X_train, y_train):
+    """Search (max_depth, learning_rate) once each, letting early stopping pick the tree count.
+
+    Returns (best_params, best_score, best_iterations) where best_params holds
+    ``regressor__n_estimators`` = median best iteration over the folds + 1.
+    """
+    logger.info("Starting hyperparameter search with early stopping")
+    grid = {name: values for name, values in Config.PARAMS.items() if name != 'regressor__n_estimators'}
+    extra = {
+        'mode': 'early_stopping',
+        'rounds': Config.EARLY_STOPPING_ROUNDS,
+        'max_estimators': Config.EARLY_STOPPING_MAX_ESTIMATORS,
+        'validation_size': Config.EARLY_STOPPING_VALIDATION_SIZE,
+    }
+    results = cached_search(
+        pipeline, X_train, y_train, list(ParameterGrid(grid)),
+        fit_fold=_fit_fold_early_stopping, extra=extra
+    )
+
+    best = max(results, key=lambda result: result['mean_test_score'])
+    n_estimators = int(np.median(best['best_iterations'])) + 1
+    best_params = {**best['params'], 'regressor__n_estimators': n_estimators}
+    _select_best('early_stopping', results, best_params)
+
+    logger.info(f"Best iterations per fold {best['best_iterations']}, use n_estimators={n_estimators}")
+    return best_params, best['mean_test_score'], best['best_iterations']
@@ -0,0 +1,186 @@
+import math
+import os
+import pickle
+import numpy as np
+from config.config import Config
+from utils.logger import setup_logger
+
+logger = setup_logger('spatial')
+
+# km per derajat (proyeksi equirectangular, cukup akurat untuk skala kota)
+KM_PER_DEGREE_LATITUDE = 110.574
+KM_PER_DEGREE_LONGITUDE = 111.320
+
+
+def project(latitude, longitude) -> np.ndarray:
+    """(n, 2) planar coordinates in km around ``Config.SPATIAL_REFERENCE_LATITUDE``."""
+    scale = KM_PER_DEGREE_LONGITUDE * math.cos(math.radians(Config.SPATIAL_REFERENCE_LATITUDE))
+    latitude = np.asarray(latitude, dtype=np.float64)
+    longitude = np.asarray(longitude, dtype=np.float64)
+    return np.column_stack([longitude * scale, latitude * KM_PER_DEGREE_LATITUDE])
+
+
+def _median_rows(values) -> np.ndarray:
+    # sort kecil per baris lebih murah dari np.median untuk k sekitar 10
+    values = np.sort(values, axis=1)
+    k = values.shape[1]
+    return (values[:, (k - 1) // 2] + values[:, k // 2]) / 2
+
+
+class SpatialIndex:
+    """k-d tree over the training listings for nearest-comparable features.
+
+    For a location, the features (``Config.SPATIAL_FEATURE_COLUMNS``) are the
+    median log price and median log price per square foot of the ``k``
+    nearest training listings, and their mean distance in km. Requests
+    without coordinates are placed at the median location of their LOCALITY
+    in the training split; without a known LOCALITY either, the features are
+    NaN, which the model treats as missing.
+    """
+
+    def __init__(self, tree, log_price, log_price_per_sqft, k, centroids=None):
+        self.tree = tree
+        self.log_price = log_price
+        self.log_price_per_sqft = log_price_per_sqft
+        self.k = min(k, len(log_price))
+        self.centroids = centroids or {}
+
+    @classmethod
+    def build(cls, latitude, longitude, log_price, propertysqft, locality=None, k=None):
+        from scipy.spatial import cKDTree
+
+        latitude = np.asarray(latitude, dtype=np.float64)
+        longitude = np.asarray(longitude, dtype=np.float64)
+        log_price = np.asarray(log_price, dtype=np.float64)
+        log_price_per_sqft = log_price - np.log(np.asarray(propertysqft, dtype=np.float64))
+        tree = cKDTree(project(latitude, longitude))
+
+        centroids = {}
+        if locality is not None:
+            locality = np.asarray(locality, dtype=object)
+            for value in np.unique(locality.astype(str)):
+                mask = locality == value
+                centroids[value] = (float(np.median(latitude[mask])), float(np.median(longitude[mask])))
+        return cls(tree, log_price, log_price_per_sqft, k or Config.SPATIAL_K, centroids)
+
+    @property
+    def n_listings(self):
+        return len(self.log_price)
+
+    def fill_coordinates(self, latitude, longitude, locality):
+        """Copies of the coordinate arrays with missing locations set to their LOCALITY centroid."""
+        latitude = np.array(latitude, dtype=np.float64)
+        longitude = np.array(longitude, dtype=np.float64)
+        missing = ~(np.isfinite(latitude) & np.isfinite(longitude))
+        for idx in np.flatnonzero(missing):
+            centroid = self.centroids.get(locality[idx])
+            if centroid is not None:
+                latitude[idx], longitude[idx] = centroid
+        return latitude, longitude
+
+    def _features(self, distances, neighbors) -> np.ndarray:
+        return np.column_stack([
+            _median_rows(self.log_price[neighbors]),
+            _median_rows(self.log_price_per_sqft[neighbors]),
+            distances.mean(axis=1),
+        ]).astype(np.float32)
+
+    def query(self, latitude, longitude, exclude=None) -> np.ndarray:
+        """Features (n, 3) for many locations in one vectorized tree query.
+
+        ``exclude`` holds, per location, the position of a training listing
+        to leave out of its own neighbours (the listing itself, when computing
+        features for the training split).
+        """
+        points = project(latitude, longitude)
+        features = np.full((len(points), len(Config.SPATIAL_FEATURE_COLUMNS)), np.nan, dtype=np.float32)
+        valid = np.isfinite(points).all(axis=1)
+        if not valid.any():
+            return features
+
+        k = min(self.k + (exclude is not None), self.n_listings)
+        distances, neighbors = self.tree.query(points[valid], k=k)
+        distances = distances.reshape(-1, k)
+        neighbors = neighbors.reshape(-1, k)
+
+        if exclude is not None:
+            # buang listing itu sendiri, atau tetangga terjauh jika tidak ada di hasil (koordinat kembar)
+            own = neighbors == np.asarray(exclude)[valid][:, None]
+            own[~own.any(axis=1), -1] = True
+            keep = ~own
+            distances = distances[keep].reshape(-1, k - 1)
+            neighbors = neighbors[keep].reshape(-1, k - 1)
+
+        features[valid] = self._features(distances, neighbors)
+        return features
+
+    def query_row(self, latitude, longitude, locality=None) -> np.ndarray:
+        """Features (3,) of one location, from the LOCALITY centroid when a coordinate is missing."""
+        if latitude is None or longitude is None or not math.isfinite(latitude) or not math.isfinite(longitude):
+            centroid = self.centroids.get(locality)
+            if centroid is None:
+                return np.full(len(Config.SPATIAL_FEATURE_COLUMNS), np.nan, dtype=np.float32)
+            latitude, longitude = centroid
+        distances, neighbors = self.tree.query(project(latitude, longitude)[0], k=self.k)
+        return self._features(np.reshape(distances, (1, -1)), np.reshape(neighbors, (1, -1)))[0]
+
+    def add_features(self, df, exclude=None):
+        """Copy of ``df`` with the spatial feature columns computed from its coordinate columns."""
+        df = df.copy()
+        coordinates = [
+            df[col].to_numpy(dtype=np.float64) if col in df.columns else np.full(len(df), np.nan)
+            for col in Config.COORDINATE_COLUMNS
+        ]
+        if 'LOCALITY' in df.columns:
+            coordinates = self.fill_coordinates(*coordinates, df['LOCALITY'].to_numpy(dtype=object))
+        features = self.query(*coordinates, exclude=exclude)
+        for idx, col in enumerate(Config.SPATIAL_FEATURE_COLUMNS):
+            df[col] = features[:, idx].astype(np.float64)
+        return df
+
+    def save(self, path=None):
+        path = path or Config.SPATIAL_INDEX_PATH
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self, f)
+        os.replace(tmp_path, path)
+        logger.info(f"Saved spatial index ({self.n_listings} listings, {len(self.centroids)} localities, k={self.k}) to {path}")
+        return path
+
+    @classmethod
+    def load(cls, path=None):
+        # tree k-d ikut di-pickle, tidak dibangun ulang saat load
+        with open(path or Config.SPATIAL_INDEX_PATH, 'rb') as f:
+            return pickle.load(f)
+
+
+def add_spatial_features(split):
+    """Spatial stage : build the index on the training split and add its features to both splits.
+
+    Training listings leave themselves out of their own neighbours, so the
+    features never contain the row's own target. The coordinate columns are
+    dropped afterwards, the model only sees the derived features.
+    """
+    try :
+        X_train, X_test = split['X_train'], split['X_test']
+        latitude, longitude = (X_train[col].to_numpy(dtype=np.float64) for col in Config.COORDINATE_COLUMNS)
+        index = SpatialIndex.build(
+            latitude, longitude, split['y_train'].to_numpy(), X_train[Config.PROPERTYSQFT].to_numpy(),
+            X_train['LOCALITY'].to_numpy(dtype=object)
+        )
+
+        X_train = index.add_features(X_train, exclude=np.arange(len(X_train)))
+        X_test = index.add_features(X_test)
+        logger.info(f"Added {Config.SPATIAL_FEATURE_COLUMNS} from {index.k} nearest training listings")
+
+        return {
+            'X_train': X_train.drop(columns=Config.COORDINATE_COLUMNS),
+            'X_test': X_test.drop(columns=Config.COORDINATE_COLUMNS),
+            'y_train': split['y_train'],
+            'y_test': split['y_test'],
+            'index': index,
+        }
+
+    except Exception as e:
+        logger.error(f"Error Spatial Features {e}")
+        raise
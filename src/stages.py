@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import pandas as pd
+import scipy.sparse as sp
+from config.config import Config
+from utils.logger import setup_logger
+
+logger = setup_logger('stages')
+
+
+def stage_key(name, inputs: dict) -> str:
+    """Hash of a stage name and everything its output depends on."""
+    payload = json.dumps({'stage': name, 'inputs': inputs}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class StageCache:
+    """On-disk cache of preprocessing stage outputs.
+
+    Each stage output is a dict of DataFrames/Series (stored as Parquet),
+    sparse matrices (.npz) and plain objects (pickled), saved under ``<name>-<key>`` where the key is the
+    hash of the stage inputs. A stage reruns only when its key changes, or
+    when ``force`` is set.
+    """
+
+    def __init__(self, directory=None, force=False, enabled=None):
+        self.directory = directory or Config.STAGE_CACHE_DIR
+        self.force = force
+        self.enabled = Config.STAGE_CACHE_ENABLED if enabled is None else enabled
+        self.reused = []
+        self.computed = []
+
+    def _path(self, name, key):
+        return self.directory / f"{name}-{key[:16]}"
+
+    def run(self, name, inputs: dict, fn):
+        """Return (outputs, key) for a stage, loading it from disk when possible."""
+        key = stage_key(name, inputs)
+        path = self._path(name, key)
+
+        if self.enabled and not self.force and (path / 'manifest.json').exists():
+            outputs = self._load(path)
+            self.reused.append(name)
+            logger.info(f"Stage '{name}' reused from {path.name}")
+            return outputs, key
+
+        outputs = fn()
+        if self.enabled:
+            self._save(path, outputs)
+        self.computed.append(name)
+        logger.info(f"Stage '{name}' computed")
+        return outputs, key
+
+    def _save(self, path, outputs: dict):
+        tmp_path = path.with_name(path.name + '.tmp')
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir(parents=True)
+
+        manifest = {}
+        for item, value in outputs.items():
+            if isinstance(value, pd.Series):
+                value.to_frame().to_parquet(tmp_path / f"{item}.parquet", engine='pyarrow')
+                manifest[item] = 'series'
+            elif isinstance(value, pd.DataFrame):
+                value.to_parquet(tmp_path / f"{item}.parquet", engine='pyarrow')
+                manifest[item] = 'frame'
+            elif sp.issparse(value):
+                sp.save_npz(tmp_path / f"{item}.npz", value.tocsr())
+                manifest[item] = 'sparse'
+            else:
+                with open(tmp_path / f"{item}.pkl", 'wb') as f:
+                    pickle.dump(value, f)
+                manifest[item] = 'pickle'
+
+        # manifest ditulis terakhir sebagai penanda output lengkap
+        with open(tmp_path / 'manifest.json', 'w') as f:
+            json.dump(manifest, f, indent=4)
+
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+
+    def _load(self, path):
+        with open(path / 'manifest.json', 'r') as f:
+            manifest = json.load(f)
+
+        outputs = {}
+        for item, kind in manifest.items():
+            if kind == 'series':
+                outputs[item] = pd.read_parquet(path / f"{item}.parquet", engine='pyarrow').iloc[:, 0]
+            elif kind == 'frame':
+                outputs[item] = pd.read_parquet(path / f"{item}.parquet", engine='pyarrow')
+            elif kind == 'sparse':
+                outputs[item] = sp.load_npz(path / f"{item}.npz").tocsr()
+            else:
+                with open(path / f"{item}.pkl", 'rb') as f:
+                    outputs[item] = pickle.load(f)
+        return outputs
+
+    def summary(self):
+        reused = ', '.join(self.reused) or '-'
+        computed = ', '.join(self.computed) or '-'
+        return f"Reused stages: {reused}; recomputed stages: {computed}"
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+from config.config import Config
+from utils.logger import setup_logger
+
+logger = setup_logger('summary')
+
+
+def outlier_stats(series: pd.Series) -> dict:
+    """IQR outlier count and share, outside Q1 - 1.5*IQR and Q3 + 1.5*IQR."""
+    values = series.dropna().to_numpy(dtype=float)
+    q1, q3 = np.percentile(values, [25, 75]) if len(values) else (np.nan, np.nan)
+    iqr = q3 - q1
+    lower, upper = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+    # NaN bukan outlier, tapi tetap dihitung di total (sama dengan series.quantile)
+    count = int(((values < lower) | (values > upper)).sum())
+    total = len(series)
+    return {
+        'count': count,
+        'percent': count / total * 100 if total > 0 else 0.0,
+        'total': total,
+        'lower': float(lower),
+        'upper': float(upper),
+    }
+
+
+def box_stats(series: pd.Series) -> dict:
+    """Quartiles and Tukey whiskers (last values inside 1.5 * IQR), enough to draw a box plot."""
+    values = series.dropna().to_numpy(dtype=float)
+    if not len(values):
+        return None
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    return {
+        'q1': float(q1),
+        'median': float(median),
+        'q3': float(q3),
+        'mean': float(values.mean()),
+        'lowerfence': float(inside.min()),
+        'upperfence': float(inside.max()),
+        'min': float(values.min()),
+        'max': float(values.max()),
+    }
+
+
+def histogram(series: pd.Series, bins=None) -> dict:
+    """Bin counts and edges for a numeric column, value counts for a categorical one."""
+    if pd.api.types.is_numeric_dtype(series):
+        counts, edges = np.histogram(series.dropna().to_numpy(dtype=float), bins=bins or Config.DASHBOARD_HIST_BINS)
+        return {'counts': counts, 'edges': edges}
+
+    counts = series.value_counts()
+    return {'counts': counts.to_numpy(), 'labels': counts.index.astype(str).tolist()}
+
+
+def feature_summary(series: pd.Series, bins=None) -> dict:
+    numeric = pd.api.types.is_numeric_dtype(series)
+    return {
+        'numeric': numeric,
+        'describe': series.describe(),
+        'histogram': histogram(series, bins),
+        'outliers': outlier_stats(series) if numeric else None,
+        'box': box_stats(series) if numeric else None,
+    }
+
+
+def dataset_summary(df: pd.DataFrame, bins=None) -> dict:
+    """Everything the dashboards show about the dataset, computed once.
+
+    Per feature: ``describe()``, histogram bins, box plot stats and IQR outlier stats;
+    for the whole table: row count, duplicates, target mean/min and the
+    correlation matrix of the numeric features.
+    """
+    try:
+        df = df[Config.FEATURE_COLUMN]
+        target = df[Config.TARGET_COLUMN]
+        return {
+            'rows': len(df),
+            'duplicated': int(df.duplicated().sum()),
+            'target_mean': float(target.mean()),
+            'target_min': float(target.min()),
+            'corr': df.corr(numeric_only=True),
+            'features': {col: feature_summary(df[col], bins) for col in Config.FEATURE_COLUMN},
+        }
+
+    except Exception as e:
+        logger.error(f"Error Dataset Summary {e}")
+        raise
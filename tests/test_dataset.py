@@ -0,0 +1,37 @@
+"""Parquet dataset cache built from a CSV with blank cells."""
+import pandas as pd
+from config.config import Config
+from src.dataset import build_dataset_cache
+
+COLUMNS = ['PRICE', 'BEDS', 'BATH', 'PROPERTYSQFT', 'LOCALITY']
+
+
+def _build_cache(tmp_path, monkeypatch, csv_path):
+    monkeypatch.setattr(Config, 'DATA_PATH', csv_path)
+    monkeypatch.setattr(Config, 'DATASET_CACHE_DIR', tmp_path / 'cache')
+    monkeypatch.setattr(Config, 'DATASET_CACHE_PATH', tmp_path / 'cache' / 'listings.parquet')
+    monkeypatch.setattr(Config, 'DATASET_CACHE_META_PATH', tmp_path / 'cache' / 'listings.json')
+    return build_dataset_cache(COLUMNS)
+
+
+def test_blank_int_cells(tmp_path, monkeypatch):
+    csv_path = tmp_path / 'listings.csv'
+    csv_path.write_text(
+        'PRICE,BEDS,BATH,PROPERTYSQFT,LOCALITY\n'
+        '315000,2,2,1400,New York\n'
+        ',3,2,1200,Kings County\n'
+        '450000,,1.5,900,New York\n'
+    )
+    df = _build_cache(tmp_path, monkeypatch, csv_path)
+    cached = pd.read_parquet(Config.DATASET_CACHE_PATH)
+    # sel kosong jadi NaN, baris dibuang nanti di clean_data
+    assert df['PRICE'].isna().tolist() == [False, True, False]
+    assert df['BEDS'].isna().tolist() == [False, False, True]
+    pd.testing.assert_frame_equal(cached, df)
+
+
+def test_int_columns_without_blanks(tmp_path, monkeypatch):
+    csv_path = tmp_path / 'listings.csv'
+    csv_path.write_text('PRICE,BEDS,BATH,PROPERTYSQFT,LOCALITY\n315000,2,2,1400,New York\n')
+    df = _build_cache(tmp_path, monkeypatch, csv_path)
+    assert df['PRICE'].dtype == 'int64' and df['BEDS'].dtype == 'int64'
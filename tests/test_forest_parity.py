@@ -0,0 +1,104 @@
+"""Parity of ``CompiledForest.predict`` with ``Booster.inplace_predict``.
+
+Small boosters are trained here for NaN and 0.0 (SPARSE_ENCODING) as the
+missing value; the exported model is checked too when it has been trained.
+"""
+import pickle
+import numpy as np
+import pytest
+import scipy.sparse as sp
+import xgboost as xgb
+from config.config import Config
+from src.forest import CompiledForest, parity_features
+from src.inference import CompiledEncoder, PipelinePredictor
+from src.registry import ArtifactPaths
+
+RTOL = Config.FOREST_PARITY_RTOL
+
+
+def _train_booster(missing, n_rows=2000, n_features=8, seed=0):
+    """Booster trained on data with missing entries, stamped with ``missing`` like export_booster."""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, n_features)).astype(np.float32)
+    y = X[:, 0] * 2 + np.sin(X[:, 1]) + rng.normal(scale=0.1, size=n_rows)
+    X[rng.random(X.shape) < 0.2] = missing
+    booster = xgb.train(
+        {'max_depth': 6, 'eta': 0.3, 'base_score': 0.5, 'nthread': 1},
+        xgb.DMatrix(X, label=y, missing=missing),
+        num_boost_round=30
+    )
+    booster.set_attr(missing=str(missing))
+    return booster
+
+
+def _rows(n_rows, n_features=8, missing=np.nan, seed=1):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, n_features)).astype(np.float32)
+    X[rng.random(X.shape) < 0.2] = missing
+    return X
+
+
+def _assert_parity(forest, booster, X):
+    expected = booster.inplace_predict(X, missing=forest.missing)
+    np.testing.assert_allclose(forest.predict(X), expected, rtol=RTOL, atol=0)
+
+
+@pytest.mark.parametrize('n_rows', [1, 7, Config.FOREST_CHUNK_ROWS * 3 + 5])
+def test_nan_missing(n_rows):
+    booster = _train_booster(np.nan)
+    forest = CompiledForest.from_booster(booster)
+    _assert_parity(forest, booster, _rows(n_rows))
+
+
+@pytest.mark.parametrize('n_rows', [1, 7, Config.FOREST_CHUNK_ROWS * 3 + 5])
+def test_zero_missing(n_rows):
+    booster = _train_booster(0.0)
+    forest = CompiledForest.from_booster(booster)
+    assert forest.missing == 0.0
+
+    X = _rows(n_rows, missing=0.0)
+    _assert_parity(forest, booster, X)
+    # CSR dari SPARSE_ENCODING : entri yang tidak disimpan juga missing
+    _assert_parity(forest, booster, sp.csr_matrix(X))
+
+
+def test_single_rows_match_batch():
+    booster = _train_booster(np.nan)
+    forest = CompiledForest.from_booster(booster)
+    X = _rows(50)
+    batch = forest.predict(X)
+    single = np.concatenate([forest.predict(X[[idx]]) for idx in range(len(X))])
+    np.testing.assert_array_equal(single, batch)
+
+
+def test_saved_forest_roundtrip(tmp_path):
+    booster = _train_booster(0.0)
+    path = CompiledForest.from_booster(booster, booster_sha256='abc').save(tmp_path / 'forest.npz')
+    forest = CompiledForest.load(path)
+    assert forest.missing == 0.0 and forest.booster_sha256 == 'abc'
+    _assert_parity(forest, booster, _rows(10, missing=0.0))
+
+
+paths = ArtifactPaths.files()
+
+
+@pytest.mark.skipif(
+    not (paths.model.exists() and paths.booster.exists() and paths.encoder.exists()),
+    reason="trained artifacts missing, run python train.py"
+)
+@pytest.mark.parametrize('n_rows', [1, 1000])
+def test_trained_booster(n_rows):
+    booster = xgb.Booster()
+    booster.load_model(str(paths.booster))
+    forest = CompiledForest.from_booster(booster)
+    with open(paths.encoder, 'rb') as f:
+        encoder = pickle.load(f)
+    compiled_encoder = CompiledEncoder(encoder, PipelinePredictor.load(paths.model).feature_names)
+
+    X = parity_features(compiled_encoder, n_rows=n_rows)
+    X = X.toarray() if sp.issparse(X) else X
+    # fitur numerik kosong (NaN), selain baris dari parity_features
+    X_missing = X.copy()
+    X_missing[::3, compiled_encoder.numeric_index[0]] = np.nan
+    for rows in (X[:n_rows], X_missing[:n_rows]):
+        _assert_parity(forest, booster, rows)
@@ -0,0 +1,168 @@
+"""Parity of the serving paths on the trained artifacts.
+
+The sklearn Pipeline, the native Booster (``inplace_predict``) and the
+legacy ``build_feature_frame`` pandas path must give the same predictions.
+Run ``python train.py`` first; without trained artifacts the module is skipped.
+"""
+import pickle
+import numpy as np
+import pandas as pd
+import pytest
+from config.config import Config
+from src.inference import (
+    BoosterPredictor, CompiledEncoder, PipelinePredictor, _parity_frame, build_feature_frame,
+    record_key, validate_frame,
+)
+from src.registry import ArtifactPaths
+
+RTOL = 1e-6
+
+paths = ArtifactPaths.files()
+pytestmark = pytest.mark.skipif(
+    not (paths.model.exists() and paths.booster.exists() and paths.encoder.exists()),
+    reason="trained artifacts missing, run python train.py"
+)
+
+
+@pytest.fixture(scope='module')
+def encoder():
+    with open(paths.encoder, 'rb') as f:
+        return pickle.load(f)
+
+
+@pytest.fixture(scope='module')
+def pipeline():
+    return PipelinePredictor.load(paths.model)
+
+
+@pytest.fixture(scope='module')
+def booster():
+    return BoosterPredictor.load(paths.booster)
+
+
+@pytest.fixture(scope='module')
+def compiled_encoder(encoder, pipeline):
+    return CompiledEncoder(encoder, pipeline.feature_names)
+
+
+def _predictions(input_df, encoder, compiled_encoder, pipeline, booster):
+    """Log price of every row through each serving path."""
+    features = compiled_encoder.encode_frame(input_df)
+    return {
+        'legacy': pipeline.predict(build_feature_frame(input_df, encoder)),
+        'pipeline': pipeline.predict(features),
+        'booster': booster.predict(features),
+        'encode_row': np.array([
+            booster.predict(compiled_encoder.encode_row(*record_key(record)))[0]
+            for record in input_df.to_dict('records')
+        ]),
+    }
+
+
+def _assert_parity(predictions):
+    expected = predictions.pop('legacy')
+    for name, actual in predictions.items():
+        np.testing.assert_allclose(actual, expected, rtol=RTOL, atol=0, err_msg=name)
+
+
+def test_valid_rows(encoder, compiled_encoder, pipeline, booster):
+    input_df = _parity_frame(encoder)
+    _assert_parity(_predictions(input_df, encoder, compiled_encoder, pipeline, booster))
+
+
+def test_unknown_locality(encoder, compiled_encoder, pipeline, booster):
+    input_df = _parity_frame(encoder)
+    input_df['LOCALITY'] = np.where(np.arange(len(input_df)) % 2 == 0, 'Atlantis', input_df['LOCALITY'])
+    predictions = _predictions(input_df, encoder, compiled_encoder, pipeline, booster)
+
+    # kategori asing di-encode nol (handle_unknown='ignore'), sama di semua path
+    unknown = compiled_encoder.encode_frame(input_df[input_df['LOCALITY'] == 'Atlantis'])
+    assert not unknown[:, len(compiled_encoder.numeric_index):].any()
+    _assert_parity(predictions)
+
+
+def test_mixed_validity_batch(encoder, compiled_encoder, pipeline, booster):
+    records = [
+        {'PRICE': 500000, 'BEDS': 2, 'BATH': 2, 'PROPERTYSQFT': 1200, 'LOCALITY': 'New York'},
+        {'PRICE': 500000, 'BEDS': 0, 'BATH': 2, 'PROPERTYSQFT': 1200, 'LOCALITY': 'New York'},
+        {'PRICE': 500000, 'BEDS': 3, 'BATH': 1, 'PROPERTYSQFT': 900, 'LOCALITY': 'Atlantis'},
+        {'PRICE': 500000, 'BEDS': 3, 'BATH': 1, 'PROPERTYSQFT': 900, 'LOCALITY': 'Kings County'},
+        {'PRICE': 500000, 'BEDS': 3, 'BATH': 1.5, 'PROPERTYSQFT': 900, 'LOCALITY': 'Brooklyn'},
+        {'PRICE': 500000, 'BEDS': 4, 'BATH': 3, 'PROPERTYSQFT': None, 'LOCALITY': 'Queens'},
+        {'PRICE': 500000, 'BEDS': 4, 'BATH': 3, 'PROPERTYSQFT': 2500, 'LOCALITY': None},
+    ]
+    input_df, valid_mask, errors = validate_frame(pd.DataFrame(records))
+    assert valid_mask.tolist() == [True, False, False, True, False, False, True]
+    # LOCALITY kosong diisi DEFAULT_LOCALITY, LOCALITY asing ditolak di API
+    assert errors[2] == "Invalid value for LOCALITY"
+    assert sorted(errors) == [1, 2, 4, 5]
+
+    valid_df = input_df[valid_mask].reset_index(drop=True)
+    predictions = _predictions(valid_df, encoder, compiled_encoder, pipeline, booster)
+
+    # baris valid tidak terpengaruh baris lain di batch yang sama
+    single = np.concatenate([
+        pipeline.predict(build_feature_frame(valid_df.iloc[[idx]], encoder)) for idx in range(len(valid_df))
+    ])
+    np.testing.assert_allclose(predictions['legacy'], single, rtol=RTOL, atol=0)
+    _assert_parity(predictions)
+
+
+
+def _with_unknown(input_df):
+    input_df = input_df.copy()
+    input_df.loc[::5, 'LOCALITY'] = 'Atlantis'
+    return input_df
+
+
+def test_layout_matches_fitted_encoder(encoder, compiled_encoder, pipeline):
+    input_df = _with_unknown(_parity_frame(encoder))
+    legacy = build_feature_frame(input_df, encoder)
+
+    # urutan kolom sama dengan OneHotEncoder.transform dan model, kategori asing semua nol
+    assert compiled_encoder.columns == list(legacy.columns) == [str(name) for name in pipeline.feature_names]
+    np.testing.assert_array_equal(compiled_encoder.encode_frame(input_df), legacy.to_numpy(dtype=np.float32))
+    rows = np.vstack([compiled_encoder.encode_row(*record_key(record)).copy() for record in input_df.to_dict('records')])
+    np.testing.assert_array_equal(rows, legacy.to_numpy(dtype=np.float32))
+
+
+def test_layout_follows_feature_names(encoder, compiled_encoder):
+    input_df = _with_unknown(_parity_frame(encoder))
+    legacy = build_feature_frame(input_df, encoder)
+
+    shuffled = list(reversed(compiled_encoder.columns))
+    layout = CompiledEncoder(encoder, shuffled)
+    np.testing.assert_array_equal(layout.encode_frame(input_df), legacy[shuffled].to_numpy(dtype=np.float32))
+
+
+def test_spatial_layout(encoder):
+    from src.inference import NUMERIC_FEATURES
+    from src.spatial import SpatialIndex
+
+    rng = np.random.default_rng(0)
+    n_listings = 200
+    localities = rng.choice(Config.LOCALITY_COLUMN, n_listings)
+    spatial = SpatialIndex.build(
+        rng.uniform(40.5, 40.9, n_listings), rng.uniform(-74.2, -73.7, n_listings),
+        rng.normal(13, 1, n_listings), rng.integers(300, 5000, n_listings), localities
+    )
+    encoded_names = list(encoder.get_feature_names_out(encoder.feature_names_in_))
+    feature_names = NUMERIC_FEATURES + Config.SPATIAL_FEATURE_COLUMNS + encoded_names
+
+    input_df = _with_unknown(_parity_frame(encoder))
+    input_df['LATITUDE'] = rng.uniform(40.5, 40.9, len(input_df))
+    input_df['LONGITUDE'] = rng.uniform(-74.2, -73.7, len(input_df))
+    # tanpa koordinat : lokasi median LOCALITY, LOCALITY asing tetap NaN
+    input_df.loc[::3, ['LATITUDE', 'LONGITUDE']] = np.nan
+
+    layout = CompiledEncoder(encoder, feature_names, spatial=spatial)
+    assert layout.has_spatial
+    legacy = build_feature_frame(input_df, encoder, spatial)
+    assert layout.columns == list(legacy.columns)
+    np.testing.assert_array_equal(layout.encode_frame(input_df), legacy.to_numpy(dtype=np.float32))
+
+    # tanpa index fitur spasial NaN, kolom lain tidak bergeser
+    without_index = CompiledEncoder(encoder, feature_names).encode_frame(input_df)
+    assert np.isnan(without_index[:, layout.spatial_index]).all()
+    others = np.setdiff1d(np.arange(layout.n_features), layout.spatial_index)
+    np.testing.assert_array_equal(without_index[:, others], legacy.to_numpy(dtype=np.float32)[:, others])
@@ -0,0 +1,54 @@
+"""Chunked ingestion of a messy listing CSV (blank cells, outliers, duplicates)."""
+import json
+import pandas as pd
+import pytest
+from config.config import Config
+from src.ingestion import ingest_chunked, iter_ingested
+
+HEADER = 'BROKERTITLE,PRICE,BEDS,BATH,PROPERTYSQFT,ADDRESS,LOCALITY'
+
+
+def _write_csv(path):
+    rows = [
+        f'Broker {idx},{300000 + idx * 1000},{1 + idx % 5},{1 + idx % 3}.5,{800 + idx * 10},"{idx} Main St, Unit 1",New York'
+        for idx in range(60)
+    ]
+    rows += [
+        'Broker x,450000,,2,1200,1 Blank Beds St,New York',
+        'Broker x,,3,2,1200,2 Blank Price St,Kings County',
+        'Broker x,450000,3,,1200,3 Blank Bath St,Kings County',
+        'Broker x,450000,3,2,1200,4 Blank Locality St,',
+        'Broker x,500,3,2,1200,5 Cheap St,New York',
+        'Broker x,450000,40,2,1200,6 Many Beds St,New York',
+        'Broker x,450000,3,2,99999,7 Huge St,New York',
+        rows[0],
+    ]
+    path.write_text('\n'.join([HEADER, *rows]) + '\n')
+    return path
+
+
+@pytest.fixture(autouse=True)
+def _range_rule(monkeypatch):
+    monkeypatch.setattr(Config, 'OUTLIER_RULE', 'range')
+
+
+@pytest.mark.parametrize('chunk_size', [7, 1000])
+def test_blank_and_outlier_rows(tmp_path, chunk_size):
+    csv_path = _write_csv(tmp_path / 'listings.csv')
+    output_dir = ingest_chunked(tmp_path / 'ingest', path=csv_path, chunk_size=chunk_size)
+
+    with open(output_dir / 'manifest.json', 'r') as f:
+        stats = json.load(f)
+    assert stats['rows_read'] == 68
+    assert stats['rows_missing'] == 4
+    assert stats['rows_outlier'] == 3
+    assert stats['rows_duplicate'] == 1
+    assert stats['rows_train'] + stats['rows_test'] == 60
+
+    rows = pd.concat([chunk for split in ('train', 'test') for chunk in iter_ingested(output_dir, split)])
+    assert len(rows) == 60
+    assert not rows.isna().any().any()
+    # kolom integer tetap int64 meskipun CSV punya sel kosong
+    for col in ['PRICE', 'BEDS', 'BATH', 'PROPERTYSQFT']:
+        assert rows[col].dtype == 'int64', col
+    assert sorted(rows['BATH'].unique().tolist()) == [1, 2, 3]
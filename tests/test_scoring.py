@@ -0,0 +1,45 @@
+"""Resume of bulk scoring: chunk skipping and the checks on the interrupted run."""
+import json
+import pandas as pd
+import pytest
+from src import scoring
+from src.scoring import iter_input_chunks, progress_path
+
+
+def _write_csv(path, n_rows=25):
+    lines = ['BROKERTITLE,PRICE,BEDS,BATH,PROPERTYSQFT,ADDRESS,LOCALITY']
+    for idx in range(n_rows):
+        # alamat dengan newline di dalam kutip : satu record, dua baris fisik
+        address = f'"{idx} Main St\nUnit {idx}"' if idx % 3 == 0 else f'{idx} Main St'
+        lines.append(f'Broker {idx},{300000 + idx},2,2,1200,{address},New York')
+    path.write_text('\n'.join(lines) + '\n')
+    return path
+
+
+@pytest.mark.parametrize('skip_chunks', [1, 3])
+def test_resume_skips_records(tmp_path, skip_chunks):
+    path = _write_csv(tmp_path / 'listings.csv')
+    full = list(iter_input_chunks(path, chunk_size=4))
+    resumed = list(iter_input_chunks(path, chunk_size=4, skip_chunks=skip_chunks))
+
+    assert [number for number, _ in resumed] == [number for number, _ in full][skip_chunks:]
+    for (_, expected), (_, actual) in zip(full[skip_chunks:], resumed):
+        pd.testing.assert_frame_equal(actual, expected)
+    assert resumed[0][1]['PRICE'].iloc[0] == 300000 + 4 * skip_chunks
+
+
+def test_resume_rejects_changed_model_files(tmp_path, monkeypatch):
+    path = _write_csv(tmp_path / 'listings.csv')
+    output = tmp_path / 'scored.csv'
+    monkeypatch.setattr(scoring, 'model_fingerprint', lambda version: 'before')
+    progress = {
+        **scoring._input_stat(path), 'chunk_size': 4, 'model_version': None,
+        'model_fingerprint': 'before', 'coerce': True, 'chunks_done': 1, 'complete': False,
+    }
+    progress_path(output).write_text(json.dumps(progress))
+    assert scoring._resume_progress(path, output, 4, None, True)['chunks_done'] == 1
+
+    # registry mati : versi None, retrain hanya terlihat dari file model
+    monkeypatch.setattr(scoring, 'model_fingerprint', lambda version: 'after')
+    with pytest.raises(ValueError, match='model_fingerprint'):
+        scoring._resume_progress(path, output, 4, None, True)
@@ -1,33 +1,92 @@
 from src.data_preparation import load_prepare_data
-from src.model import create_pipeline,train_model
-from src.evaluation import evaluate_model
+from src.matrix_store import build_matrix_stores
+from src.model import create_pipeline,train_model,train_model_from_store,early_stopping_metrics
+from src.evaluation import evaluate_model, evaluate_model_from_store
+from src.prediction_table import build_prediction_table
+from src.bundle import export_bundle
+from src.forest import export_forest
+from src.comps import build_comps_index
+from src.registry import publish
+from config.config import Config
 from utils.logger import setup_logger
+import argparse
+import resource
+import sys
 import pandas as pd
 
 logger = setup_logger('train')
 
-def main() :
+def peak_rss_mb():
+    """Peak resident memory of this process (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def main(force=False) :
     try :
-        #load and prepare data
-        logger.info("Loading and Preparing Data...")
-        X_train, X_test, y_train, y_test = load_prepare_data()
-        
-        #create an train model
-        logger.info("Creating and Traning Model...")
         pipeline = create_pipeline()
-        model = train_model(pipeline,X_train,y_train)
+        if Config.MATRIX_STORE_ENABLED:
+            # design matrix di memmap, training dibaca dari file
+            logger.info("Building Matrix Store...")
+            train_store, test_store = build_matrix_stores(force=force)
+            
+            logger.info("Creating and Traning Model...")
+            model = train_model_from_store(pipeline,train_store)
+        else:
+            #load and prepare data
+            logger.info("Loading and Preparing Data...")
+            X_train, X_test, y_train, y_test = load_prepare_data(force=force)
+            
+            #create an train model
+            logger.info("Creating and Traning Model...")
+            model = train_model(pipeline,X_train,y_train)
         
         # evaluate model
         logger.info("Evaluasi model...")
-        metrics = evaluate_model(model,X_test,y_test)
+        extra_metrics = None
+        if Config.TRAINING_MODE == 'early_stopping':
+            # best iteration per fold CV, bukan n_estimators - 1
+            extra_metrics = early_stopping_metrics(model.named_steps['regressor'].n_estimators)
+        if Config.MATRIX_STORE_ENABLED:
+            # test split diprediksi per batch dari memmap, tidak di-load utuh
+            metrics = evaluate_model_from_store(model,test_store,extra_metrics)
+        else:
+            metrics = evaluate_model(model,X_test,y_test,extra_metrics)
         
         logger.info("Training completed successfully")
         logger.info(f"Test MAE: {metrics['MAE']:.4f}")
         logger.info(f"Test RMSE: {metrics['RMSE']:.4f}")
         logger.info(f"Test R2 Score: {metrics['R2_SCORE']:.4f}")
         
+        # precompute prediction table for serving
+        if Config.BUILD_PREDICTION_TABLE:
+            logger.info("Building prediction table...")
+            build_prediction_table()
+        
+        # bundle kecil untuk SERVING_MODE=lite (tanpa pickle)
+        if Config.EXPORT_BUNDLE:
+            export_bundle()
+        
+        # tree booster sebagai array NumPy untuk backend 'forest'
+        if Config.EXPORT_FOREST:
+            export_forest()
+        
+        # index comparable listings untuk /comps (dari dataset, bukan model)
+        if Config.BUILD_COMPS_INDEX:
+            build_comps_index()
+        
+        # publish versi baru ke registry, API mengambilnya lewat pointer CURRENT
+        if Config.REGISTRY_ENABLED:
+            version = publish()
+            logger.info(f"Model version {version} is now current")
+        
+        logger.info(f"Peak RSS: {peak_rss_mb():.1f} MB")
+        
     except Exception as e:
         logger.error(f"Error Train Data {e}")
         raise
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train the house price model")
+    parser.add_argument('--force', action='store_true', help="recompute every preprocessing stage")
+    args = parser.parse_args()
+    
+    main(force=args.force)
\ No newline at end of file
@@ -0,0 +1,52 @@
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+
+def histogram_bar(histogram, name=None, color=None) -> go.Bar:
+    """Bar trace from precomputed bins (numeric) or value counts (categorical)."""
+    if 'edges' in histogram:
+        edges = histogram['edges']
+        return go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=histogram['counts'],
+            width=edges[1:] - edges[:-1],
+            name=name,
+            marker_color=color,
+        )
+    return go.Bar(x=histogram['labels'], y=histogram['counts'], name=name, marker_color=color)
+
+
+def box_trace(box, name=None) -> go.Box:
+    """Horizontal box from precomputed quartiles and whiskers, without the raw points."""
+    return go.Box(
+        q1=[box['q1']],
+        median=[box['median']],
+        q3=[box['q3']],
+        mean=[box['mean']],
+        lowerfence=[box['lowerfence']],
+        upperfence=[box['upperfence']],
+        orientation='h',
+        name=name,
+        boxpoints=False,
+    )
+
+
+def histogram_figure(summary, title, color=None, marginal_box=False) -> go.Figure:
+    """Histogram of one feature summary, optionally with the box plot above it (like ``marginal="box"``)."""
+    bar = histogram_bar(summary['histogram'], color=color)
+    if not (marginal_box and summary['box']):
+        fig = go.Figure(bar)
+    else:
+        fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.2, 0.8], vertical_spacing=0.02)
+        fig.add_trace(box_trace(summary['box']), row=1, col=1)
+        fig.add_trace(bar, row=2, col=1)
+        fig.update_yaxes(showticklabels=False, row=1, col=1)
+
+    fig.update_layout(title=title, showlegend=False, bargap=0)
+    return fig
+
+
+def box_figure(summary, title, name=None) -> go.Figure:
+    fig = go.Figure(box_trace(summary['box'], name))
+    fig.update_layout(title=title, showlegend=False)
+    return fig
@@ -0,0 +1,27 @@
+from functools import lru_cache
+import streamlit as st
+from config.config import Config
+from src.dataset import dataset_fingerprint, load_dataset
+from src.summary import dataset_summary
+
+
+@lru_cache(maxsize=1)
+def _fingerprint(size, mtime_ns):
+    # hash isi dataset hanya dihitung ulang jika ukuran / mtime CSV berubah
+    return dataset_fingerprint()
+
+
+@st.cache_resource(max_entries=1, show_spinner="Loading dataset...")
+def _load(fingerprint):
+    df = load_dataset(Config.FEATURE_COLUMN)
+    return df, dataset_summary(df)
+
+
+def load_dashboard_data():
+    """Dataset and its precomputed summaries, shared by every page and session.
+
+    Loaded once per process and keyed on the dataset hash, so a rerun only
+    renders; the DataFrame is shared, pages must not modify it in place.
+    """
+    stat = Config.DATA_PATH.stat()
+    return _load(_fingerprint(stat.st_size, stat.st_mtime_ns))
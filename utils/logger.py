@@ -1,28 +1,162 @@
+import atexit
+import json
 import logging
-import os
-from datetime import datetime
-from pathlib import Path
+import logging.handlers
+import multiprocessing
+import queue
+import random
+import threading
+from config.config import Config
+
+# extra untuk log per-request, di-sample sesuai Config.LOG_SAMPLE_RATE
+PER_REQUEST = {'per_request': True}
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# atribut bawaan LogRecord, sisanya dianggap field tambahan (extra) di output JSON
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'per_request'}
+
+_lock = threading.Lock()
+_queue_handler = None
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with any ``extra`` fields as top-level keys."""
+
+    def format(self, record):
+        payload = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        payload.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload['exc_info'] = record.exc_text
+        if record.stack_info:
+            payload['stack_info'] = record.stack_info
+        return json.dumps(payload, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a ``rate`` fraction of records logged with ``extra=PER_REQUEST``."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if getattr(record, 'per_request', False):
+            return self.rate >= 1.0 or random.random() < self.rate
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks the caller : records are dropped (and counted) when the queue is full."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        # dipanggil dari banyak thread request, lock hanya diambil saat record di-drop
+        self._dropped_lock = threading.Lock()
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def prepare(self, record):
+        # pesan di-format di sini, traceback disimpan di exc_text supaya formatter JSON tetap bisa memisahkannya.
+        # Tidak di-copy : handler ini satu-satunya handler logger (propagate=False)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class PerLoggerFileHandler(logging.Handler):
+    """Write each logger's records to ``<directory>/<name>.log``, with size or time rotation.
+
+    Files are opened on first use inside the listener thread, never on the request path.
+    """
+
+    def __init__(self, directory, formatter):
+        super().__init__()
+        self.directory = directory
+        self.setFormatter(formatter)
+        self._handlers = {}
+
+    def _open(self, name):
+        path = self.directory / f"{name}.log"
+        if Config.LOG_ROTATION == 'time':
+            handler = logging.handlers.TimedRotatingFileHandler(
+                path, when=Config.LOG_ROTATE_WHEN, backupCount=Config.LOG_BACKUP_COUNT, encoding='utf-8'
+            )
+        else:
+            handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=Config.LOG_MAX_BYTES, backupCount=Config.LOG_BACKUP_COUNT, encoding='utf-8'
+            )
+        handler.setFormatter(self.formatter)
+        self._handlers[name] = handler
+        return handler
+
+    def emit(self, record):
+        handler = self._handlers.get(record.name) or self._open(record.name)
+        handler.handle(record)
+
+    def close(self):
+        for handler in self._handlers.values():
+            handler.close()
+        super().close()
+
+
+def _formatter():
+    return JsonFormatter() if Config.LOG_FORMAT == 'json' else logging.Formatter(TEXT_FORMAT)
+
+
+def _start_listener():
+    """Shared queue and the background thread that writes every record out."""
+    global _queue_handler, _listener
+
+    handlers = [logging.StreamHandler()]
+    # file log (dan rotasinya) hanya ditulis oleh proses utama, worker process cukup ke console
+    if multiprocessing.parent_process() is None:
+        Config.LOGS_DIR.mkdir(parents=True, exist_ok=True)
+        handlers.append(PerLoggerFileHandler(Config.LOGS_DIR, _formatter()))
+    handlers[0].setFormatter(_formatter())
+
+    log_queue = queue.Queue(maxsize=Config.LOG_QUEUE_SIZE)
+    _queue_handler = DroppingQueueHandler(log_queue)
+    _queue_handler.addFilter(SamplingFilter(Config.LOG_SAMPLE_RATE))
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
 
 def setup_logger(name):
-    """Setup logger with file and console handlers"""
-    # Create logs directory if it doesn't exist
-    log_dir = Path('logs')
-    log_dir.mkdir(exist_ok=True)
-    
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    
-    # Create handlers
-    c_handler = logging.StreamHandler()
-    f_handler = logging.FileHandler(log_dir / f'{name}_{datetime.now():%Y%m%d}.log')
-    
-    # Create formatters
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    c_handler.setFormatter(formatter)
-    f_handler.setFormatter(formatter)
-    
-    # Add handlers to logger
-    logger.addHandler(c_handler)
-    logger.addHandler(f_handler)
-    
-    return logger
\ No newline at end of file
+    """Logger that hands records to the background log listener.
+
+    Safe to call repeatedly : every logger gets the shared queue handler once.
+    """
+    with _lock:
+        if _listener is None:
+            _start_listener()
+
+        logger = logging.getLogger(name)
+        logger.setLevel(Config.LOG_LEVEL)
+        if _queue_handler not in logger.handlers:
+            logger.addHandler(_queue_handler)
+        logger.propagate = False
+        return logger
+
+
+def dropped_records():
+    """Records dropped because the log queue was full."""
+    return _queue_handler.dropped if _queue_handler is not None else 0